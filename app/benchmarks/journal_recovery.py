@@ -0,0 +1,61 @@
+"""
+Measure how long the journaled backend takes to write a snapshot and to recover from it.
+
+Run from the repository root:
+    python -m app.benchmarks.journal_recovery --orders 1000000 --tail 50000
+"""
+import argparse
+import random
+import tempfile
+import time
+from uuid import uuid4
+
+from app.models.dish import Dish
+from app.models.order import Order, OrderStatus
+from app.services.journaled_backend import JournaledBackend
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--tail", type=int, default=50_000, help="status changes journaled after the snapshot")
+    parser.add_argument("--dishes-per-order", type=int, default=3)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        # Skip fsync while loading; durability isn't what is measured here
+        backend = JournaledBackend(directory, fsync=False, snapshot_every=args.orders * 10)
+        menu = [Dish(name=f"Dish {i}", price=round(random.uniform(2, 30), 2)) for i in range(50)]
+        backend.add_dishes(menu)
+        customers = [uuid4() for _ in range(1000)]
+        
+        start = time.perf_counter()
+        orders = []
+        for _ in range(args.orders):
+            order = Order(random.choice(customers), random.choices(menu, k=args.dishes_per_order))
+            backend.add_order(order)
+            orders.append(order)
+        print(f"journaled {args.orders:,} orders in {time.perf_counter() - start:.2f} s")
+        
+        start = time.perf_counter()
+        backend.snapshot()
+        print(f"snapshot written in {time.perf_counter() - start:.2f} s")
+        
+        for order in random.sample(orders, min(args.tail, len(orders))):
+            order.update_status(OrderStatus.PROCESSING)
+            backend.update_order_status(order)
+        backend.close()
+        del orders
+        
+        start = time.perf_counter()
+        recovered = JournaledBackend(directory, fsync=False, snapshot_every=args.orders * 10)
+        elapsed = time.perf_counter() - start
+        print(
+            f"recovered {len(recovered.get_all_orders()):,} orders from "
+            f"{recovered.recovered_records:,} records in {elapsed:.2f} s"
+        )
+        recovered.close()
+
+
+if __name__ == "__main__":
+    main()
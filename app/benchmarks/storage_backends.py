@@ -0,0 +1,79 @@
+"""
+Compare create, get and list throughput of the storage backends.
+
+Run from the repository root:
+    python -m app.benchmarks.storage_backends --orders 20000 --threads 8
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+from uuid import uuid4
+
+from app.models.dish import Dish
+from app.models.order import Order
+from app.services.sqlite_backend import SQLiteBackend
+from app.services.storage_backend import InMemoryBackend, StorageBackend
+
+
+def timed(label: str, operations: int, run: Callable[[], None]) -> float:
+    """Run a benchmark step and print its throughput."""
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    rate = operations / elapsed if elapsed else float("inf")
+    print(f"  {label:<28} {operations:>8} ops  {elapsed:8.3f} s  {rate:12,.0f} ops/s")
+    return rate
+
+
+def benchmark(name: str, backend: StorageBackend, orders: List[Order], threads: int, list_calls: int) -> Dict[str, float]:
+    """Measure one backend."""
+    print(f"{name}:")
+    ids = [order.id for order in orders]
+    lookups = random.choices(ids, k=len(ids))
+    results = {}
+    with ThreadPoolExecutor(threads) as pool:
+        results["create"] = timed(
+            f"create ({threads} threads)", len(orders),
+            lambda: list(pool.map(backend.add_order, orders))
+        )
+        results["get"] = timed(
+            f"get ({threads} threads)", len(lookups),
+            lambda: list(pool.map(backend.get_order, lookups))
+        )
+    results["list"] = timed(
+        f"list all x{list_calls}", list_calls * len(orders),
+        lambda: [backend.get_all_orders() for _ in range(list_calls)]
+    )
+    backend.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--dishes-per-order", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--list-calls", type=int, default=5)
+    args = parser.parse_args()
+    
+    menu = [Dish(name=f"Dish {i}", price=round(random.uniform(2, 30), 2)) for i in range(50)]
+    
+    def make_orders() -> List[Order]:
+        return [Order(uuid4(), random.choices(menu, k=args.dishes_per_order)) for _ in range(args.orders)]
+        
+    results = {"memory": benchmark("in-memory", InMemoryBackend(), make_orders(), args.threads, args.list_calls)}
+    with tempfile.TemporaryDirectory() as directory:
+        backend = SQLiteBackend(os.path.join(directory, "bench.db"))
+        results["sqlite"] = benchmark("sqlite (WAL)", backend, make_orders(), args.threads, args.list_calls)
+        
+    print("sqlite relative to in-memory:")
+    for step in ("create", "get", "list"):
+        print(f"  {step:<6} {results['sqlite'][step] / results['memory'][step]:10.4f}x")
+
+
+if __name__ == "__main__":
+    main()
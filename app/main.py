@@ -1,8 +1,25 @@
+import os
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routes import dishes, customers, orders
-from app.populate_db import populate_database
+from app.models.order import OrderStatus
+from app.routes import dishes, customers, orders, kitchen
+from app.routes.pagination import NEXT_CURSOR_HEADER
+from app.services.journaled_backend import JournaledBackend
+from app.services.order_database import OrderDatabase
+from app.services.shared_store import SharedBackend, SharedKitchenScheduler, SharedKitchenStream
+from app.services.sqlite_backend import SQLiteBackend
+
+# Set to a file path to keep data in SQLite instead of the journal
+DATABASE_PATH_ENV = "ORDER_DB_PATH"
+# Directory of the journal and snapshots
+DATA_DIR_ENV = "ORDER_DATA_DIR"
+DEFAULT_DATA_DIR = "data"
+# Set to the socket of a running store process (python -m app.services.shared_store)
+# so that several workers share its data, kitchen queue and kitchen events; the store then
+# owns the database or journal
+STORE_SOCKET_ENV = "ORDER_STORE_SOCKET"
 
 # Create the FastAPI app
 app = FastAPI(
@@ -18,12 +35,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", NEXT_CURSOR_HEADER],
 )
 
 # Include the routers
 app.include_router(dishes.router)
 app.include_router(customers.router)
 app.include_router(orders.router)
+app.include_router(kitchen.router)
 
 
 @app.get("/")
@@ -35,16 +54,42 @@ def read_root():
         "endpoints": [
             "/dishes",
             "/customers",
-            "/orders"
+            "/orders",
+            "/kitchen"
         ]
     }
 
 
 @app.on_event("startup")
 def startup_event():
-    """Load sample data when the application starts."""
+    """Open the configured storage, restoring the data saved by previous runs."""
     print("Starting the Restaurant Order Management System...")
-    data = populate_database()
-    print(f"Loaded {len(data['menu_items'])} menu items")
-    print(f"Loaded {len(data['customers'])} customers")
-    print(f"Loaded {len(data['orders'])} orders") 
\ No newline at end of file
+    db = OrderDatabase()
+    store_socket = os.environ.get(STORE_SOCKET_ENV)
+    database_path = os.environ.get(DATABASE_PATH_ENV)
+    if store_socket:
+        backend = SharedBackend(store_socket)
+        db.use_backend(backend)
+        kitchen.use_scheduler(SharedKitchenScheduler(kitchen.order_service, backend))
+        kitchen.use_stream(SharedKitchenStream(backend))
+        print(f"Using the shared store at {store_socket}")
+    elif database_path:
+        db.use_backend(SQLiteBackend(database_path))
+        print(f"Using SQLite database {database_path}")
+    else:
+        data_dir = os.environ.get(DATA_DIR_ENV, DEFAULT_DATA_DIR)
+        backend = JournaledBackend(data_dir)
+        db.use_backend(backend)
+        print(f"Recovered {backend.recovered_records} journal records from {data_dir}")
+    # Orders restored while still waiting for the kitchen were never announced to the scheduler
+    kitchen.kitchen_scheduler.submit_all(db.get_orders_by_status(OrderStatus.CREATED))
+    print(f"Loaded {len(db.get_menu().get_all_dishes())} menu items")
+    print(f"Loaded {len(db.get_all_customers())} customers")
+    print(f"Loaded {len(db.get_all_orders())} orders")
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    """Deliver pending kitchen notifications and close storage before the application exits."""
+    kitchen.kitchen_notifier.queue.stop(timeout=5)
+    OrderDatabase().backend.close()
\ No newline at end of file
@@ -14,4 +14,7 @@ class Dish(BaseModel):
     def __eq__(self, other):
         if not isinstance(other, Dish):
             return False
-        return self.id == other.id 
\ No newline at end of file
+        return self.id == other.id
+    
+    def __hash__(self):
+        return hash(self.id) 
\ No newline at end of file
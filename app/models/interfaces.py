@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Any, List
+from typing import TYPE_CHECKING, Any, List
 from uuid import UUID
 
 from app.models.dish import Dish
 
+if TYPE_CHECKING:
+    from app.models.order_events import OrderEvent
+
 
 class OrderObserver(ABC):
     """Interface for classes that need to be notified of order events."""
@@ -12,11 +15,22 @@ class OrderObserver(ABC):
     def update(self, order_id: UUID) -> None:
         """Called when an order status changes."""
         pass
+        
+    def on_event(self, event: "OrderEvent") -> None:
+        """Called for each order event; observers that only need the order ID can rely on update()."""
+        self.update(event.order_id)
+        
+    def on_events(self, events: List["OrderEvent"]) -> None:
+        """Called with a batch of order events, in the order they were published."""
+        for event in events:
+            self.on_event(event)
 
 
 class OrderSubject(ABC):
     """Interface for classes that can notify observers of order events."""
     
+    __slots__ = ()
+    
     @abstractmethod
     def attach(self, observer: OrderObserver) -> None:
         """Attach an observer to this subject."""
@@ -0,0 +1,76 @@
+import threading
+from contextlib import contextmanager
+from typing import Hashable, Iterator, List
+
+
+class ReadWriteLock:
+    """
+    Lock that lets many readers in at once but gives writers exclusive access.
+    Waiting writers block new readers, so a steady stream of reads cannot starve them.
+    A thread holding the write lock may re-enter it and may also take the read lock.
+    """
+    
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writers_waiting = 0
+        self._writer = None
+        self._write_depth = 0
+        
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """Hold the lock for reading."""
+        me = threading.get_ident()
+        if self._writer == me:
+            # Reads inside our own write are already exclusive
+            yield
+            return
+        with self._condition:
+            self._condition.wait_for(lambda: self._writer is None and not self._writers_waiting)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+                    
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """Hold the lock for writing."""
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._write_depth += 1
+            else:
+                self._writers_waiting += 1
+                try:
+                    self._condition.wait_for(lambda: self._writer is None and not self._readers)
+                finally:
+                    self._writers_waiting -= 1
+                self._writer = me
+                self._write_depth = 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._write_depth -= 1
+                if not self._write_depth:
+                    self._writer = None
+                    self._condition.notify_all()
+
+
+class StripedLock:
+    """
+    Fixed pool of re-entrant locks picked by key hash.
+    Unrelated keys rarely share a stripe, so they can be updated in parallel without
+    keeping one lock per key.
+    """
+    
+    def __init__(self, stripes: int = 64):
+        self._locks: List[threading.RLock] = [threading.RLock() for _ in range(stripes)]
+        
+    def for_key(self, key: Hashable) -> threading.RLock:
+        """Get the lock guarding a key."""
+        return self._locks[hash(key) % len(self._locks)]
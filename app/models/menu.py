@@ -1,7 +1,34 @@
-from typing import List, Optional
-from uuid import UUID
+from bisect import bisect_left, bisect_right, insort
+from itertools import count
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID, uuid4
 
 from app.models.dish import Dish
+from app.models.locks import ReadWriteLock
+from app.models.search_index import InvertedIndex
+
+# Name matches rank above description matches in dish search
+NAME_SEARCH_WEIGHT = 2.0
+DESCRIPTION_SEARCH_WEIGHT = 1.0
+
+
+def _page_end(start: int, limit: Optional[int], end: int) -> int:
+    """Get the end of a page of at most limit entries starting at start."""
+    return end if limit is None else min(end, start + limit)
+
+
+class MenuSnapshot:
+    """
+    Immutable view of the menu at one version.
+    Readers share the same snapshot until the menu changes, so reads never copy the dish list.
+    """
+    
+    __slots__ = ("version", "etag", "dishes")
+    
+    def __init__(self, version: int, etag: str, dishes: Tuple[Dish, ...]):
+        self.version = version
+        self.etag = etag
+        self.dishes = dishes
 
 
 class Menu:
@@ -11,36 +38,193 @@ class Menu:
     """
     
     def __init__(self):
-        self._dishes: List[Dish] = []
+        # Dicts preserve insertion order, so the id index doubles as the dish list
+        self._dishes: Dict[UUID, Dish] = {}
+        # Secondary index: category -> dishes in that category (also insertion-ordered)
+        self._by_category: Dict[Optional[str], Dict[UUID, Dish]] = {}
+        # Full-text index over dish names and descriptions
+        self._search_index = InvertedIndex()
+        # Price index: (price, insertion sequence, dish id) kept sorted for range lookups
+        self._price_index: List[Tuple[float, int, UUID]] = []
+        self._price_keys: Dict[UUID, Tuple[float, int, UUID]] = {}
+        self._sequence = count()
+        # Insertion-order index: (insertion sequence, dish id), so pages can resume after any dish
+        self._by_sequence: List[Tuple[int, UUID]] = []
+        # Copy-on-write snapshot, rebuilt lazily on the first read after a change.
+        # The epoch keeps versions of different Menu instances from colliding.
+        self._epoch = uuid4().hex[:12]
+        self._version = 0
+        self._snapshot: Optional[MenuSnapshot] = None
+        # Lookups share the lock; changes to the dish dict and its indexes take it exclusively
+        self._lock = ReadWriteLock()
+        
+    @property
+    def version(self) -> int:
+        """Get the menu version, incremented on every change."""
+        return self._version
+        
+    def _bump_version(self) -> None:
+        """Record a change to the menu and invalidate the current snapshot."""
+        self._version += 1
+        self._snapshot = None
+        
+    def snapshot(self) -> MenuSnapshot:
+        """Get an immutable snapshot of the current menu."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            # Publishing under the read lock stops a stale snapshot from outliving a change
+            with self._lock.read():
+                snapshot = MenuSnapshot(
+                    self._version,
+                    f'"{self._epoch}-{self._version}"',
+                    tuple(self._dishes.values())
+                )
+                self._snapshot = snapshot
+        return snapshot
         
     def add_dish(self, dish: Dish) -> None:
         """Add a dish to the menu if it doesn't already exist."""
-        if not self.contains_dish(dish):
-            self._dishes.append(dish)
-            
+        with self._lock.write():
+            if self._index_dish(dish):
+                self._bump_version()
+                
+    def add_dishes(self, dishes: Iterable[Dish]) -> List[Dish]:
+        """
+        Add many dishes under a single version bump.
+        Returns the dishes that were actually added.
+        """
+        dishes = list(dishes)
+        with self._lock.write():
+            added = [dish for dish in dishes if self._index_dish(dish)]
+            if added:
+                self._bump_version()
+        return added
+        
+    def _index_dish(self, dish: Dish) -> bool:
+        """
+        Add a dish to the menu and its indexes without bumping the version.
+        Must be called with the write lock held.
+        """
+        if dish.id in self._dishes:
+            return False
+        self._dishes[dish.id] = dish
+        self._by_category.setdefault(dish.category, {})[dish.id] = dish
+        self._search_index.add(dish.id, (
+            (dish.name, NAME_SEARCH_WEIGHT),
+            (dish.description, DESCRIPTION_SEARCH_WEIGHT),
+        ))
+        sequence = next(self._sequence)
+        price_key = (dish.price, sequence, dish.id)
+        insort(self._price_index, price_key)
+        self._price_keys[dish.id] = price_key
+        # Sequence numbers only grow, so appending keeps the index sorted
+        self._by_sequence.append((sequence, dish.id))
+        return True
+        
     def remove_dish(self, dish_id: UUID) -> bool:
         """Remove a dish from the menu by its ID."""
-        for i, dish in enumerate(self._dishes):
-            if dish.id == dish_id:
-                self._dishes.pop(i)
-                return True
-        return False
-        
+        with self._lock.write():
+            dish = self._dishes.pop(dish_id, None)
+            if dish is None:
+                return False
+            bucket = self._by_category[dish.category]
+            del bucket[dish_id]
+            if not bucket:
+                del self._by_category[dish.category]
+            self._search_index.remove(dish_id)
+            price_key = self._price_keys.pop(dish_id)
+            del self._price_index[bisect_left(self._price_index, price_key)]
+            del self._by_sequence[bisect_left(self._by_sequence, (price_key[1],))]
+            self._bump_version()
+            return True
+            
     def get_dish(self, dish_id: UUID) -> Optional[Dish]:
         """Get a dish from the menu by its ID."""
-        for dish in self._dishes:
-            if dish.id == dish_id:
-                return dish
-        return None
+        # A single dict lookup is atomic, so it needs no lock
+        return self._dishes.get(dish_id)
         
     def contains_dish(self, dish: Dish) -> bool:
         """Check if a dish is in the menu."""
-        return dish in self._dishes
+        return dish.id in self._dishes
         
     def get_all_dishes(self) -> List[Dish]:
         """Get all dishes in the menu."""
-        return self._dishes.copy()
+        return list(self.snapshot().dishes)
         
     def get_dishes_by_category(self, category: str) -> List[Dish]:
         """Get all dishes in a specific category."""
-        return [dish for dish in self._dishes if dish.category == category] 
\ No newline at end of file
+        with self._lock.read():
+            return list(self._by_category.get(category, {}).values())
+            
+    def get_category_counts(self) -> Dict[str, int]:
+        """Get the number of dishes in each category, skipping uncategorized dishes."""
+        with self._lock.read():
+            return {
+                category: len(dishes)
+                for category, dishes in self._by_category.items()
+                if category is not None
+            }
+            
+    def search_dishes(self, query: str, limit: Optional[int] = None) -> List[Dish]:
+        """Search dish names and descriptions, best matches first."""
+        with self._lock.read():
+            return [self._dishes[dish_id] for dish_id in self._search_index.search(query, limit)]
+            
+    def get_dishes_page(
+        self,
+        after: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Dish], Optional[int]]:
+        """
+        Get a page of dishes in the order they were added, starting after the dish with the
+        given sequence number. Returns the dishes and the key to pass as `after` for the next
+        page, or None if this is the last page.
+        """
+        with self._lock.read():
+            start = 0 if after is None else bisect_left(self._by_sequence, (after + 1,))
+            keys = self._by_sequence[start:_page_end(start, limit, len(self._by_sequence))]
+            next_key = keys[-1][0] if start + len(keys) < len(self._by_sequence) else None
+            return [self._dishes[dish_id] for _, dish_id in keys], next_key
+            
+    def get_dishes_by_price(
+        self,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        descending: bool = False
+    ) -> List[Dish]:
+        """Get dishes whose price is within the given bounds, ordered by price."""
+        return self.get_dishes_by_price_page(min_price, max_price, descending)[0]
+        
+    def get_dishes_by_price_page(
+        self,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        descending: bool = False,
+        after: Optional[Tuple[float, int]] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Dish], Optional[Tuple[float, int]]]:
+        """
+        Get a page of dishes within the given price bounds, ordered by price, starting after
+        the dish with the given (price, sequence number) key. Returns the dishes and the key to
+        pass as `after` for the next page, or None if this is the last page.
+        """
+        with self._lock.read():
+            start = 0 if min_price is None else bisect_left(self._price_index, (min_price,))
+            end = len(self._price_index) if max_price is None else bisect_right(
+                self._price_index, (max_price, float("inf"))
+            )
+            if descending:
+                if after is not None:
+                    end = min(end, bisect_left(self._price_index, after))
+                first = start if limit is None else max(start, end - limit)
+                keys = self._price_index[first:end]
+                keys.reverse()
+                more = first > start
+            else:
+                if after is not None:
+                    start = max(start, bisect_left(self._price_index, (after[0], after[1] + 1)))
+                keys = self._price_index[start:_page_end(start, limit, end)]
+                more = start + len(keys) < end
+            dishes = [self._dishes[dish_id] for _, _, dish_id in keys]
+        next_key = keys[-1][:2] if more and keys else None
+        return dishes, next_key
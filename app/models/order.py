@@ -1,10 +1,15 @@
 from datetime import datetime
 from enum import Enum
-from typing import List, Set
+from threading import Lock
+from time import time_ns
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 from uuid import UUID, uuid4
 
 from app.models.dish import Dish
 from app.models.interfaces import OrderObserver, OrderSubject
+from app.models.order_events import OrderEvent, OrderEventBus, OrderEventKind
+from app.models.order_type import OrderType
+from app.models.pricing import get_pricing_engine
 
 
 class OrderStatus(Enum):
@@ -15,54 +20,314 @@ class OrderStatus(Enum):
     CANCELLED = "cancelled"
 
 
+# Most of one dish a line item can hold. Far above any real order, and well inside the
+# unsigned 32-bit fields quantities are stored in by the journal and the archive.
+MAX_DISH_QUANTITY = 10_000
+
+
+class LineItem(NamedTuple):
+    """A dish in an order together with how many of it were ordered."""
+    dish: Dish
+    quantity: int
+
+
+# Orders reference dishes by their position in this process-wide table instead of
+# holding their own references to the pydantic models.
+_dish_table: List[Dish] = []
+_dish_cents: List[int] = []
+_dish_indexes: Dict[UUID, int] = {}
+_dish_table_lock = Lock()
+
+
+def intern_dish(dish: Dish) -> int:
+    """Get the table index of a dish, adding the dish on first sight."""
+    index = _dish_indexes.get(dish.id)
+    if index is None:
+        with _dish_table_lock:
+            index = _dish_indexes.get(dish.id)
+            if index is None:
+                index = len(_dish_table)
+                _dish_table.append(dish)
+                _dish_cents.append(to_cents(dish.price))
+                _dish_indexes[dish.id] = index
+    return index
+
+
+def dish_at(index: int) -> Dish:
+    """Get the dish at an index of the dish table."""
+    return _dish_table[index]
+
+
+def to_cents(price: float) -> int:
+    """Convert a price to whole cents."""
+    return round(price * 100)
+
+
+def _now_us() -> int:
+    """Get the current time in microseconds since the epoch."""
+    return time_ns() // 1000
+
+
+def _to_datetime(timestamp_us: int) -> datetime:
+    """Convert microseconds since the epoch to a local datetime without float rounding."""
+    return datetime.fromtimestamp(timestamp_us // 1_000_000).replace(microsecond=timestamp_us % 1_000_000)
+
+
+def to_timestamp_us(value: datetime) -> int:
+    """Convert a datetime to microseconds since the epoch; naive datetimes are local, like created_at."""
+    return int(value.replace(microsecond=0).timestamp()) * 1_000_000 + value.microsecond
+
+
 class Order(OrderSubject):
     """
     Represents a customer order.
-    Implements the Observer pattern to notify interested parties of order status changes.
+    Implements the Observer pattern to notify interested parties of order status changes;
+    events go through the process-wide OrderEventBus rather than per-order observer sets.
+    Stored compactly: ids and timestamps as integers, dishes as quantities keyed by
+    their index in a shared dish table.
     """
     
-    def __init__(self, customer_id: UUID, dishes: List[Dish]):
-        self.id: UUID = uuid4()
-        self.customer_id: UUID = customer_id
-        self.dishes: List[Dish] = dishes.copy()
+    __slots__ = (
+        "_id", "_customer_id", "order_type", "_items", "_dish_count", "status", "_subtotal_cents",
+        "_created_at", "_updated_at"
+    )
+    
+    def __init__(self, customer_id: UUID, dishes: List[Dish], order_type: OrderType = OrderType.REGULAR):
+        self._id: int = uuid4().int
+        self._customer_id: int = customer_id.int
+        self.order_type: OrderType = order_type
+        # Line items: dish table index -> quantity, in the order dishes were first added
+        self._items: Dict[int, int] = {}
+        for dish in dishes:
+            index = intern_dish(dish)
+            self._items[index] = self._items.get(index, 0) + 1
+        if self._items and max(self._items.values()) > MAX_DISH_QUANTITY:
+            raise ValueError(f"Quantity must not exceed {MAX_DISH_QUANTITY}: {max(self._items.values())}")
+        self._dish_count: int = len(dishes)
+        # Running subtotal in integer cents, kept up to date whenever quantities change
+        self._subtotal_cents: int = sum(_dish_cents[index] * quantity for index, quantity in self._items.items())
         self.status: OrderStatus = OrderStatus.CREATED
-        self.created_at: datetime = datetime.now()
-        self.updated_at: datetime = self.created_at
-        self._observers: Set[OrderObserver] = set()
+        self._created_at: int = _now_us()
+        self._updated_at: int = self._created_at
+        
+    @classmethod
+    def restore(
+        cls,
+        order_id: UUID,
+        customer_id: UUID,
+        order_type: OrderType,
+        status: OrderStatus,
+        line_items: Iterable[Tuple[Dish, int]],
+        created_at_us: int,
+        updated_at_us: int
+    ) -> "Order":
+        """Rebuild a stored order exactly as it was saved, without publishing any events."""
+        items: Dict[int, int] = {}
+        for dish, quantity in line_items:
+            index = intern_dish(dish)
+            items[index] = items.get(index, 0) + quantity
+        return cls.from_compact(
+            order_id.int, customer_id.int, order_type, status, items, created_at_us, updated_at_us
+        )
+        
+    @classmethod
+    def from_compact(
+        cls,
+        order_id: int,
+        customer_id: int,
+        order_type: OrderType,
+        status: OrderStatus,
+        items: Dict[int, int],
+        created_at_us: int,
+        updated_at_us: int
+    ) -> "Order":
+        """
+        Rebuild an order from its compact form: integer IDs and quantities keyed by dish table
+        index (see intern_dish). The fast path for loading many stored orders; takes ownership of items.
+        """
+        order = cls.__new__(cls)
+        order._id = order_id
+        order._customer_id = customer_id
+        order.order_type = order_type
+        order._items = items
+        order._dish_count = sum(items.values())
+        order._subtotal_cents = sum([_dish_cents[index] * quantity for index, quantity in items.items()])
+        order.status = status
+        order._created_at = created_at_us
+        order._updated_at = updated_at_us
+        return order
+        
+    def __reduce__(self):
+        """Pickle with the dishes themselves, since dish table indexes only mean something in this process."""
+        return Order.restore, (
+            self.id, self.customer_id, self.order_type, self.status, self.line_items,
+            self._created_at, self._updated_at
+        )
+        
+    def to_compact(self) -> Tuple[int, int, OrderType, OrderStatus, Dict[int, int], int, int]:
+        """
+        Get the arguments that rebuild this order with from_compact. The item dict is shared
+        and replaced rather than changed when quantities change, so it must not be modified.
+        """
+        return (
+            self._id, self._customer_id, self.order_type, self.status, self._items,
+            self._created_at, self._updated_at
+        )
+        
+    @property
+    def id(self) -> UUID:
+        """Get the order ID."""
+        return UUID(int=self._id)
+        
+    @property
+    def customer_id(self) -> UUID:
+        """Get the ID of the customer who placed this order."""
+        return UUID(int=self._customer_id)
+        
+    @property
+    def dishes(self) -> List[Dish]:
+        """Get the dishes in this order, repeating each dish by its quantity."""
+        return [_dish_table[index] for index, quantity in self._items.items() for _ in range(quantity)]
+        
+    @property
+    def line_items(self) -> List[LineItem]:
+        """Get the dishes in this order with their quantities."""
+        return [LineItem(_dish_table[index], quantity) for index, quantity in self._items.items()]
+        
+    @property
+    def dish_count(self) -> int:
+        """Get the number of dishes in this order, counting quantities."""
+        return self._dish_count
+        
+    def get_quantity(self, dish_id: UUID) -> int:
+        """Get how many of a dish are in this order."""
+        index = _dish_indexes.get(dish_id)
+        return 0 if index is None else self._items.get(index, 0)
+        
+    def get_dish(self, dish_id: UUID) -> Optional[Dish]:
+        """Get a dish in this order by its ID."""
+        index = _dish_indexes.get(dish_id)
+        if index is None or index not in self._items:
+            return None
+        return _dish_table[index]
+        
+    @property
+    def created_at_us(self) -> int:
+        """Get the creation time in microseconds since the epoch."""
+        return self._created_at
+        
+    @property
+    def created_at(self) -> datetime:
+        """Get the time this order was created."""
+        return _to_datetime(self._created_at)
+        
+    @property
+    def updated_at_us(self) -> int:
+        """Get the last modification time in microseconds since the epoch."""
+        return self._updated_at
+        
+    @property
+    def updated_at(self) -> datetime:
+        """Get the time this order was last modified."""
+        return _to_datetime(self._updated_at)
+        
+    def _touch(self) -> None:
+        """Record a modification, keeping updated_at strictly increasing."""
+        self._updated_at = max(_now_us(), self._updated_at + 1)
         
     def attach(self, observer: OrderObserver) -> None:
-        """Attach an observer to this order."""
-        self._observers.add(observer)
+        """Subscribe an observer to this order's events on the order event bus."""
+        OrderEventBus().subscribe(observer, self.id)
         
     def detach(self, observer: OrderObserver) -> None:
-        """Detach an observer from this order."""
-        self._observers.discard(observer)
-        
-    def notify(self) -> None:
-        """Notify all observers of a status change."""
-        for observer in self._observers:
-            observer.update(self.id)
-            
+        """Unsubscribe an observer from this order's events."""
+        OrderEventBus().unsubscribe(observer, self.id)
+        
+    def notify(
+        self,
+        kind: OrderEventKind = OrderEventKind.STATUS_CHANGED,
+        previous_status: Optional[OrderStatus] = None
+    ) -> None:
+        """Publish an event about this order to the order event bus."""
+        OrderEventBus().publish(OrderEvent(self.id, kind, self.status, previous_status))
+        
     def update_status(self, status: OrderStatus) -> None:
         """Update the status of this order and notify observers."""
+        previous_status = self.status
         self.status = status
-        self.updated_at = datetime.now()
-        self.notify()
+        self._touch()
+        self.notify(OrderEventKind.STATUS_CHANGED, previous_status)
+        
+    @property
+    def subtotal_cents(self) -> int:
+        """Get the sum of this order's dish prices in cents, before pricing rules."""
+        return self._subtotal_cents
+        
+    @property
+    def total_cents(self) -> int:
+        """Get the total price of this order in cents, after discounts, surcharges and tax."""
+        return get_pricing_engine().price(self.order_type, self._subtotal_cents, self._dish_count)
         
     def calculate_total(self) -> float:
         """Calculate the total price of this order."""
-        return sum(dish.price for dish in self.dishes)
+        return self.total_cents / 100
         
-    def add_dish(self, dish: Dish) -> None:
+    def add_dish(self, dish: Dish, quantity: int = 1) -> None:
         """Add a dish to this order."""
-        self.dishes.append(dish)
-        self.updated_at = datetime.now()
+        index = intern_dish(dish)
+        quantity += self._items.get(index, 0)
+        if quantity > MAX_DISH_QUANTITY:
+            raise ValueError(f"Quantity must not exceed {MAX_DISH_QUANTITY}: {quantity}")
+        self._set_quantity(index, quantity)
         
     def remove_dish(self, dish_id: UUID) -> bool:
-        """Remove a dish from this order by its ID."""
-        for i, dish in enumerate(self.dishes):
-            if dish.id == dish_id:
-                self.dishes.pop(i)
-                self.updated_at = datetime.now()
-                return True
-        return False 
\ No newline at end of file
+        """Remove one of a dish from this order by its ID."""
+        index = _dish_indexes.get(dish_id)
+        if index is None or index not in self._items:
+            return False
+        self._set_quantity(index, self._items[index] - 1)
+        return True
+        
+    def set_dish_quantity(self, dish: Dish, quantity: int) -> None:
+        """Set how many of a dish are in this order; zero removes the dish."""
+        if quantity < 0:
+            raise ValueError(f"Quantity must not be negative: {quantity}")
+        if quantity > MAX_DISH_QUANTITY:
+            raise ValueError(f"Quantity must not exceed {MAX_DISH_QUANTITY}: {quantity}")
+        self._set_quantity(intern_dish(dish), quantity)
+        
+    def replay_change(
+        self,
+        updated_at_us: int,
+        status: Optional[OrderStatus] = None,
+        dish: Optional[Dish] = None,
+        quantity: int = 0
+    ) -> None:
+        """
+        Apply a stored change exactly as it was recorded, without publishing any events.
+        Sets the status and/or the quantity of a dish, then the recorded modification time.
+        """
+        if status is not None:
+            self.status = status
+        if dish is not None:
+            self._set_quantity(intern_dish(dish), quantity)
+        self._updated_at = updated_at_us
+        
+    def _set_quantity(self, index: int, quantity: int) -> None:
+        """
+        Set the quantity of a line item and update the running totals.
+        The item dict is replaced rather than changed in place, so readers iterating it
+        without holding the order's lock never see it change size under them.
+        """
+        delta = quantity - self._items.get(index, 0)
+        if delta == 0:
+            return
+        items = dict(self._items)
+        if quantity:
+            items[index] = quantity
+        else:
+            del items[index]
+        self._items = items
+        self._dish_count += delta
+        self._subtotal_cents += _dish_cents[index] * delta
+        self._touch()
@@ -0,0 +1,117 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+from enum import Enum
+from typing import Deque, Dict, Iterator, List, NamedTuple, Optional
+from uuid import UUID
+from weakref import WeakSet, finalize
+
+from app.models.interfaces import OrderObserver
+
+
+class OrderEventKind(Enum):
+    CREATED = "created"
+    STATUS_CHANGED = "status_changed"
+
+
+class OrderEvent(NamedTuple):
+    """Something that happened to an order."""
+    order_id: UUID
+    kind: OrderEventKind
+    status: Optional[Enum] = None
+    previous_status: Optional[Enum] = None
+
+
+class OrderEventBus:
+    """
+    Process-wide publish/subscribe hub for order events.
+    Subscribers are held through weak references, so subscribing never keeps an observer alive.
+    Events published inside batch() are queued and dispatched together when the batch ends.
+    """
+    
+    _instance = None
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(OrderEventBus, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+        
+    def _initialize(self):
+        """Initialize the bus."""
+        self._subscribers: "WeakSet[OrderObserver]" = WeakSet()
+        self._order_subscribers: Dict[UUID, "WeakSet[OrderObserver]"] = {}
+        # Orders whose subscribers were collected; a deque, as finalizers can run inside the lock
+        self._collected: Deque[UUID] = deque()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        
+    def subscribe(self, observer: OrderObserver, order_id: Optional[UUID] = None) -> None:
+        """Subscribe to events of every order, or only of the given order."""
+        with self._lock:
+            if order_id is None:
+                self._subscribers.add(observer)
+            else:
+                self._prune()
+                self._order_subscribers.setdefault(order_id, WeakSet()).add(observer)
+                finalize(observer, self._collected.append, order_id)
+                
+    def unsubscribe(self, observer: OrderObserver, order_id: Optional[UUID] = None) -> None:
+        """Undo a subscription made with subscribe()."""
+        with self._lock:
+            if order_id is None:
+                self._subscribers.discard(observer)
+                return
+            observers = self._order_subscribers.get(order_id)
+            if observers is not None:
+                observers.discard(observer)
+                if not observers:
+                    del self._order_subscribers[order_id]
+                    
+    def _prune(self) -> None:
+        """Drop orders left without subscribers by garbage collection. Must be called with the lock held."""
+        while self._collected:
+            order_id = self._collected.popleft()
+            observers = self._order_subscribers.get(order_id)
+            if observers is not None and not observers:
+                del self._order_subscribers[order_id]
+                
+    def publish(self, event: OrderEvent) -> None:
+        """Dispatch an event now, or queue it if the current thread is inside batch()."""
+        pending = getattr(self._local, "pending", None)
+        if pending is not None:
+            pending.append(event)
+        else:
+            self._dispatch([event])
+            
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Queue events published by this thread and dispatch them together on exit."""
+        if getattr(self._local, "pending", None) is not None:
+            # Nested batch, the outermost one dispatches
+            yield
+            return
+        self._local.pending = []
+        try:
+            yield
+        finally:
+            events, self._local.pending = self._local.pending, None
+            if events:
+                self._dispatch(events)
+                
+    def _dispatch(self, events: List[OrderEvent]) -> None:
+        """Hand each observer the events it is subscribed to, in one call per observer."""
+        with self._lock:
+            deliveries: Dict[OrderObserver, List[OrderEvent]] = {
+                observer: list(events) for observer in self._subscribers
+            }
+            self._prune()
+            if self._order_subscribers:
+                for event in events:
+                    observers = self._order_subscribers.get(event.order_id)
+                    if observers:
+                        for observer in observers:
+                            deliveries.setdefault(observer, []).append(event)
+                            
+        for observer, observer_events in deliveries.items():
+            observer.on_events(observer_events)
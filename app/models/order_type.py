@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class OrderType(Enum):
+    REGULAR = "regular"
+    BULK = "bulk"
+    EXPRESS = "express"
@@ -0,0 +1,97 @@
+import heapq
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class _Node:
+    __slots__ = ("children", "values", "shortest")
+    
+    def __init__(self):
+        # Created on first use, as most nodes are only passed through
+        self.children: Optional[Dict[str, "_Node"]] = None
+        self.values: Optional[Dict[Hashable, None]] = None
+        # Length of the shortest key at or below this node
+        self.shortest = 0
+
+
+class PrefixTrie:
+    """
+    Character trie mapping string keys to values, for type-ahead lookups.
+    Every node knows the length of the shortest key below it, so a search goes best-first
+    from the node of the prefix straight to the shortest keys and stops as soon as enough
+    are found, however many keys share the prefix. Not thread-safe; callers hold their own lock.
+    """
+    
+    def __init__(self):
+        self._root = _Node()
+        
+    def add(self, key: str, value: Hashable) -> None:
+        """Map a key to a value; a key can have many values."""
+        node = self._root
+        length = len(key)
+        if node.values is None and node.children is None or length < node.shortest:
+            node.shortest = length
+        for char in key:
+            if node.children is None:
+                node.children = {}
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node()
+                child.shortest = length
+            elif length < child.shortest:
+                child.shortest = length
+            node = child
+        if node.values is None:
+            node.values = {}
+        node.values[value] = None
+        
+    def remove(self, key: str, value: Hashable) -> bool:
+        """Remove a value from a key, pruning nodes left without keys below them."""
+        path = [self._root]
+        for char in key:
+            children = path[-1].children
+            node = None if children is None else children.get(char)
+            if node is None:
+                return False
+            path.append(node)
+        node = path[-1]
+        if node.values is None or value not in node.values:
+            return False
+        del node.values[value]
+        if not node.values:
+            node.values = None
+        for depth in range(len(key), -1, -1):
+            node = path[depth]
+            if node.values is None and not node.children and depth:
+                del path[depth - 1].children[key[depth - 1]]
+                continue
+            node.children = node.children or None
+            node.shortest = depth if node.values else min(
+                (child.shortest for child in (node.children or {}).values()), default=0
+            )
+        return True
+        
+    def search(self, prefix: str, limit: Optional[int] = None) -> List[Hashable]:
+        """
+        Get the values of keys starting with prefix, shortest keys first and keys of the same
+        length in alphabetical order. Each value appears once.
+        """
+        node = self._root
+        for char in prefix:
+            node = None if node.children is None else node.children.get(char)
+            if node is None:
+                return []
+        results: Dict[Hashable, None] = {}
+        # No key below a node is shorter than its shortest or sorts before its path, and
+        # paths are unique, so nodes come off the heap in the order their keys rank
+        heap: List[Tuple[int, str, _Node]] = [(node.shortest, prefix, node)]
+        while heap:
+            _, path, node = heapq.heappop(heap)
+            if node.values is not None:
+                for value in node.values:
+                    results[value] = None
+                    if limit is not None and len(results) >= limit:
+                        return list(results)
+            if node.children is not None:
+                for char, child in node.children.items():
+                    heapq.heappush(heap, (child.shortest, path + char, child))
+        return list(results)
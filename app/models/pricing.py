@@ -0,0 +1,144 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from app.models.order_type import OrderType
+
+
+class PricingRule(NamedTuple):
+    """
+    One pricing step applied to the running amount of an order, in order of declaration.
+    percent adjusts the running amount (negative for discounts), fixed_cents adds a flat fee.
+    The rule only applies to orders with at least min_items dishes and min_subtotal_cents.
+    """
+    name: str
+    percent: float = 0.0
+    fixed_cents: int = 0
+    min_items: int = 0
+    min_subtotal_cents: int = 0
+
+
+def discount(name: str, percent: float, min_items: int = 0, min_subtotal_cents: int = 0) -> PricingRule:
+    """Rule that takes a percentage off the running amount."""
+    return PricingRule(name, -percent, 0, min_items, min_subtotal_cents)
+
+
+def surcharge(name: str, percent: float = 0.0, fixed_cents: int = 0) -> PricingRule:
+    """Rule that adds a percentage and/or a flat fee to the running amount."""
+    return PricingRule(name, percent, fixed_cents)
+
+
+def tax(percent: float) -> PricingRule:
+    """Rule that adds tax on the running amount; declare it last so it applies after adjustments."""
+    return PricingRule("tax", percent)
+
+
+# A compiled rule: (basis points, fixed cents, min items, min subtotal cents)
+_CompiledRule = Tuple[int, int, int, int]
+
+DEFAULT_RULES: Dict[OrderType, List[PricingRule]] = {
+    OrderType.REGULAR: [],
+    OrderType.BULK: [discount("bulk discount", 10)],
+    OrderType.EXPRESS: [surcharge("express surcharge", 10)],
+}
+
+
+def _scale(amount: int, basis_points: int) -> int:
+    """Multiply cents by basis points / 10000, rounding half away from zero."""
+    product = amount * basis_points
+    if product >= 0:
+        return (product + 5000) // 10000
+    return -((-product + 5000) // 10000)
+
+
+class PricingEngine:
+    """
+    Prices orders from per-order-type rule lists.
+    Rules are compiled once into integer tuples (basis points and cents), so pricing an order
+    is a short loop of integer arithmetic and totals are exact to the cent.
+    """
+    
+    def __init__(
+        self,
+        rules: Optional[Mapping[OrderType, Sequence[PricingRule]]] = None,
+        tax_percent: float = 0.0
+    ):
+        rules = DEFAULT_RULES if rules is None else rules
+        tax_rules = [tax(tax_percent)] if tax_percent else []
+        self._compiled: Dict[OrderType, Tuple[_CompiledRule, ...]] = {
+            order_type: self._compile(list(rules.get(order_type, ())) + tax_rules)
+            for order_type in OrderType
+        }
+        
+    @staticmethod
+    def _compile(rules: Iterable[PricingRule]) -> Tuple[_CompiledRule, ...]:
+        """Turn rules into integer tuples, dropping rules that never change the amount."""
+        return tuple(
+            (round(rule.percent * 100), rule.fixed_cents, rule.min_items, rule.min_subtotal_cents)
+            for rule in rules
+            if rule.percent or rule.fixed_cents
+        )
+        
+    def price(self, order_type: OrderType, subtotal_cents: int, item_count: int) -> int:
+        """Get the total in cents for one order."""
+        amount = subtotal_cents
+        for basis_points, fixed_cents, min_items, min_subtotal in self._compiled[order_type]:
+            if item_count >= min_items and subtotal_cents >= min_subtotal:
+                amount += _scale(amount, basis_points) + fixed_cents
+        return amount
+        
+    def price_batch(
+        self,
+        order_types: Sequence[OrderType],
+        subtotals_cents: Sequence[int],
+        item_counts: Sequence[int]
+    ) -> List[int]:
+        """
+        Get the totals in cents for many orders given as parallel columns.
+        Orders are grouped by type and each rule is applied to a whole group's column at once.
+        """
+        totals = list(subtotals_cents)
+        groups: Dict[OrderType, List[int]] = defaultdict(list)
+        for position, order_type in enumerate(order_types):
+            groups[order_type].append(position)
+            
+        for order_type, positions in groups.items():
+            rules = self._compiled[order_type]
+            if not rules:
+                continue
+            amounts = [totals[position] for position in positions]
+            subtotals = [subtotals_cents[position] for position in positions]
+            counts = [item_counts[position] for position in positions]
+            for basis_points, fixed_cents, min_items, min_subtotal in rules:
+                if min_items or min_subtotal:
+                    amounts = [
+                        amount + _scale(amount, basis_points) + fixed_cents
+                        if count >= min_items and subtotal >= min_subtotal else amount
+                        for amount, subtotal, count in zip(amounts, subtotals, counts)
+                    ]
+                else:
+                    amounts = [amount + _scale(amount, basis_points) + fixed_cents for amount in amounts]
+            for position, amount in zip(positions, amounts):
+                totals[position] = amount
+        return totals
+        
+    def price_orders(self, orders: Sequence[Any]) -> List[int]:
+        """Get the totals in cents for many orders in one batch."""
+        return self.price_batch(
+            [order.order_type for order in orders],
+            [order.subtotal_cents for order in orders],
+            [order.dish_count for order in orders]
+        )
+
+
+_default_engine = PricingEngine()
+
+
+def get_pricing_engine() -> PricingEngine:
+    """Get the engine used to price orders."""
+    return _default_engine
+
+
+def set_pricing_engine(engine: PricingEngine) -> None:
+    """Replace the engine used to price orders, e.g. to change tax or discounts."""
+    global _default_engine
+    _default_engine = engine
@@ -0,0 +1,102 @@
+import heapq
+import re
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Exact term matches rank above prefix completions of the same query token
+EXACT_MATCH_BOOST = 1.0
+PREFIX_MATCH_BOOST = 0.5
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into case-folded word tokens."""
+    return _TOKEN_RE.findall(text.casefold())
+
+
+class InvertedIndex:
+    """
+    In-memory inverted index over weighted text fields with prefix matching.
+    Terms are kept sorted so every term sharing a prefix forms one contiguous slice.
+    """
+    
+    def __init__(self):
+        self._postings: Dict[str, Dict[Hashable, float]] = {}
+        self._terms: List[str] = []
+        self._doc_terms: Dict[Hashable, Tuple[str, ...]] = {}
+        
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+        
+    def add(self, doc_id: Hashable, fields: Iterable[Tuple[Optional[str], float]]) -> None:
+        """Index a document given as (text, weight) pairs, replacing any previous version."""
+        self.remove(doc_id)
+        weights: Dict[str, float] = {}
+        for text, weight in fields:
+            if text:
+                for term in tokenize(text):
+                    weights[term] = weights.get(term, 0.0) + weight
+                    
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                insort(self._terms, term)
+            postings[doc_id] = weight
+        self._doc_terms[doc_id] = tuple(weights)
+        
+    def remove(self, doc_id: Hashable) -> bool:
+        """Remove a document from the index."""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return False
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+        return True
+        
+    def _expand(self, prefix: str) -> List[str]:
+        """Get all indexed terms starting with the given prefix."""
+        start = bisect_left(self._terms, prefix)
+        end = start
+        while end < len(self._terms) and self._terms[end].startswith(prefix):
+            end += 1
+        return self._terms[start:end]
+        
+    def search(self, query: str, limit: Optional[int] = None) -> List[Hashable]:
+        """
+        Find documents matching every query token, best matches first.
+        Each token matches indexed terms by prefix, so partial words work for type-ahead.
+        """
+        scores: Optional[Dict[Hashable, float]] = None
+        for token in tokenize(query):
+            token_scores: Dict[Hashable, float] = {}
+            for term in self._expand(token):
+                boost = EXACT_MATCH_BOOST if term == token else PREFIX_MATCH_BOOST
+                for doc_id, weight in self._postings[term].items():
+                    score = weight * boost
+                    if score > token_scores.get(doc_id, 0.0):
+                        token_scores[doc_id] = score
+                        
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    doc_id: score + token_scores[doc_id]
+                    for doc_id, score in scores.items()
+                    if doc_id in token_scores
+                }
+            if not scores:
+                return []
+                
+        if scores is None:
+            return []
+        if limit is None:
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        else:
+            ranked = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [doc_id for doc_id, _ in ranked]
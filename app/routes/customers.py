@@ -1,14 +1,22 @@
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
 from pydantic import BaseModel, EmailStr
 
 from app.models.customer import Customer
+from app.routes.orders import order_service, order_summaries
+from app.routes.pagination import MAX_PAGE_SIZE, decode_cursor, set_next_cursor
+from app.services.customer_indexes import DuplicateEmailError
 from app.services.customer_service import CustomerService
+from app.services.response_cache import ResponseCache, customer_key
 
 router = APIRouter(prefix="/customers", tags=["customers"])
 customer_service = CustomerService()
+response_cache = ResponseCache()
+
+# Matches returned by a customer search unless a limit is given
+DEFAULT_SEARCH_LIMIT = 10
 
 
 class CustomerCreate(BaseModel):
@@ -20,19 +28,59 @@ class CustomerCreate(BaseModel):
 
 @router.post("/", response_model=Customer)
 def create_customer(customer: CustomerCreate):
-    """Create a new customer."""
-    return customer_service.create_customer(
-        name=customer.name,
-        email=customer.email,
-        phone=customer.phone,
-        address=customer.address
-    )
+    """Create a new customer. Emails are unique regardless of case."""
+    try:
+        return customer_service.create_customer(
+            name=customer.name,
+            email=customer.email,
+            phone=customer.phone,
+            address=customer.address
+        )
+    except DuplicateEmailError as error:
+        raise HTTPException(status_code=409, detail=str(error))
 
 
 @router.get("/", response_model=List[Customer])
-def get_all_customers():
-    """Get all customers."""
-    return customer_service.get_all_customers()
+def get_all_customers(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """
+    Get all customers.
+    With limit or cursor, customers are returned a page at a time in the order they were added;
+    the cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    if limit is None and cursor is None:
+        return customer_service.get_all_customers()
+    customers, next_key = customer_service.get_customers_page(
+        after=decode_cursor(cursor, (int,))[0] if cursor else None,
+        limit=limit
+    )
+    set_next_cursor(response, None if next_key is None else (next_key,))
+    return customers
+
+
+@router.get("/search", response_model=List[Customer])
+def search_customers(
+    prefix: str = Query(..., min_length=1),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_PAGE_SIZE)
+):
+    """
+    Find customers by the first digits of their phone number or the start of their name
+    or of any word in it, for type-ahead. Matches on the whole name rank first, then
+    shorter names and phone numbers.
+    """
+    return customer_service.search_customers(prefix, limit)
+
+
+@router.get("/by-email/{email}", response_model=Customer)
+def get_customer_by_email(email: str):
+    """Get a customer by email, in any case."""
+    customer = customer_service.get_customer_by_email(email)
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return customer
 
 
 @router.get("/{customer_id}", response_model=Customer)
@@ -41,4 +89,17 @@ def get_customer(customer_id: UUID):
     customer = customer_service.get_customer(customer_id)
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
-    return customer 
\ No newline at end of file
+    return Response(
+        content=response_cache.get_or_encode(
+            customer_key(customer_id), lambda: customer.model_dump_json().encode()
+        ),
+        media_type="application/json"
+    ) 
+
+
+@router.get("/{customer_id}/orders", response_model=List[dict])
+def get_customer_orders(customer_id: UUID):
+    """Get a customer's orders, oldest first."""
+    if not customer_service.get_customer(customer_id):
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return order_summaries(order_service.get_orders_by_customer(customer_id))
\ No newline at end of file
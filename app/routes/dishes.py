@@ -1,14 +1,48 @@
-from typing import List, Optional
+import json
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Optional, Tuple
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 from app.models.dish import Dish
+from app.models.menu import MenuSnapshot
+from app.routes.pagination import MAX_PAGE_SIZE, decode_cursor, set_next_cursor
 from app.services.menu_service import MenuService
+from app.services.response_cache import ResponseCache, category_key, dish_key, dishes_key
 
 router = APIRouter(prefix="/dishes", tags=["dishes"])
 menu_service = MenuService()
+response_cache = ResponseCache()
+
+_dish_list_adapter = TypeAdapter(List[Dish])
+
+# Rows of a bulk import are validated in batches of this size as they stream in
+BULK_VALIDATION_BATCH_SIZE = 500
+
+
+def _not_modified(if_none_match: Optional[str], response: Response, snapshot: MenuSnapshot) -> Optional[Response]:
+    """
+    Tag the response with the version of the menu snapshot it is built from.
+    Returns a 304 response when the client already holds that version.
+    """
+    etag = snapshot.etag
+    if if_none_match:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        if "*" in candidates or etag in candidates or f"W/{etag}" in candidates:
+            return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
+
+
+def _cached_json(key: Hashable, encode: Callable[[], bytes], response: Response) -> Response:
+    """Serve a pre-encoded JSON body from the response cache, keeping the ETag."""
+    return Response(
+        content=response_cache.get_or_encode(key, encode),
+        media_type="application/json",
+        headers={"ETag": response.headers["etag"]}
+    )
 
 
 class DishCreate(BaseModel):
@@ -29,22 +63,185 @@ def create_dish(dish: DishCreate):
     )
 
 
+async def _iter_bulk_rows(request: Request) -> AsyncIterator[Any]:
+    """
+    Yield the raw rows of a bulk import request.
+    NDJSON bodies are parsed line by line as they stream in; anything else must be a JSON array.
+    Rows that are not valid JSON are yielded as the JSONDecodeError itself.
+    """
+    if "ndjson" in request.headers.get("content-type", ""):
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield _parse_row(line)
+        if buffer.strip():
+            yield _parse_row(buffer)
+        return
+        
+    rows = _parse_row(await request.body())
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array or NDJSON body")
+    for row in rows:
+        yield row
+
+
+def _parse_row(raw: bytes) -> Any:
+    """Parse one JSON document, returning the decode error instead of raising it."""
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError as error:
+        return error
+
+
+def _validate_batch(batch: List[Tuple[int, Any]], dishes: List[Dish], errors: List[dict]) -> None:
+    """Validate a batch of numbered rows, collecting dishes and per-row errors."""
+    for row_number, row in batch:
+        if isinstance(row, json.JSONDecodeError):
+            errors.append({"row": row_number, "errors": [{"loc": [], "msg": f"Invalid JSON: {row.msg}"}]})
+            continue
+        try:
+            dish = DishCreate.model_validate(row)
+        except ValidationError as error:
+            errors.append({
+                "row": row_number,
+                "errors": [{"loc": list(err["loc"]), "msg": err["msg"]} for err in error.errors()]
+            })
+            continue
+        dishes.append(Dish(**dish.model_dump()))
+
+
+@router.post("/bulk", response_model=dict)
+async def bulk_import_dishes(request: Request):
+    """
+    Import many dishes at once from a JSON array or an NDJSON stream.
+    All valid rows are added under a single menu version; invalid rows are reported by row number.
+    """
+    dishes: List[Dish] = []
+    errors: List[dict] = []
+    batch: List[Tuple[int, Any]] = []
+    row_number = 0
+    
+    async for row in _iter_bulk_rows(request):
+        batch.append((row_number, row))
+        row_number += 1
+        if len(batch) >= BULK_VALIDATION_BATCH_SIZE:
+            _validate_batch(batch, dishes, errors)
+            batch = []
+    _validate_batch(batch, dishes, errors)
+    
+    added = await run_in_threadpool(menu_service.add_dishes, dishes)
+    return {
+        "imported": len(added),
+        "failed": len(errors),
+        "errors": errors,
+        "version": menu_service.get_menu_snapshot().version
+    }
+
+
 @router.get("/", response_model=List[Dish])
-def get_all_dishes():
-    """Get all dishes."""
-    return menu_service.get_all_dishes()
+def get_all_dishes(
+    response: Response,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    sort: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Get all dishes.
+    Filtering by price or sorting with sort=price / sort=-price returns dishes in price order.
+    With limit or cursor, dishes are returned a page at a time; the cursor for the next page
+    is returned in the X-Next-Cursor header and is only valid with the same filters and sort.
+    """
+    if sort not in (None, "price", "-price"):
+        raise HTTPException(status_code=400, detail=f"Invalid sort: {sort}")
+    snapshot = menu_service.get_menu_snapshot()
+    not_modified = _not_modified(if_none_match, response, snapshot)
+    if not_modified:
+        return not_modified
+    by_price = min_price is not None or max_price is not None or sort is not None
+    if limit is not None or cursor is not None:
+        # Pages are cheap to build and rarely requested twice, so they bypass the response cache
+        if by_price:
+            dishes, next_key = menu_service.get_dishes_by_price_page(
+                min_price, max_price, descending=sort == "-price",
+                after=decode_cursor(cursor, (float, int)) if cursor else None,
+                limit=limit
+            )
+        else:
+            dishes, next_key = menu_service.get_dishes_page(
+                after=decode_cursor(cursor, (int,))[0] if cursor else None,
+                limit=limit
+            )
+            next_key = None if next_key is None else (next_key,)
+        set_next_cursor(response, next_key)
+        return dishes
+    if not by_price:
+        return _cached_json(
+            dishes_key(snapshot.etag),
+            lambda: _dish_list_adapter.dump_json(list(snapshot.dishes)),
+            response
+        )
+    return menu_service.get_dishes_by_price(min_price, max_price, descending=sort == "-price")
+
+
+@router.get("/categories", response_model=Dict[str, int])
+def get_category_counts(response: Response, if_none_match: Optional[str] = Header(None)):
+    """Get the number of dishes in each category."""
+    not_modified = _not_modified(if_none_match, response, menu_service.get_menu_snapshot())
+    if not_modified:
+        return not_modified
+    return menu_service.get_category_counts()
+
+
+@router.get("/search", response_model=List[Dish])
+def search_dishes(
+    response: Response,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Search dishes by name and description, matching word prefixes."""
+    not_modified = _not_modified(if_none_match, response, menu_service.get_menu_snapshot())
+    if not_modified:
+        return not_modified
+    return menu_service.search_dishes(q, limit)
 
 
 @router.get("/{dish_id}", response_model=Dish)
-def get_dish(dish_id: UUID):
+def get_dish(
+    dish_id: UUID,
+    response: Response,
+    if_none_match: Optional[str] = Header(None)
+):
     """Get a dish by ID."""
+    not_modified = _not_modified(if_none_match, response, menu_service.get_menu_snapshot())
+    if not_modified:
+        return not_modified
     dish = menu_service.get_dish(dish_id)
     if not dish:
         raise HTTPException(status_code=404, detail="Dish not found")
-    return dish
+    return _cached_json(dish_key(dish_id), lambda: dish.model_dump_json().encode(), response)
 
 
 @router.get("/category/{category}", response_model=List[Dish])
-def get_dishes_by_category(category: str):
+def get_dishes_by_category(
+    category: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None)
+):
     """Get all dishes in a category."""
-    return menu_service.get_dishes_by_category(category) 
\ No newline at end of file
+    snapshot = menu_service.get_menu_snapshot()
+    not_modified = _not_modified(if_none_match, response, snapshot)
+    if not_modified:
+        return not_modified
+    # Filtered from the same snapshot as the ETag, so the body can't be of a newer menu
+    return _cached_json(
+        category_key(category, snapshot.etag),
+        lambda: _dish_list_adapter.dump_json([dish for dish in snapshot.dishes if dish.category == category]),
+        response
+    ) 
\ No newline at end of file
@@ -0,0 +1,122 @@
+import json
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.models.order_events import OrderEventBus
+from app.services.kitchen_notifier import KitchenNotifier
+from app.services.kitchen_scheduler import KitchenScheduler, KitchenTicket
+from app.services.kitchen_stream import KitchenEvent, KitchenStream
+from app.services.order_service import OrderService
+
+router = APIRouter(prefix="/kitchen", tags=["kitchen"])
+order_service = OrderService()
+kitchen_stream = KitchenStream()
+kitchen_notifier = KitchenNotifier(order_service, stream=kitchen_stream)
+kitchen_scheduler = KitchenScheduler(order_service)
+
+# One subscription covers every order; the bus only holds weak references,
+# so the module-level services above keep them alive.
+OrderEventBus().subscribe(kitchen_notifier)
+OrderEventBus().subscribe(kitchen_scheduler)
+
+
+def use_scheduler(scheduler: KitchenScheduler) -> None:
+    """Replace the kitchen scheduler, such as with one whose queue is shared between workers."""
+    global kitchen_scheduler
+    OrderEventBus().unsubscribe(kitchen_scheduler)
+    kitchen_scheduler = scheduler
+    OrderEventBus().subscribe(kitchen_scheduler)
+
+
+def use_stream(stream: KitchenStream) -> None:
+    """Replace the stream screens connect to, such as with one shared between workers."""
+    global kitchen_stream
+    kitchen_stream = stream
+    kitchen_notifier.stream = stream
+
+
+# Comment lines sent on idle connections so proxies don't close them
+KEEPALIVE_SECONDS = 15.0
+
+
+def _format_sse(event: KitchenEvent) -> str:
+    """Encode an event in the Server-Sent Events wire format."""
+    return f"id: {event.id}\nevent: {event.type}\ndata: {json.dumps(event.data)}\n\n"
+
+
+def _ticket_to_dict(ticket: KitchenTicket) -> dict:
+    """Convert a kitchen ticket to a response payload."""
+    return {
+        "order_id": ticket.order_id,
+        "order_type": ticket.order_type.value,
+        "created_at": datetime.fromtimestamp(ticket.created_at_us / 1_000_000)
+    }
+
+
+@router.get("/queue", response_model=List[dict])
+def get_kitchen_queue(limit: int = Query(50, ge=1, le=1000)):
+    """Get the queued kitchen tickets in the order stations will receive them."""
+    return [_ticket_to_dict(ticket) for ticket in kitchen_scheduler.get_queue(limit)]
+
+
+@router.post("/next", response_model=dict)
+def pull_next_ticket(station: str = "default"):
+    """
+    Mark the station's current order as ready and hand it the next ticket.
+    The new ticket's order moves to processing.
+    """
+    finished, ticket = kitchen_scheduler.pull_next(station)
+    if ticket is None:
+        if finished is None:
+            raise HTTPException(status_code=404, detail="No tickets waiting")
+        return {"station": station, "completed_order_id": finished, "ticket": None}
+    return {
+        "station": station,
+        "completed_order_id": finished,
+        "ticket": _ticket_to_dict(ticket)
+    }
+
+
+@router.get("/stream")
+async def stream_kitchen_events(
+    request: Request,
+    last_event_id: Optional[int] = Query(None),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Stream order deltas to kitchen display screens as Server-Sent Events.
+    Reconnecting screens resume after the Last-Event-ID header (or last_event_id query parameter).
+    """
+    if last_event_id is None and last_event_id_header and last_event_id_header.isdigit():
+        last_event_id = int(last_event_id_header)
+    subscription = kitchen_stream.connect(last_event_id)
+    
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                batch = await subscription.next_events(KEEPALIVE_SECONDS)
+                if not batch:
+                    yield ": keep-alive\n\n"
+                for event in batch:
+                    yield _format_sse(event)
+        finally:
+            kitchen_stream.disconnect(subscription)
+            
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/notifications/metrics", response_model=dict)
+def get_notification_metrics():
+    """Get the kitchen notification queue depth and counters."""
+    metrics = kitchen_notifier.get_metrics()
+    metrics["stream_connections"] = kitchen_stream.connection_count
+    metrics["last_event_id"] = kitchen_stream.last_event_id
+    return metrics
@@ -1,17 +1,19 @@
+from collections import Counter
+from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
 from pydantic import BaseModel
 
-from app.models.order import Order, OrderStatus
-from app.services.kitchen_notifier import KitchenNotifier
+from app.models.order import MAX_DISH_QUANTITY, Order, OrderStatus, to_timestamp_us
+from app.models.pricing import get_pricing_engine
+from app.routes.pagination import MAX_PAGE_SIZE, decode_cursor, set_next_cursor
 from app.services.order_factory import OrderType
 from app.services.order_service import OrderService
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 order_service = OrderService()
-kitchen_notifier = KitchenNotifier(order_service)
 
 
 class OrderCreate(BaseModel):
@@ -30,33 +32,28 @@ def create_order(order: OrderCreate):
     try:
         # Convert string order type to enum
         order_type = OrderType(order.order_type)
-        
-        # Create the order
-        new_order = order_service.create_order(
-            customer_id=order.customer_id,
-            dish_ids=order.dish_ids,
-            order_type=order_type
-        )
-        
-        # Attach kitchen notifier to the order
-        new_order.attach(kitchen_notifier)
-        
-        # Notify observers (kitchen)
-        new_order.notify()
-        
-        return {
-            "id": new_order.id,
-            "status": new_order.status.value,
-            "total": new_order.calculate_total()
-        }
     except ValueError:
         raise HTTPException(status_code=400, detail=f"Invalid order type: {order.order_type}")
+    if order.dish_ids and max(Counter(order.dish_ids).values()) > MAX_DISH_QUANTITY:
+        raise HTTPException(status_code=400, detail=f"An order can hold at most {MAX_DISH_QUANTITY} of each dish")
+        
+    # Create the order
+    new_order = order_service.create_order(
+        customer_id=order.customer_id,
+        dish_ids=order.dish_ids,
+        order_type=order_type
+    )
+    
+    return {
+        "id": new_order.id,
+        "status": new_order.status.value,
+        "total": new_order.calculate_total()
+    }
 
 
-@router.get("/", response_model=List[dict])
-def get_all_orders():
-    """Get all orders."""
-    orders = order_service.get_all_orders()
+def order_summaries(orders: List[Order]) -> List[dict]:
+    """Describe orders for list responses, pricing them in one batch."""
+    totals = get_pricing_engine().price_orders(orders)
     return [
         {
             "id": order.id,
@@ -64,13 +61,48 @@ def get_all_orders():
             "status": order.status.value,
             "created_at": order.created_at,
             "updated_at": order.updated_at,
-            "total": order.calculate_total(),
-            "dish_count": len(order.dishes)
+            "total": total / 100,
+            "dish_count": order.dish_count
         }
-        for order in orders
+        for order, total in zip(orders, totals)
     ]
 
 
+@router.get("/", response_model=List[dict])
+def get_all_orders(
+    response: Response,
+    status: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    created_from: Optional[datetime] = Query(None, alias="from"),
+    created_to: Optional[datetime] = Query(None, alias="to")
+):
+    """
+    Get all orders, optionally only those with a status.
+    With limit, cursor, from or to, orders are returned oldest first, created in [from, to),
+    a page at a time; the cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    order_status = None
+    if status is not None:
+        try:
+            order_status = OrderStatus(status)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+    if limit is None and cursor is None and created_from is None and created_to is None:
+        if order_status is None:
+            return order_summaries(order_service.get_all_orders())
+        return order_summaries(order_service.get_orders_by_status(order_status))
+    orders, next_key = order_service.get_orders_page(
+        after=decode_cursor(cursor, (int, int)) if cursor else None,
+        start_us=to_timestamp_us(created_from) if created_from else None,
+        end_us=to_timestamp_us(created_to) if created_to else None,
+        limit=limit,
+        status=order_status
+    )
+    set_next_cursor(response, next_key)
+    return order_summaries(orders)
+
+
 @router.get("/{order_id}", response_model=dict)
 def get_order(order_id: UUID):
     """Get an order by ID."""
@@ -84,7 +116,11 @@ def get_order(order_id: UUID):
         "status": order.status.value,
         "created_at": order.created_at,
         "updated_at": order.updated_at,
-        "dishes": order.dishes,
+        "line_items": [
+            {"dish": item.dish, "quantity": item.quantity}
+            for item in order.line_items
+        ],
+        "dish_count": order.dish_count,
         "total": order.calculate_total()
     }
 
@@ -119,7 +155,26 @@ def add_dish_to_order(order_id: UUID, dish_id: UUID):
     return {
         "id": order_id,
         "total": order.calculate_total(),
-        "dish_count": len(order.dishes)
+        "dish_count": order.dish_count
+    }
+
+
+@router.put("/{order_id}/dishes/{dish_id}", response_model=dict)
+def set_dish_quantity(order_id: UUID, dish_id: UUID, quantity: int = Query(..., ge=0, le=MAX_DISH_QUANTITY)):
+    """Set how many of a dish are in an order; a quantity of zero removes the dish."""
+    success = order_service.set_dish_quantity(order_id, dish_id, quantity)
+    
+    if not success:
+        raise HTTPException(
+            status_code=400, 
+            detail="Could not set dish quantity. Order may not exist, dish may not exist, or order status may not allow modifications."
+        )
+        
+    order = order_service.get_order(order_id)
+    return {
+        "id": order_id,
+        "total": order.calculate_total(),
+        "dish_count": order.dish_count
     }
 
 
@@ -138,5 +193,5 @@ def remove_dish_from_order(order_id: UUID, dish_id: UUID):
     return {
         "id": order_id,
         "total": order.calculate_total(),
-        "dish_count": len(order.dishes)
+        "dish_count": order.dish_count
     } 
\ No newline at end of file
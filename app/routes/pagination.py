@@ -0,0 +1,35 @@
+import base64
+import binascii
+import json
+from typing import Any, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+
+# The cursor for the next page is returned in this header; list bodies stay plain JSON arrays
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    """Encode a page key as an opaque, URL-safe cursor."""
+    return base64.urlsafe_b64encode(json.dumps(list(key), separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Tuple[type, ...]) -> Tuple[Any, ...]:
+    """Decode a cursor made by encode_cursor, checking that its key has the expected types."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        key = None
+    if (
+        not isinstance(key, list) or len(key) != len(types)
+        or not all(isinstance(value, kind) and not isinstance(value, bool) for value, kind in zip(key, types))
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return tuple(key)
+
+
+def set_next_cursor(response: Response, next_key: Optional[Sequence[Any]]) -> None:
+    """Point the client at the next page, if there is one."""
+    if next_key is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(next_key)
@@ -0,0 +1,175 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from app.models.customer import Customer
+from app.models.locks import ReadWriteLock
+from app.models.prefix_trie import PrefixTrie
+from app.models.search_index import tokenize
+
+# A search is for a phone number when it holds digits and nothing but phone punctuation
+_PHONE_QUERY_RE = re.compile(r"^[\d\s+().-]*\d[\d\s+().-]*$")
+_NON_DIGIT_RE = re.compile(r"\D")
+
+
+class DuplicateEmailError(ValueError):
+    """Raised when adding a customer whose email another customer already has."""
+    
+    def __init__(self, email: str):
+        super().__init__(f"A customer with email {email} already exists")
+        self.email = email
+
+
+def normalize_email(email: str) -> str:
+    """Get the form of an email address that is compared for uniqueness."""
+    return email.strip().casefold()
+
+
+def normalize_phone(phone: str) -> str:
+    """Get the digits of a phone number, the form it is searched in."""
+    return _NON_DIGIT_RE.sub("", phone)
+
+
+def _name_keys(name: str) -> List[str]:
+    """Get the searchable forms of a name: the whole name, then the name from each later word."""
+    words = tokenize(name)
+    return [" ".join(words[start:]) for start in range(len(words))]
+
+
+class CustomerIndexes:
+    """
+    Secondary indexes over customers, maintained by OrderDatabase.
+    Customers are never deleted, so their position in the order they were added is a stable
+    key: a page resumes from a position with a single slice, wherever it starts. A customer
+    that could not be stored leaves an empty position behind unless it was the last one.
+    Emails are unique regardless of case, and are indexed in their normalized form.
+    
+    Names and phone digits are kept in prefix tries for type-ahead search. Names are found
+    from the start of any word, but matches from the start of the whole name rank first.
+    """
+    
+    def __init__(self):
+        self._ids: List[Optional[UUID]] = []
+        self._positions: Dict[UUID, int] = {}
+        self._by_email: Dict[str, UUID] = {}
+        self._names = PrefixTrie()
+        self._name_words = PrefixTrie()
+        self._phones = PrefixTrie()
+        self._search_keys: Dict[UUID, Tuple[List[str], str]] = {}
+        self._lock = ReadWriteLock()
+        
+    def add(self, customer: Customer, unique: bool = True) -> None:
+        """
+        Index a customer; storing a customer again keeps its original position.
+        Raises DuplicateEmailError if another customer has the same email, unless unique is
+        False, in which case the email is taken over by this customer.
+        """
+        with self._lock.write():
+            self._add(customer, unique)
+            
+    def add_all(self, customers: Iterable[Customer]) -> None:
+        """Index stored customers at once; stored duplicates take over the email as in add."""
+        with self._lock.write():
+            for customer in customers:
+                self._add(customer, unique=False)
+                
+    def _add(self, customer: Customer, unique: bool) -> None:
+        """Index a customer. Must be called with the write lock held."""
+        email = normalize_email(customer.email)
+        owner = self._by_email.get(email)
+        if unique and owner is not None and owner != customer.id:
+            raise DuplicateEmailError(customer.email)
+        self._by_email[email] = customer.id
+        if customer.id not in self._positions:
+            self._positions[customer.id] = len(self._ids)
+            self._ids.append(customer.id)
+        self._index_search_keys(customer)
+        
+    def _index_search_keys(self, customer: Customer) -> None:
+        """Put a customer's name and phone in the tries. Must be called with the write lock held."""
+        keys = (_name_keys(customer.name), normalize_phone(customer.phone or ""))
+        previous = self._search_keys.get(customer.id)
+        if previous == keys:
+            return
+        if previous is not None:
+            self._remove_search_keys(customer.id, *previous)
+        names, phone = keys
+        if names:
+            self._names.add(names[0], customer.id)
+        for name in names[1:]:
+            self._name_words.add(name, customer.id)
+        if phone:
+            self._phones.add(phone, customer.id)
+        self._search_keys[customer.id] = keys
+        
+    def _remove_search_keys(self, customer_id: UUID, names: List[str], phone: str) -> None:
+        if names:
+            self._names.remove(names[0], customer_id)
+        for name in names[1:]:
+            self._name_words.remove(name, customer_id)
+        if phone:
+            self._phones.remove(phone, customer_id)
+            
+    def remove(self, customer: Customer, previous: Optional[Customer] = None) -> None:
+        """
+        Undo indexing a customer that could not be stored: free its email, take it out of the
+        tries and the paging order. If an earlier version of it is stored, pass it as previous
+        to index that version again instead, in its original position.
+        """
+        with self._lock.write():
+            email = normalize_email(customer.email)
+            if self._by_email.get(email) == customer.id:
+                del self._by_email[email]
+            keys = self._search_keys.pop(customer.id, None)
+            if keys is not None:
+                self._remove_search_keys(customer.id, *keys)
+            if previous is not None:
+                self._add(previous, unique=False)
+                return
+            position = self._positions.pop(customer.id, None)
+            if position is None:
+                return
+            # Later customers keep their positions, so only the last one can really go
+            if position == len(self._ids) - 1:
+                self._ids.pop()
+            else:
+                self._ids[position] = None
+                
+    def get_by_email(self, email: str) -> Optional[UUID]:
+        """Get the ID of the customer with an email, in any case."""
+        with self._lock.read():
+            return self._by_email.get(normalize_email(email))
+            
+    def search(self, prefix: str, limit: Optional[int] = None) -> List[UUID]:
+        """
+        Get the IDs of customers whose phone number starts with the digits of prefix, if it
+        looks like a phone number, or else whose name or a word of it starts with prefix.
+        Shorter matches rank first, as they are closer to what was typed.
+        """
+        with self._lock.read():
+            if _PHONE_QUERY_RE.match(prefix):
+                return self._phones.search(normalize_phone(prefix), limit)
+            query = " ".join(tokenize(prefix))
+            if not query:
+                return []
+            matches = dict.fromkeys(self._names.search(query, limit))
+            if limit is None or len(matches) < limit:
+                # limit values are enough, as at most len(matches) of them are repeats
+                for customer_id in self._name_words.search(query, limit):
+                    matches[customer_id] = None
+                    if limit is not None and len(matches) >= limit:
+                        break
+            return list(matches)
+            
+    def get_page(self, after: Optional[int] = None, limit: Optional[int] = None) -> Tuple[List[UUID], Optional[int]]:
+        """
+        Get the IDs of customers in the order they were added, starting after the given position.
+        Returns the IDs and the position to pass as `after` for the next page, or None if this
+        is the last page.
+        """
+        with self._lock.read():
+            start = 0 if after is None else max(after + 1, 0)
+            stop = len(self._ids) if limit is None else min(len(self._ids), start + limit)
+            ids = [customer_id for customer_id in self._ids[start:stop] if customer_id is not None]
+            next_key = stop - 1 if start < stop < len(self._ids) else None
+        return ids, next_key
@@ -1,8 +1,9 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 
 from app.models.customer import Customer
 from app.services.order_database import OrderDatabase
+from app.services.response_cache import ResponseCache, customer_key
 
 
 class CustomerService:
@@ -13,17 +14,31 @@ class CustomerService:
     
     def __init__(self):
         self.db = OrderDatabase()
+        self.cache = ResponseCache()
         
     def create_customer(self, name: str, email: str, phone: Optional[str] = None, address: Optional[str] = None) -> Customer:
-        """Create a new customer."""
+        """Create a new customer, raising DuplicateEmailError if another customer has the email."""
         customer = Customer(name=name, email=email, phone=phone, address=address)
         self.db.add_customer(customer)
+        self.cache.invalidate(customer_key(customer.id))
         return customer
         
     def get_customer(self, customer_id: UUID) -> Optional[Customer]:
         """Get a customer by ID."""
         return self.db.get_customer(customer_id)
         
+    def get_customer_by_email(self, email: str) -> Optional[Customer]:
+        """Get the customer with an email, in any case."""
+        return self.db.get_customer_by_email(email)
+        
     def get_all_customers(self) -> List[Customer]:
         """Get all customers."""
-        return self.db.get_all_customers() 
\ No newline at end of file
+        return self.db.get_all_customers()
+        
+    def search_customers(self, prefix: str, limit: Optional[int] = None) -> List[Customer]:
+        """Find customers by the start of their name or phone number, best matches first."""
+        return self.db.search_customers(prefix, limit)
+        
+    def get_customers_page(self, after: Optional[int] = None, limit: Optional[int] = None) -> Tuple[List[Customer], Optional[int]]:
+        """Get a page of customers in the order they were added, and the key of the next page."""
+        return self.db.get_customers_page(after, limit)
\ No newline at end of file
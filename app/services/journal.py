@@ -0,0 +1,289 @@
+import os
+import struct
+import threading
+import zlib
+from enum import IntEnum
+from typing import Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from app.models.customer import Customer
+from app.models.dish import Dish
+from app.models.order import LineItem, Order, OrderStatus
+from app.models.order_type import OrderType
+
+
+class RecordType(IntEnum):
+    DISH_ADDED = 1       # a dish added to the menu
+    DISH_DEFINED = 2     # a dish referenced by orders but not on the menu
+    CUSTOMER_ADDED = 3
+    ORDER_ADDED = 4      # full order state; also used for orders in snapshots
+    STATUS_CHANGED = 5
+    ITEM_SET = 6         # the new quantity of one dish in an order
+    ORDER_DELETED = 7
+    SNAPSHOT_END = 8     # marks a snapshot as complete
+
+
+# Every record is framed as: body length, CRC-32 of the body, then the body (type byte + payload).
+# A torn or corrupted tail is detected by a short read or a CRC mismatch.
+_HEADER = struct.Struct("<II")
+_TYPE = struct.Struct("<B")
+_UUID = struct.Struct("<16s")
+_STRING_LENGTH = struct.Struct("<H")
+_NO_STRING = 0xFFFF
+_DISH = struct.Struct("<16sd")
+_ORDER = struct.Struct("<16s16sBBqqH")
+_ORDER_ITEM = struct.Struct("<16sI")
+_STATUS = struct.Struct("<16sBq")
+_ITEM = struct.Struct("<16s16sIq")
+_SNAPSHOT_END = struct.Struct("<QQQ")
+
+# Enums are stored by their position
+_STATUSES = list(OrderStatus)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+_ORDER_TYPES = list(OrderType)
+_ORDER_TYPE_CODES = {order_type: code for code, order_type in enumerate(_ORDER_TYPES)}
+
+
+def _frame(record_type: RecordType, payload: bytes) -> bytes:
+    body = _TYPE.pack(record_type) + payload
+    return _HEADER.pack(len(body), zlib.crc32(body)) + body
+
+
+def _encode_strings(*values: Optional[str]) -> bytes:
+    parts = []
+    for value in values:
+        if value is None:
+            parts.append(_STRING_LENGTH.pack(_NO_STRING))
+        else:
+            encoded = value.encode("utf-8")
+            if len(encoded) >= _NO_STRING:
+                raise ValueError(f"String too long to journal: {len(encoded)} bytes")
+            parts.append(_STRING_LENGTH.pack(len(encoded)) + encoded)
+    return b"".join(parts)
+
+
+def _decode_strings(payload: memoryview, offset: int, count: int) -> List[Optional[str]]:
+    values: List[Optional[str]] = []
+    for _ in range(count):
+        (length,) = _STRING_LENGTH.unpack_from(payload, offset)
+        offset += _STRING_LENGTH.size
+        if length == _NO_STRING:
+            values.append(None)
+        else:
+            values.append(str(payload[offset:offset + length], "utf-8"))
+            offset += length
+    return values
+
+
+# Encoding
+def encode_dish(dish: Dish, on_menu: bool = True) -> bytes:
+    """Record a dish, either added to the menu or only referenced by orders."""
+    record_type = RecordType.DISH_ADDED if on_menu else RecordType.DISH_DEFINED
+    payload = _DISH.pack(dish.id.bytes, dish.price) + _encode_strings(dish.name, dish.description, dish.category)
+    return _frame(record_type, payload)
+
+
+def encode_customer(customer: Customer) -> bytes:
+    """Record an added customer."""
+    payload = customer.id.bytes + _encode_strings(customer.name, customer.email, customer.phone, customer.address)
+    return _frame(RecordType.CUSTOMER_ADDED, payload)
+
+
+def encode_order(order: Order, items: Optional[List[LineItem]] = None) -> bytes:
+    """Record the full state of an order, optionally with line items the caller already read."""
+    if items is None:
+        items = order.line_items
+    payload = [_ORDER.pack(
+        order.id.bytes, order.customer_id.bytes, _ORDER_TYPE_CODES[order.order_type],
+        _STATUS_CODES[order.status], order.created_at_us, order.updated_at_us, len(items)
+    )]
+    payload.extend(_ORDER_ITEM.pack(dish.id.bytes, quantity) for dish, quantity in items)
+    return _frame(RecordType.ORDER_ADDED, b"".join(payload))
+
+
+def encode_status(order: Order) -> bytes:
+    """Record an order's current status."""
+    return _frame(
+        RecordType.STATUS_CHANGED,
+        _STATUS.pack(order.id.bytes, _STATUS_CODES[order.status], order.updated_at_us)
+    )
+
+
+def encode_item(order: Order, dish: Dish) -> bytes:
+    """Record the current quantity of one dish in an order."""
+    return _frame(
+        RecordType.ITEM_SET,
+        _ITEM.pack(order.id.bytes, dish.id.bytes, order.get_quantity(dish.id), order.updated_at_us)
+    )
+
+
+def encode_order_deleted(order_id: UUID) -> bytes:
+    """Record a deleted order."""
+    return _frame(RecordType.ORDER_DELETED, order_id.bytes)
+
+
+def encode_snapshot_end(dishes: int, customers: int, orders: int) -> bytes:
+    """Record the end of a complete snapshot."""
+    return _frame(RecordType.SNAPSHOT_END, _SNAPSHOT_END.pack(dishes, customers, orders))
+
+
+# Decoding; records are returned as plain tuples for the caller to apply
+def decode_dish(payload: memoryview) -> Dish:
+    dish_id, price = _DISH.unpack_from(payload)
+    name, description, category = _decode_strings(payload, _DISH.size, 3)
+    # Journaled dishes were validated when they were first added
+    return Dish.model_construct(
+        id=UUID(bytes=dish_id), name=name, price=price, description=description, category=category
+    )
+
+
+def decode_customer(payload: memoryview) -> Customer:
+    name, email, phone, address = _decode_strings(payload, _UUID.size, 4)
+    return Customer.model_construct(
+        id=UUID(bytes=bytes(payload[:_UUID.size])), name=name, email=email, phone=phone, address=address
+    )
+
+
+def decode_order(
+    payload: memoryview
+) -> Tuple[bytes, bytes, OrderType, OrderStatus, int, int, List[Tuple[bytes, int]]]:
+    """Decode an order as (id, customer id, type, status, created, updated, [(dish id, quantity)])."""
+    order_id, customer_id, order_type, status, created_at_us, updated_at_us, count = _ORDER.unpack_from(payload)
+    items = list(_ORDER_ITEM.iter_unpack(payload[_ORDER.size:_ORDER.size + count * _ORDER_ITEM.size]))
+    return (
+        order_id, customer_id, _ORDER_TYPES[order_type], _STATUSES[status],
+        created_at_us, updated_at_us, items
+    )
+
+
+def decode_status(payload: memoryview) -> Tuple[bytes, OrderStatus, int]:
+    """Decode a status change as (order id, status, updated)."""
+    order_id, status, updated_at_us = _STATUS.unpack_from(payload)
+    return order_id, _STATUSES[status], updated_at_us
+
+
+def decode_item(payload: memoryview) -> Tuple[bytes, bytes, int, int]:
+    """Decode a quantity change as (order id, dish id, quantity, updated)."""
+    return _ITEM.unpack_from(payload)
+
+
+def decode_order_deleted(payload: memoryview) -> bytes:
+    return bytes(payload[:_UUID.size])
+
+
+def read_records(data: bytes) -> Iterator[Tuple[int, memoryview, int]]:
+    """
+    Iterate over (record type, payload, end offset) of the framed records in data.
+    Stops at the first incomplete or corrupted record; the last end offset seen is
+    where the valid part of the data ends.
+    """
+    view = memoryview(data)
+    offset = 0
+    end = len(data)
+    header_size = _HEADER.size
+    while offset + header_size <= end:
+        length, checksum = _HEADER.unpack_from(view, offset)
+        start = offset + header_size
+        stop = start + length
+        if length < 1 or stop > end:
+            return
+        body = view[start:stop]
+        if zlib.crc32(body) != checksum:
+            return
+        offset = stop
+        yield body[0], body[1:], offset
+
+
+class Journal:
+    """
+    Append-only journal file with group commit.
+    Writers append framed records to an in-memory buffer and get back a sequence number;
+    a background thread writes out and fsyncs everything buffered so far in one go, so any
+    number of concurrent writers share a single fsync. wait() blocks until a record is durable.
+    """
+    
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+        self._file = open(path, "ab")
+        self._pending = bytearray()
+        self._appended = 0
+        self._durable = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        # Held while taking and writing out the buffer, so writes reach the file in order
+        self._io_lock = threading.Lock()
+        self.fsyncs = 0
+        self._flusher = threading.Thread(target=self._run, name="journal-flusher", daemon=True)
+        self._flusher.start()
+        
+    def append(self, record: bytes) -> int:
+        """Buffer a record and return its sequence number."""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The journal is closed")
+            self._pending += record
+            self._appended += 1
+            self._condition.notify_all()
+            return self._appended
+            
+    def wait(self, sequence: int) -> None:
+        """Block until the record with the given sequence number is on disk."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._durable >= sequence)
+            
+    def rotate(self, path: str) -> None:
+        """Write out everything buffered, then continue in a new file."""
+        with self._io_lock:
+            self._flush()
+            self._file.close()
+            self.path = path
+            self._file = open(path, "ab")
+            if self.fsync:
+                fsync_directory(path)
+                
+    def _run(self) -> None:
+        """Flusher loop: write out the buffer whenever something is in it."""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if self._closed:
+                    return
+            with self._io_lock:
+                self._flush()
+                
+    def _flush(self) -> None:
+        """Write out and sync the buffer. Must be called with the I/O lock held."""
+        with self._condition:
+            data, self._pending = self._pending, bytearray()
+            sequence = self._appended
+        if data:
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+                self.fsyncs += 1
+        with self._condition:
+            self._durable = max(self._durable, sequence)
+            self._condition.notify_all()
+            
+    def close(self) -> None:
+        """Write out everything buffered and close the file."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._flusher.join()
+        with self._io_lock:
+            self._flush()
+            self._file.close()
+
+
+def fsync_directory(path: str) -> None:
+    """Make a file's creation or rename durable."""
+    directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
@@ -0,0 +1,364 @@
+import os
+import re
+import threading
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from app.models.customer import Customer
+from app.models.dish import Dish
+from app.models.order import Order, intern_dish
+from app.services.journal import (
+    Journal,
+    RecordType,
+    decode_customer,
+    decode_dish,
+    decode_item,
+    decode_order,
+    decode_order_deleted,
+    decode_status,
+    encode_customer,
+    encode_dish,
+    encode_item,
+    encode_order,
+    encode_order_deleted,
+    encode_snapshot_end,
+    encode_status,
+    fsync_directory,
+    read_records,
+)
+from app.services.storage_backend import DEFAULT_ARCHIVE_AFTER, InMemoryBackend
+
+SNAPSHOT_PREFIX = "snapshot"
+JOURNAL_PREFIX = "journal"
+# Journal records written between automatic snapshots
+DEFAULT_SNAPSHOT_EVERY = 100_000
+# Records encoded per write while saving a snapshot
+SNAPSHOT_CHUNK_SIZE = 10_000
+
+_FILE_NAME = re.compile(r"^(snapshot|journal)-(\d{10})\.bin$")
+
+
+class JournaledBackend(InMemoryBackend):
+    """
+    In-memory backend made durable by an append-only journal of changes plus periodic snapshots.
+    
+    Every change is encoded as a small binary record (a new order, a status, the new quantity
+    of one dish, ...), then applied in memory and appended to the journal, so a change that
+    can't be journaled is never applied. Writes return once their record is fsynced;
+    concurrent writers share fsyncs through the journal's group commit.
+    
+    Every snapshot_every records, a background thread switches to a new journal file and
+    saves a compact snapshot of the whole state, after which older files are deleted.
+    Records only ever set absolute values, so replaying the journal tail over a snapshot taken
+    while writes continued still ends in the right state. On startup the newest snapshot is
+    loaded and the journal files written since are replayed; a record torn by a crash is cut off.
+    Closed orders are archived as in InMemoryBackend, and all of them right after recovery.
+    """
+    
+    def __init__(
+        self,
+        directory: str,
+        fsync: bool = True,
+        snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+        archive_after: Optional[float] = DEFAULT_ARCHIVE_AFTER
+    ):
+        super().__init__(archive_after)
+        self.directory = directory
+        self.fsync = fsync
+        self.snapshot_every = snapshot_every
+        os.makedirs(directory, exist_ok=True)
+        # Every dish journaled so far, so orders can be rebuilt from dish IDs on recovery
+        self._known_dishes: Dict[UUID, Dish] = {}
+        self._menu_dish_ids: Set[UUID] = set()
+        # Held while applying a change and appending its record, so records follow the order of changes
+        self._journal_lock = threading.Lock()
+        # One snapshot at a time
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._records_since_snapshot = 0
+        self.recovered_records = 0
+        self._generation = self._recover()
+        if archive_after is not None:
+            self.archive_closed_orders()
+        self._journal = Journal(self._path(JOURNAL_PREFIX, self._generation), fsync)
+        self._maybe_snapshot()
+        
+    def _path(self, prefix: str, generation: int) -> str:
+        return os.path.join(self.directory, f"{prefix}-{generation:010d}.bin")
+        
+    def _generations(self) -> Dict[str, List[int]]:
+        """Get the generation numbers of the snapshot and journal files on disk, oldest first."""
+        generations: Dict[str, List[int]] = {SNAPSHOT_PREFIX: [], JOURNAL_PREFIX: []}
+        for name in os.listdir(self.directory):
+            match = _FILE_NAME.match(name)
+            if match:
+                generations[match.group(1)].append(int(match.group(2)))
+            elif name.endswith(".tmp"):
+                # A snapshot that was still being written when the process stopped
+                os.remove(os.path.join(self.directory, name))
+        for numbers in generations.values():
+            numbers.sort()
+        return generations
+        
+    # Recovery
+    def _recover(self) -> int:
+        """Load the newest snapshot and replay the journal after it. Returns the next generation."""
+        generations = self._generations()
+        snapshots, journals = generations[SNAPSHOT_PREFIX], generations[JOURNAL_PREFIX]
+        dishes: Dict[bytes, Dish] = {}
+        base = 0
+        if snapshots:
+            base = snapshots[-1]
+            path = self._path(SNAPSHOT_PREFIX, base)
+            _, _, complete = self._replay(path, dishes)
+            if not complete:
+                raise ValueError(f"Snapshot {path} is incomplete or corrupted")
+                
+        tail = [generation for generation in journals if generation >= base]
+        for position, generation in enumerate(tail):
+            path = self._path(JOURNAL_PREFIX, generation)
+            records, valid_size, _ = self._replay(path, dishes)
+            self._records_since_snapshot += records
+            if valid_size < os.path.getsize(path):
+                if position < len(tail) - 1:
+                    raise ValueError(f"Journal {path} is corrupted before its end")
+                # The last write before a crash never finished, so it was never acknowledged
+                os.truncate(path, valid_size)
+                
+        self._remove_files_before(base)
+        return max(snapshots + journals + [0]) + 1
+        
+    def _replay(self, path: str, dishes: Dict[bytes, Dish]) -> Tuple[int, int, bool]:
+        """
+        Apply the records in a file. dishes maps raw dish IDs to dishes seen so far.
+        Returns the number of records applied, the size of the valid part of the file and
+        whether a snapshot end marker was found. Raises ValueError if a record refers to a dish
+        that no earlier record defined.
+        """
+        with open(path, "rb") as file:
+            data = file.read()
+        orders = self._orders
+        dish_indexes = {dish_id: intern_dish(dish) for dish_id, dish in dishes.items()}
+        records = 0
+        valid_size = 0
+        complete = False
+        try:
+            for record_type, payload, end in read_records(data):
+                records += 1
+                valid_size = end
+                if record_type == RecordType.ORDER_ADDED:
+                    # The hot path: a snapshot is mostly orders, so build them from their compact form
+                    order_id, customer_id, order_type, status, created_at_us, updated_at_us, items = decode_order(payload)
+                    order_int = int.from_bytes(order_id, "big")
+                    orders[UUID(int=order_int)] = Order.from_compact(
+                        order_int,
+                        int.from_bytes(customer_id, "big"),
+                        order_type,
+                        status,
+                        {dish_indexes[dish_id]: quantity for dish_id, quantity in items},
+                        created_at_us,
+                        updated_at_us
+                    )
+                elif record_type == RecordType.STATUS_CHANGED:
+                    order_id, status, updated_at_us = decode_status(payload)
+                    order = orders.get(UUID(bytes=order_id))
+                    if order is not None:
+                        order.replay_change(updated_at_us, status=status)
+                elif record_type == RecordType.ITEM_SET:
+                    order_id, dish_id, quantity, updated_at_us = decode_item(payload)
+                    order = orders.get(UUID(bytes=order_id))
+                    if order is not None:
+                        order.replay_change(updated_at_us, dish=dishes[dish_id], quantity=quantity)
+                elif record_type == RecordType.ORDER_DELETED:
+                    orders.pop(UUID(bytes=decode_order_deleted(payload)), None)
+                elif record_type == RecordType.CUSTOMER_ADDED:
+                    customer = decode_customer(payload)
+                    self._customers[customer.id] = customer
+                elif record_type in (RecordType.DISH_ADDED, RecordType.DISH_DEFINED):
+                    dish = decode_dish(payload)
+                    dishes[dish.id.bytes] = dish
+                    dish_indexes[dish.id.bytes] = intern_dish(dish)
+                    self._known_dishes[dish.id] = dish
+                    if record_type == RecordType.DISH_ADDED and dish.id not in self._menu_dish_ids:
+                        self._menu_dish_ids.add(dish.id)
+                        self._dishes.append(dish)
+                elif record_type == RecordType.SNAPSHOT_END:
+                    complete = True
+        except KeyError as error:
+            raise ValueError(
+                f"{path} refers to dish {UUID(bytes=bytes(error.args[0]))} in record {records}, "
+                "but no earlier record defines it"
+            ) from None
+        self.recovered_records += records
+        return records, valid_size, complete
+        
+    # Journaling
+    def _new_dishes(self, dishes: Iterable[Dish]) -> List[Dish]:
+        """Get the dishes the journal hasn't seen yet. Must be called with the journal lock held."""
+        return list({dish.id: dish for dish in dishes if dish.id not in self._known_dishes}.values())
+        
+    def _append(self, records: List[bytes], new_dishes: Iterable[Dish] = ()) -> int:
+        """
+        Append records to the journal, including those defining new_dishes, which only
+        count as journaled from now on. Must be called with the journal lock held.
+        """
+        for dish in new_dishes:
+            self._known_dishes[dish.id] = dish
+        sequence = 0
+        for record in records:
+            sequence = self._journal.append(record)
+        self._records_since_snapshot += len(records)
+        return sequence
+        
+    def _commit(self, sequence: int) -> None:
+        """Wait until appended records are durable, then snapshot if one is due."""
+        if sequence:
+            self._journal.wait(sequence)
+        self._maybe_snapshot()
+        
+    # Order methods
+    def add_order(self, order: Order) -> None:
+        """Store a new order."""
+        with self._journal_lock:
+            new_dishes = self._new_dishes(dish for dish, _ in order.line_items)
+            records = [encode_dish(dish, on_menu=False) for dish in new_dishes]
+            records.append(encode_order(order))
+            super().add_order(order)
+            sequence = self._append(records, new_dishes)
+        self._commit(sequence)
+        
+    def update_order(self, order: Order) -> bool:
+        """Store the current state of an existing order."""
+        return self._update(order, [dish for dish, _ in order.line_items], lambda: encode_order(order))
+        
+    def update_order_status(self, order: Order) -> bool:
+        """Store an existing order after only its status changed."""
+        return self._update(order, [], lambda: encode_status(order))
+        
+    def update_order_item(self, order: Order, dish: Dish) -> bool:
+        """Store an existing order after only the quantity of one dish changed."""
+        return self._update(order, [dish], lambda: encode_item(order, dish))
+        
+    def _update(self, order: Order, dishes: List[Dish], encode: Callable[[], bytes]) -> bool:
+        """Store an existing order and journal the record describing the change, after any new dishes."""
+        with self._journal_lock:
+            new_dishes = self._new_dishes(dishes)
+            records = [encode_dish(dish, on_menu=False) for dish in new_dishes]
+            records.append(encode())
+            if not super().update_order(order):
+                return False
+            sequence = self._append(records, new_dishes)
+        self._commit(sequence)
+        return True
+        
+    def delete_order(self, order_id: UUID) -> bool:
+        """Delete an order by ID."""
+        record = encode_order_deleted(order_id)
+        with self._journal_lock:
+            if not super().delete_order(order_id):
+                return False
+            sequence = self._append([record])
+        self._commit(sequence)
+        return True
+        
+    # Customer methods
+    def add_customer(self, customer: Customer) -> None:
+        """Store a customer."""
+        record = encode_customer(customer)
+        with self._journal_lock:
+            super().add_customer(customer)
+            sequence = self._append([record])
+        self._commit(sequence)
+        
+    # Dish methods
+    def add_dishes(self, dishes: List[Dish]) -> None:
+        """Store dishes added to the menu."""
+        with self._journal_lock:
+            dishes = [dish for dish in dishes if dish.id not in self._menu_dish_ids]
+            records = [encode_dish(dish) for dish in dishes]
+            super().add_dishes(dishes)
+            self._menu_dish_ids.update(dish.id for dish in dishes)
+            sequence = self._append(records, dishes)
+        self._commit(sequence)
+        
+    # Snapshots
+    def _maybe_snapshot(self) -> None:
+        """Start a background snapshot once enough records have been journaled since the last one."""
+        if self._records_since_snapshot < self.snapshot_every:
+            return
+        with self._journal_lock:
+            if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+                return
+            self._snapshot_thread = threading.Thread(target=self.snapshot, name="journal-snapshot", daemon=True)
+            self._snapshot_thread.start()
+            
+    def snapshot(self) -> None:
+        """Save a snapshot of the current state and delete the files it replaces."""
+        with self._snapshot_lock:
+            with self._journal_lock:
+                # Later changes go to a new journal file, which is replayed over this snapshot
+                generation = self._generation + 1
+                self._journal.rotate(self._path(JOURNAL_PREFIX, generation))
+                self._generation = generation
+                self._records_since_snapshot = 0
+                menu = list(self._dishes)
+                other_dishes = [dish for dish in self._known_dishes.values() if dish.id not in self._menu_dish_ids]
+                customers = self.get_all_customers()
+                # Archived orders are read lazily while writing, so they are never all rebuilt at once
+                archived, live = self._orders_view()
+                order_count = len(archived) + len(live)
+                orders = chain(archived, live)
+                
+            path = self._path(SNAPSHOT_PREFIX, generation)
+            temporary = path + ".tmp"
+            defined = {dish.id for dish in chain(menu, other_dishes)}
+            with open(temporary, "wb") as file:
+                file.write(b"".join(encode_dish(dish) for dish in menu))
+                file.write(b"".join(encode_dish(dish, on_menu=False) for dish in other_dishes))
+                file.write(b"".join(encode_customer(customer) for customer in customers))
+                while True:
+                    chunk = self._encode_orders(islice(orders, SNAPSHOT_CHUNK_SIZE), defined)
+                    if not chunk:
+                        break
+                    file.write(chunk)
+                file.write(encode_snapshot_end(len(defined), len(customers), order_count))
+                file.flush()
+                if self.fsync:
+                    os.fsync(file.fileno())
+            os.replace(temporary, path)
+            if self.fsync:
+                fsync_directory(path)
+            self._remove_files_before(generation)
+            
+    @staticmethod
+    def _encode_orders(orders: Iterable[Order], defined: Set[UUID]) -> bytes:
+        """
+        Encode orders for a snapshot, each after any of its dishes not yet in it. Orders keep
+        changing while a snapshot is written, and may use dishes journaled after the dish
+        lists were taken.
+        """
+        records = []
+        for order in orders:
+            # Read once, so the dishes defined are exactly the ones the record refers to
+            items = order.line_items
+            for dish, _ in items:
+                if dish.id not in defined:
+                    defined.add(dish.id)
+                    records.append(encode_dish(dish, on_menu=False))
+            records.append(encode_order(order, items))
+        return b"".join(records)
+        
+    def _remove_files_before(self, generation: int) -> None:
+        """Delete snapshot and journal files made redundant by the snapshot of a generation."""
+        for prefix, numbers in self._generations().items():
+            for number in numbers:
+                if number < generation:
+                    os.remove(self._path(prefix, number))
+                    
+    def close(self) -> None:
+        """Wait for a running snapshot, then write out and close the journal."""
+        thread = self._snapshot_thread
+        if thread is not None:
+            thread.join()
+        self._journal.close()
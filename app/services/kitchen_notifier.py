@@ -1,6 +1,11 @@
+from typing import Any, Dict, Optional
 from uuid import UUID
 
 from app.models.interfaces import OrderObserver
+from app.models.order import Order
+from app.models.order_events import OrderEvent, OrderEventKind
+from app.services.kitchen_stream import KitchenStream
+from app.services.notification_queue import NotificationQueue, OverflowPolicy
 from app.services.order_service import OrderService
 
 
@@ -8,10 +13,49 @@ class KitchenNotifier(OrderObserver):
     """
     Service responsible for notifying the kitchen about new orders.
     Implements the Observer pattern to react to order status changes.
+    Notifications are delivered by a background worker, so publishing an order event
+    never waits on the kitchen display channel.
     """
     
-    def __init__(self, order_service: OrderService):
+    def __init__(
+        self,
+        order_service: OrderService,
+        stream: Optional[KitchenStream] = None,
+        queue_size: int = 1000,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        block_timeout: Optional[float] = None
+    ):
         self.order_service = order_service
+        self.stream = stream if stream is not None else KitchenStream()
+        self.queue = NotificationQueue(
+            self._deliver,
+            max_size=queue_size,
+            overflow=overflow,
+            block_timeout=block_timeout,
+            name="kitchen-notifier"
+        )
+        
+    def on_event(self, event: OrderEvent) -> None:
+        """Queue the event for delivery to the kitchen displays."""
+        self.queue.put(event)
+        
+    def _deliver(self, event: OrderEvent) -> None:
+        """Turn an order event into a kitchen display delta. Runs on the queue worker."""
+        if event.kind == OrderEventKind.CREATED:
+            # The order may already have moved on by now; announce it as it was created
+            order = self.order_service.get_order(event.order_id)
+            if order:
+                self.stream.publish("order_created", dict(self._describe(order), status=event.status.value))
+        else:
+            self.stream.publish("status_changed", {
+                "id": str(event.order_id),
+                "status": event.status.value if event.status else None,
+                "previous_status": event.previous_status.value if event.previous_status else None
+            })
+            
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get notification queue depth and counters."""
+        return self.queue.metrics()
         
     def update(self, order_id: UUID) -> None:
         """
@@ -20,12 +64,26 @@ class KitchenNotifier(OrderObserver):
         """
         order = self.order_service.get_order(order_id)
         if order and order.status.value == "created":
-            # In a real application, this could send a notification to a kitchen display system
-            print(f"KITCHEN NOTIFICATION: New order {order_id} received!")
-            print(f"Order details: {len(order.dishes)} dishes, total: ${order.calculate_total():.2f}")
+            self.stream.publish("order_created", self._describe(order))
             
     def notify_order_ready(self, order_id: UUID) -> None:
         """Notify that an order is ready for delivery."""
         order = self.order_service.get_order(order_id)
         if order:
-            print(f"KITCHEN NOTIFICATION: Order {order_id} is ready for delivery!") 
\ No newline at end of file
+            self.stream.publish("order_ready", {"id": str(order_id)})
+            
+    @staticmethod
+    def _describe(order: Order) -> Dict[str, Any]:
+        """Summarize an order for the kitchen displays."""
+        return {
+            "id": str(order.id),
+            "customer_id": str(order.customer_id),
+            "status": order.status.value,
+            "created_at": order.created_at.isoformat(),
+            "dish_count": order.dish_count,
+            "total": order.calculate_total(),
+            "items": [
+                {"dish_id": str(item.dish.id), "name": item.dish.name, "quantity": item.quantity}
+                for item in order.line_items
+            ]
+        }
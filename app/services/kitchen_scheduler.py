@@ -0,0 +1,162 @@
+import heapq
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from app.models.interfaces import OrderObserver
+from app.models.order import Order, OrderStatus
+from app.models.order_events import OrderEvent, OrderEventKind
+from app.models.order_type import OrderType
+from app.services.order_service import OrderService
+
+# Kitchen priority of each order type, lower is served first
+ORDER_TYPE_PRIORITY: Dict[OrderType, int] = {
+    OrderType.EXPRESS: 0,
+    OrderType.REGULAR: 1,
+    OrderType.BULK: 2,
+}
+
+
+class KitchenTicket(NamedTuple):
+    """A queued order waiting for a kitchen station."""
+    order_id: UUID
+    order_type: OrderType
+    created_at_us: int
+
+
+class KitchenScheduler(OrderObserver):
+    """
+    Priority work queue of kitchen tickets, fed by order creation events.
+    Tickets are ordered by order type and then creation time, with aging: each priority level
+    counts as aging_seconds of waiting, so a regular ticket that has waited longer than that
+    goes ahead of newer express tickets instead of starving. Sort keys never change, so the
+    heap stays valid and both submitting and pulling a ticket are O(log n).
+    """
+    
+    def __init__(self, order_service: OrderService, aging_seconds: float = 300.0):
+        self.order_service = order_service
+        self.aging_us = int(aging_seconds * 1_000_000)
+        self._heap: List[Tuple[int, int, KitchenTicket]] = []
+        self._queued: Dict[UUID, KitchenTicket] = {}
+        self._stations: Dict[str, UUID] = {}
+        self._sequence = 0
+        self._lock = threading.RLock()
+        
+    def __len__(self) -> int:
+        return len(self._queued)
+        
+    def _priority_key(self, ticket: KitchenTicket) -> int:
+        """Effective creation time: the ticket's own time pushed back by its priority level."""
+        return ticket.created_at_us + ORDER_TYPE_PRIORITY[ticket.order_type] * self.aging_us
+        
+    def submit(self, order: Order) -> None:
+        """Queue a ticket for an order."""
+        self._push([KitchenTicket(order.id, order.order_type, order.created_at_us)])
+        
+    def submit_all(self, orders: Iterable[Order]) -> None:
+        """
+        Queue tickets for orders that were waiting before the scheduler started, such as
+        orders restored from storage, which never produce a creation event here.
+        """
+        self._push([
+            KitchenTicket(order.id, order.order_type, order.created_at_us)
+            for order in orders if order.status == OrderStatus.CREATED
+        ])
+        
+    # The queue and station state is only touched through the methods below, so a subclass
+    # can keep it elsewhere, such as in a store shared by several processes.
+    def _push(self, tickets: List[KitchenTicket]) -> None:
+        """Queue tickets, skipping orders already queued."""
+        with self._lock:
+            for ticket in tickets:
+                if ticket.order_id in self._queued:
+                    continue
+                self._sequence += 1
+                heapq.heappush(self._heap, (self._priority_key(ticket), self._sequence, ticket))
+                self._queued[ticket.order_id] = ticket
+                
+    def discard(self, order_id: UUID) -> bool:
+        """
+        Take an order out of the queue.
+        Its heap entry is skipped when it reaches the top rather than searched for now.
+        """
+        with self._lock:
+            if self._queued.pop(order_id, None) is None:
+                return False
+            # Compact once stale entries make up most of the heap
+            if len(self._heap) > 2 * len(self._queued) + 64:
+                self._heap = [entry for entry in self._heap if entry[2].order_id in self._queued]
+                heapq.heapify(self._heap)
+            return True
+            
+    def get_queue(self, limit: Optional[int] = None) -> List[KitchenTicket]:
+        """Get queued tickets in the order stations will pull them."""
+        with self._lock:
+            entries = [entry for entry in self._heap if entry[2].order_id in self._queued]
+        entries.sort()
+        if limit is not None:
+            entries = entries[:limit]
+        return [ticket for _, _, ticket in entries]
+        
+    def get_station_ticket(self, station: str) -> Optional[UUID]:
+        """Get the order a station is currently working on."""
+        return self._stations.get(station)
+        
+    def _pop_ticket(self) -> Optional[KitchenTicket]:
+        """Take the next ticket off the queue."""
+        with self._lock:
+            while self._heap:
+                _, _, ticket = heapq.heappop(self._heap)
+                if self._queued.pop(ticket.order_id, None) is not None:
+                    return ticket
+            return None
+            
+    def _set_station(self, station: str, order_id: Optional[UUID]) -> Optional[UUID]:
+        """Give a station an order to work on, or none, and get the order it had."""
+        with self._lock:
+            previous = self._stations.pop(station, None)
+            if order_id is not None:
+                self._stations[station] = order_id
+            return previous
+            
+    def _release(self, order_id: UUID, left_kitchen: bool) -> None:
+        """Drop an order's ticket, and free its station too if the order left the kitchen."""
+        with self._lock:
+            self.discard(order_id)
+            if left_kitchen:
+                for station, station_order_id in list(self._stations.items()):
+                    if station_order_id == order_id:
+                        del self._stations[station]
+                        
+    def pull_next(self, station: str = "default") -> Tuple[Optional[UUID], Optional[KitchenTicket]]:
+        """
+        Finish the station's current ticket, if any, and hand it the next one.
+        The finished order becomes READY and the new one PROCESSING.
+        Returns the finished order ID and the new ticket.
+        """
+        with self._lock:
+            finished = self._set_station(station, None)
+            if finished is not None:
+                self.order_service.update_order_status(finished, OrderStatus.READY)
+                
+            while True:
+                ticket = self._pop_ticket()
+                if ticket is None:
+                    return finished, None
+                if not self.order_service.update_order_status(ticket.order_id, OrderStatus.PROCESSING):
+                    continue
+                self._set_station(station, ticket.order_id)
+                return finished, ticket
+                
+    def on_event(self, event: OrderEvent) -> None:
+        """Queue new orders and drop tickets whose orders were moved on elsewhere."""
+        if event.kind == OrderEventKind.CREATED:
+            order = self.order_service.get_order(event.order_id)
+            if order and order.status == OrderStatus.CREATED:
+                self.submit(order)
+        elif event.status != OrderStatus.CREATED:
+            self._release(event.order_id, left_kitchen=event.status != OrderStatus.PROCESSING)
+            
+    def update(self, order_id: UUID) -> None:
+        """Tickets are driven by on_event; plain updates carry no event kind."""
+        pass
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Set
+
+
+class KitchenEvent(NamedTuple):
+    """A delta sent to kitchen display screens."""
+    id: int
+    type: str
+    data: Dict[str, Any]
+
+
+class KitchenSubscription:
+    """
+    One connected kitchen screen.
+    Events are buffered per connection; when a slow screen falls behind, its oldest events
+    are dropped and it is told to resynchronise instead of holding up other screens.
+    """
+    
+    def __init__(self, buffer_size: int, loop: asyncio.AbstractEventLoop):
+        self._buffer: Deque[KitchenEvent] = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._loop = loop
+        self._ready = asyncio.Event()
+        self._resync = False
+        self.dropped = 0
+        
+    def push(self, event: KitchenEvent) -> None:
+        """Buffer an event for this screen. Safe to call from any thread."""
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+                self._resync = True
+            self._buffer.append(event)
+        self._loop.call_soon_threadsafe(self._ready.set)
+        
+    def drain(self) -> List[KitchenEvent]:
+        """Take every buffered event, preceded by a resync notice if any were dropped."""
+        with self._lock:
+            events = list(self._buffer)
+            self._buffer.clear()
+            if self._resync:
+                self._resync = False
+                events.insert(0, KitchenEvent(events[0].id - 1, "resync", {"dropped": self.dropped}))
+        return events
+        
+    async def next_events(self, timeout: Optional[float] = None) -> List[KitchenEvent]:
+        """Wait for buffered events. Returns an empty list if none arrive within the timeout."""
+        events = self.drain()
+        if events:
+            return events
+        self._ready.clear()
+        events = self.drain()
+        if events:
+            return events
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        return self.drain()
+
+
+class KitchenStream:
+    """
+    Fans kitchen display deltas out to connected screens.
+    A bounded replay log lets reconnecting screens resume after the last event id they saw.
+    """
+    
+    def __init__(self, history_size: int = 1000, buffer_size: int = 256):
+        self.buffer_size = buffer_size
+        self._history: Deque[KitchenEvent] = deque(maxlen=history_size)
+        self._subscriptions: Set[KitchenSubscription] = set()
+        self._lock = threading.Lock()
+        self._last_id = 0
+        
+    @property
+    def last_event_id(self) -> int:
+        """Get the id of the most recently published event."""
+        return self._last_id
+        
+    def publish(self, event_type: str, data: Dict[str, Any]) -> KitchenEvent:
+        """Record an event and push it to every connected screen."""
+        with self._lock:
+            event = KitchenEvent(self._last_id + 1, event_type, data)
+            self._record(event)
+        return event
+        
+    def _record(self, event: KitchenEvent) -> None:
+        """Log a numbered event and push it to every screen. Must be called with the lock held."""
+        self._last_id = event.id
+        self._history.append(event)
+        # Pushing under the lock keeps every screen's events in id order
+        for subscription in list(self._subscriptions):
+            try:
+                subscription.push(event)
+            except RuntimeError:
+                # The screen's event loop is gone
+                self._subscriptions.discard(subscription)
+                
+    def connect(self, last_event_id: Optional[int] = None) -> KitchenSubscription:
+        """
+        Connect a screen from within its event loop.
+        With a last_event_id, the events published after it are replayed first; if they have
+        already left the replay log, the screen receives a resync event instead.
+        """
+        subscription = KitchenSubscription(self.buffer_size, asyncio.get_running_loop())
+        with self._lock:
+            if last_event_id is not None and last_event_id < self._last_id:
+                oldest = self._history[0].id if self._history else self._last_id + 1
+                if last_event_id + 1 < oldest:
+                    subscription.push(KitchenEvent(self._last_id, "resync", {"dropped": None}))
+                else:
+                    for event in self._history:
+                        if event.id > last_event_id:
+                            subscription.push(event)
+            self._subscriptions.add(subscription)
+        return subscription
+        
+    def disconnect(self, subscription: KitchenSubscription) -> None:
+        """Stop sending events to a screen."""
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            
+    @property
+    def connection_count(self) -> int:
+        """Get the number of connected screens."""
+        return len(self._subscriptions)
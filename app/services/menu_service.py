@@ -1,8 +1,8 @@
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from uuid import UUID
 
 from app.models.dish import Dish
-from app.models.menu import Menu
+from app.models.menu import Menu, MenuSnapshot
 from app.services.order_database import OrderDatabase
 
 
@@ -19,12 +19,20 @@ class MenuService:
         """Get the menu."""
         return self.db.get_menu()
         
+    def get_menu_snapshot(self) -> MenuSnapshot:
+        """Get an immutable, versioned snapshot of the menu."""
+        return self.db.get_menu().snapshot()
+        
     def add_dish(self, name: str, price: float, description: Optional[str] = None, category: Optional[str] = None) -> Dish:
         """Add a dish to the menu."""
         dish = Dish(name=name, price=price, description=description, category=category)
         self.db.add_dish_to_menu(dish)
         return dish
         
+    def add_dishes(self, dishes: Iterable[Dish]) -> List[Dish]:
+        """Add many dishes to the menu under a single menu version."""
+        return self.db.add_dishes_to_menu(dishes)
+        
     def get_dish(self, dish_id: UUID) -> Optional[Dish]:
         """Get a dish by ID."""
         return self.db.get_menu().get_dish(dish_id)
@@ -33,6 +41,38 @@ class MenuService:
         """Get all dishes in the menu."""
         return self.db.get_menu().get_all_dishes()
         
+    def get_dishes_page(self, after: Optional[int] = None, limit: Optional[int] = None) -> Tuple[List[Dish], Optional[int]]:
+        """Get a page of dishes in the order they were added, and the key of the next page."""
+        return self.db.get_menu().get_dishes_page(after, limit)
+        
     def get_dishes_by_category(self, category: str) -> List[Dish]:
         """Get all dishes in a specific category."""
-        return self.db.get_menu().get_dishes_by_category(category) 
\ No newline at end of file
+        return self.db.get_menu().get_dishes_by_category(category) 
+        
+    def get_category_counts(self) -> Dict[str, int]:
+        """Get the number of dishes in each category."""
+        return self.db.get_menu().get_category_counts()
+        
+    def search_dishes(self, query: str, limit: Optional[int] = None) -> List[Dish]:
+        """Search dishes by name and description."""
+        return self.db.get_menu().search_dishes(query, limit)
+        
+    def get_dishes_by_price(
+        self,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        descending: bool = False
+    ) -> List[Dish]:
+        """Get dishes within a price range, ordered by price."""
+        return self.db.get_menu().get_dishes_by_price(min_price, max_price, descending)
+        
+    def get_dishes_by_price_page(
+        self,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        descending: bool = False,
+        after: Optional[Tuple[float, int]] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Dish], Optional[Tuple[float, int]]]:
+        """Get a page of dishes within a price range, ordered by price, and the key of the next page."""
+        return self.db.get_menu().get_dishes_by_price_page(min_price, max_price, descending, after, limit)
\ No newline at end of file
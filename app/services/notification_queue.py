@@ -0,0 +1,131 @@
+import threading
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Optional
+
+
+class OverflowPolicy(Enum):
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    REJECT = "reject"
+
+
+class NotificationQueue:
+    """
+    Bounded in-process queue drained by a background worker thread.
+    Producers never wait for the handler; when the queue is full the overflow policy decides
+    whether to wait for room, drop the oldest queued item, or reject the new one.
+    """
+    
+    def __init__(
+        self,
+        handler: Callable[[Any], None],
+        max_size: int = 1000,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        block_timeout: Optional[float] = None,
+        name: str = "notification-queue"
+    ):
+        if max_size < 1:
+            raise ValueError(f"Queue size must be positive: {max_size}")
+        self._handler = handler
+        self.max_size = max_size
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self._name = name
+        self._items: Deque[Any] = deque()
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._running = False
+        self._busy = False
+        # Metrics
+        self.enqueued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.failed = 0
+        self.high_water_mark = 0
+        
+    def put(self, item: Any) -> bool:
+        """
+        Queue an item for the worker, starting the worker if needed.
+        Returns False if the item was rejected or timed out waiting for room.
+        """
+        with self._condition:
+            self._ensure_worker()
+            if len(self._items) >= self.max_size:
+                if self.overflow == OverflowPolicy.REJECT:
+                    self.rejected += 1
+                    return False
+                if self.overflow == OverflowPolicy.DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                elif not self._condition.wait_for(
+                    lambda: len(self._items) < self.max_size or not self._running,
+                    self.block_timeout
+                ) or not self._running:
+                    self.rejected += 1
+                    return False
+            self._items.append(item)
+            self.enqueued += 1
+            self.high_water_mark = max(self.high_water_mark, len(self._items))
+            self._condition.notify_all()
+            return True
+            
+    def _ensure_worker(self) -> None:
+        """Start the worker thread. Must be called with the condition held."""
+        if self._worker is None or not self._worker.is_alive():
+            self._running = True
+            self._worker = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._worker.start()
+            
+    def _run(self) -> None:
+        """Worker loop: hand queued items to the handler one at a time."""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._items or not self._running)
+                if not self._items:
+                    self._condition.notify_all()
+                    return
+                item = self._items.popleft()
+                self._busy = True
+                self._condition.notify_all()
+            try:
+                self._handler(item)
+            except Exception:
+                # A failing notification must not take the worker down
+                with self._condition:
+                    self.failed += 1
+            finally:
+                with self._condition:
+                    self.processed += 1
+                    self._busy = False
+                    self._condition.notify_all()
+                    
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued item has been handled. Returns False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._items and not self._busy, timeout)
+            
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Handle the remaining items, then stop the worker thread."""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+            
+    def metrics(self) -> Dict[str, Any]:
+        """Get queue depth and throughput counters."""
+        with self._condition:
+            return {
+                "depth": len(self._items),
+                "max_size": self.max_size,
+                "overflow": self.overflow.value,
+                "high_water_mark": self.high_water_mark,
+                "enqueued": self.enqueued,
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "rejected": self.rejected,
+                "failed": self.failed
+            }
@@ -0,0 +1,293 @@
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from functools import reduce
+from itertools import compress
+from operator import and_
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from app.models.order import Order, OrderStatus, dish_at
+from app.models.order_type import OrderType
+from app.models.pricing import get_pricing_engine
+
+# Statuses after which an order is never expected to change again
+CLOSED_STATUSES = frozenset({OrderStatus.DELIVERED, OrderStatus.CANCELLED})
+# Rows added between sorts of the ID lookup index
+DEFAULT_RUN_SIZE = 1024
+
+# Enums are stored by their position; deleted rows keep their place with a reserved status code
+_STATUSES = list(OrderStatus)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+_ORDER_TYPES = list(OrderType)
+_ORDER_TYPE_CODES = {order_type: code for code, order_type in enumerate(_ORDER_TYPES)}
+_DELETED = 255
+_LOW_BITS = (1 << 64) - 1
+
+
+class ArchiveView:
+    """The archived orders as of one moment, read lazily; later deletions don't affect it."""
+    
+    def __init__(self, archive: "OrderArchive", statuses: bytes):
+        self._archive = archive
+        self._statuses = statuses
+        
+    def __len__(self) -> int:
+        return len(self._statuses) - self._statuses.count(_DELETED)
+        
+    def __iter__(self) -> Iterator[Order]:
+        order_at = self._archive._order_at
+        for row, status in enumerate(self._statuses):
+            if status != _DELETED:
+                yield order_at(row, status)
+
+
+class OrderColumns(ABC):
+    """
+    Reporting scans over orders stored column by column, shared by the in-memory archive and
+    on-disk segments. Each order is one row: its ID and customer ID as pairs of 64-bit halves,
+    status and type codes, timestamps and its total in cents. Line items are flattened into
+    dish index and quantity columns, with each row's items found through an offsets column.
+    
+    Scans build their filters with map and compress over whole columns, so the per-row work
+    happens in C rather than in Python bytecode, and never rebuild Order objects.
+    Columns can be any sequence of integers: typed arrays, or memoryviews of a mapped file.
+    """
+    
+    _id_high: Sequence[int]
+    _id_low: Sequence[int]
+    _customer_high: Sequence[int]
+    _customer_low: Sequence[int]
+    _statuses: Sequence[int]
+    _order_types: Sequence[int]
+    _created: Sequence[int]
+    _updated: Sequence[int]
+    _totals: Sequence[int]
+    # Row i's line items are at [item_starts[i], item_starts[i + 1]) in the item columns
+    _item_starts: Sequence[int]
+    _item_dishes: Sequence[int]
+    _item_quantities: Sequence[int]
+    
+    @abstractmethod
+    def _dish_id(self, index: int) -> UUID:
+        """Get the ID of the dish an item column refers to."""
+        pass
+        
+    def _rows(self, start_us: Optional[int], end_us: Optional[int]) -> Tuple[range, bool]:
+        """Get the rows that can hold orders created in [start_us, end_us), and whether they all do."""
+        return range(len(self._statuses)), start_us is None and end_us is None
+        
+    def _select(
+        self,
+        status: Optional[OrderStatus],
+        start_us: Optional[int],
+        end_us: Optional[int],
+        customer_id: Optional[UUID]
+    ) -> Tuple[range, Iterator[bool]]:
+        """Get the candidate rows and a flag per row for undeleted orders matching every filter."""
+        rows, times_match = self._rows(start_us, end_us)
+        
+        def window(column: Sequence[int]) -> Sequence[int]:
+            return column if len(rows) == len(self._statuses) else column[rows.start:rows.stop]
+            
+        statuses = window(self._statuses)
+        if status is None:
+            masks = [map(_DELETED.__ne__, statuses)]
+        else:
+            masks = [map(_STATUS_CODES[status].__eq__, statuses)]
+        if not times_match:
+            if start_us is not None:
+                masks.append(map(start_us.__le__, window(self._created)))
+            if end_us is not None:
+                masks.append(map(end_us.__gt__, window(self._created)))
+        if customer_id is not None:
+            masks.append(map((customer_id.int >> 64).__eq__, window(self._customer_high)))
+            masks.append(map((customer_id.int & _LOW_BITS).__eq__, window(self._customer_low)))
+        return rows, reduce(lambda left, right: map(and_, left, right), masks)
+        
+    def scan(
+        self,
+        status: Optional[OrderStatus] = None,
+        start_us: Optional[int] = None,
+        end_us: Optional[int] = None,
+        customer_id: Optional[UUID] = None
+    ) -> List[UUID]:
+        """Get the IDs of orders matching the filters; times select orders created in [start_us, end_us)."""
+        rows, mask = self._select(status, start_us, end_us, customer_id)
+        return [UUID(int=(self._id_high[row] << 64) | self._id_low[row]) for row in compress(rows, mask)]
+        
+    def summarize(
+        self,
+        start_us: Optional[int] = None,
+        end_us: Optional[int] = None,
+        customer_id: Optional[UUID] = None
+    ) -> Dict[OrderStatus, Tuple[int, int]]:
+        """Count the orders with each status and sum their totals in cents."""
+        summary = {}
+        for status in OrderStatus:
+            rows, mask = self._select(status, start_us, end_us, customer_id)
+            totals = self._totals if len(rows) == len(self._totals) else self._totals[rows.start:rows.stop]
+            selected = list(compress(totals, mask))
+            summary[status] = (len(selected), sum(selected))
+        return summary
+        
+    def dish_quantities(
+        self,
+        status: Optional[OrderStatus] = None,
+        start_us: Optional[int] = None,
+        end_us: Optional[int] = None,
+        customer_id: Optional[UUID] = None
+    ) -> Dict[UUID, int]:
+        """Sum how many of each dish the matching orders contained."""
+        quantities: Dict[int, int] = {}
+        starts, dishes, counts = self._item_starts, self._item_dishes, self._item_quantities
+        rows, mask = self._select(status, start_us, end_us, customer_id)
+        for row in compress(rows, mask):
+            for index in range(starts[row], starts[row + 1]):
+                quantities[dishes[index]] = quantities.get(dishes[index], 0) + counts[index]
+        return {self._dish_id(index): quantity for index, quantity in quantities.items()}
+
+
+class OrderColumnArrays(OrderColumns):
+    """Order columns in growable typed arrays, with line items keyed by dish table index."""
+    
+    def __init__(self):
+        self._id_high = array("Q")
+        self._id_low = array("Q")
+        self._customer_high = array("Q")
+        self._customer_low = array("Q")
+        self._statuses = array("B")
+        self._order_types = array("B")
+        self._created = array("q")
+        self._updated = array("q")
+        self._totals = array("q")
+        self._item_starts = array("Q", [0])
+        self._item_dishes = array("I")
+        self._item_quantities = array("I")
+        
+    def __len__(self) -> int:
+        return len(self._statuses)
+        
+    def append_orders(self, orders: Iterable[Order]) -> int:
+        """Add orders as new rows, freezing their current totals. Returns the first new row."""
+        orders = list(orders)
+        first_row = len(self._statuses)
+        for order, total_cents in zip(orders, get_pricing_engine().price_orders(orders)):
+            order_id, customer_id, order_type, status, items, created_at_us, updated_at_us = order.to_compact()
+            self._id_high.append(order_id >> 64)
+            self._id_low.append(order_id & _LOW_BITS)
+            self._customer_high.append(customer_id >> 64)
+            self._customer_low.append(customer_id & _LOW_BITS)
+            self._statuses.append(_STATUS_CODES[status])
+            self._order_types.append(_ORDER_TYPE_CODES[order_type])
+            self._created.append(created_at_us)
+            self._updated.append(updated_at_us)
+            self._totals.append(total_cents)
+            self._item_dishes.extend(items.keys())
+            self._item_quantities.extend(items.values())
+            self._item_starts.append(len(self._item_dishes))
+        return first_row
+        
+    def _dish_id(self, index: int) -> UUID:
+        return dish_at(index).id
+        
+    def _order_at(self, row: int, status_code: int) -> Order:
+        """Rebuild the order in a row, with the given status code."""
+        start, stop = self._item_starts[row], self._item_starts[row + 1]
+        return Order.from_compact(
+            (self._id_high[row] << 64) | self._id_low[row],
+            (self._customer_high[row] << 64) | self._customer_low[row],
+            _ORDER_TYPES[self._order_types[row]],
+            _STATUSES[status_code],
+            dict(zip(self._item_dishes[start:stop], self._item_quantities[start:stop])),
+            self._created[row],
+            self._updated[row]
+        )
+
+
+class OrderArchive(OrderColumnArrays):
+    """
+    Closed orders stored column by column in typed arrays instead of as Order objects.
+    A row takes around a hundred bytes, a fraction of a live order, and is turned back into
+    an Order on read.
+    
+    Rows are found by ID through sorted runs of (high ID half, row) pairs: new rows collect in
+    a small dict until there are run_size of them, then are sorted into a run, and runs of
+    equal size are merged like a binary counter, so lookups bisect only a few runs.
+    Rows are never moved; a deleted row is marked with a reserved status code.
+    
+    Not thread-safe; the owning backend guards it with its orders lock.
+    """
+    
+    def __init__(self, run_size: int = DEFAULT_RUN_SIZE):
+        super().__init__()
+        self.run_size = run_size
+        self._pending: Dict[int, int] = {}
+        self._runs: List[Tuple[array, array]] = []
+        self._deleted = 0
+        
+    def __len__(self) -> int:
+        return len(self._statuses) - self._deleted
+        
+    def __contains__(self, order_id: UUID) -> bool:
+        return self._find(order_id.int) is not None
+        
+    def extend(self, orders: Iterable[Order]) -> None:
+        """Archive orders, freezing their current totals for reporting."""
+        first_row = self.append_orders(orders)
+        for row in range(first_row, len(self._statuses)):
+            self._pending[(self._id_high[row] << 64) | self._id_low[row]] = row
+            if len(self._pending) >= self.run_size:
+                self._sort_pending()
+                
+    def get(self, order_id: UUID) -> Optional[Order]:
+        """Rebuild an archived order, or None if it isn't in the archive."""
+        row = self._find(order_id.int)
+        return None if row is None else self._order_at(row, self._statuses[row])
+        
+    def remove(self, order_id: UUID) -> bool:
+        """Delete an archived order."""
+        order_int = order_id.int
+        row = self._find(order_int)
+        if row is None:
+            return False
+        self._statuses[row] = _DELETED
+        self._pending.pop(order_int, None)
+        self._deleted += 1
+        return True
+        
+    def view(self) -> ArchiveView:
+        """Capture the archived orders for reading after the lock is released."""
+        return ArchiveView(self, self._statuses.tobytes())
+        
+    # ID lookup
+    def _find(self, order_id: int) -> Optional[int]:
+        """Get the row of a stored, undeleted order."""
+        row = self._pending.get(order_id)
+        if row is not None:
+            return row
+        high, low = order_id >> 64, order_id & _LOW_BITS
+        for keys, rows in self._runs:
+            position = bisect_left(keys, high)
+            # High halves are random, so more than one match is rare
+            while position < len(keys) and keys[position] == high:
+                row = rows[position]
+                if self._id_low[row] == low and self._statuses[row] != _DELETED:
+                    return row
+                position += 1
+        return None
+        
+    def _sort_pending(self) -> None:
+        """Turn the pending rows into a sorted run, merging runs of equal size."""
+        rows = sorted(self._pending.values(), key=self._id_high.__getitem__)
+        self._pending = {}
+        self._runs.append(self._run(rows))
+        while len(self._runs) > 1 and len(self._runs[-2][0]) <= len(self._runs[-1][0]):
+            _, newer = self._runs.pop()
+            _, older = self._runs.pop()
+            # Timsort finds the two sorted halves and merges them in linear time
+            self._runs.append(self._run(sorted(older + newer, key=self._id_high.__getitem__)))
+            
+    def _run(self, rows: Iterable[int]) -> Tuple[array, array]:
+        rows = array("I", rows)
+        return array("Q", map(self._id_high.__getitem__, rows)), rows
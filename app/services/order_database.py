@@ -1,16 +1,37 @@
-from typing import Dict, List, Optional
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, Tuple
 from uuid import UUID
 
 from app.models.customer import Customer
 from app.models.dish import Dish
+from app.models.locks import StripedLock
 from app.models.menu import Menu
-from app.models.order import Order
+from app.models.order import Order, OrderStatus
+from app.models.order_events import OrderEventBus
+from app.services.customer_indexes import CustomerIndexes
+from app.services.order_indexes import OrderIndexes
+from app.services.response_cache import ResponseCache
+from app.services.storage_backend import InMemoryBackend, StorageBackend
 
 
 class OrderDatabase:
     """
     Singleton database for storing orders, customers, and the menu.
     Ensures that there is only one instance of the database throughout the application.
+    
+    Records are kept by a pluggable storage backend, in memory unless configured otherwise,
+    while the menu's lookup indexes, the order indexes by customer, status and creation time
+    and the customer paging index are always built in memory from what the backend holds.
+    
+    Route handlers run concurrently in FastAPI's threadpool, so backends guard their own
+    collections and changes to individual orders are serialized by a striped lock; updates
+    to different orders rarely contend.
+    
+    With a shared backend, several worker processes use the same records. Before every read
+    that goes through the in-memory indexes, changes made by other processes are polled
+    from the backend and applied, and order locks are also taken in the backend.
     """
     
     _instance = None
@@ -21,57 +42,212 @@ class OrderDatabase:
             cls._instance._initialize()
         return cls._instance
         
-    def _initialize(self):
-        """Initialize the database."""
-        self._orders: Dict[UUID, Order] = {}
-        self._customers: Dict[UUID, Customer] = {}
-        self._menu = Menu()
+    def _initialize(self, backend: Optional[StorageBackend] = None):
+        """Initialize the database, loading the menu and order indexes from the backend."""
+        self._backend = backend or InMemoryBackend()
+        self._order_locks = StripedLock()
+        # Polls of a shared backend are applied one at a time, in order
+        self._sync_lock = threading.Lock()
+        self._synced_at = 0.0
+        self._load_indexes()
+        
+    def _load_indexes(self) -> None:
+        """Build the menu and the order and customer indexes from what the backend holds."""
+        menu = Menu()
+        menu.add_dishes(self._backend.get_all_dishes())
+        self._menu = menu
+        self._order_indexes = OrderIndexes(self.get_order)
+        self._order_indexes.add_all(self._backend.get_all_orders())
+        OrderEventBus().subscribe(self._order_indexes)
+        self._customer_indexes = CustomerIndexes()
+        # Emails were not always unique, so a stored duplicate is indexed rather than rejected
+        self._customer_indexes.add_all(self._backend.get_all_customers())
+        
+    def _sync(self) -> None:
+        """Apply the changes other processes made to a shared backend."""
+        if not self._backend.shared:
+            return
+        requested_at = time.monotonic()
+        with self._sync_lock:
+            # A poll that started after this request already covers it
+            if self._synced_at > requested_at:
+                return
+            started_at = time.monotonic()
+            changes = self._backend.poll_changes()
+            if changes is None:
+                self._load_indexes()
+                ResponseCache().clear()
+            else:
+                for change in changes:
+                    self._apply_change(change)
+            self._synced_at = started_at
+            
+    def _apply_change(self, change: tuple) -> None:
+        """Update the in-memory indexes with one change made by another process."""
+        kind = change[0]
+        if kind == "dishes":
+            self._menu.add_dishes(change[1])
+        elif kind == "order_added":
+            self._order_indexes.add(change[1])
+        elif kind == "status":
+            self._order_indexes.set_status(change[1], change[2])
+        elif kind == "order_deleted":
+            self._order_indexes.remove(change[1])
+        elif kind == "customer":
+            # The store already rejected duplicates, so its customer wins over a local one in flight
+            self._customer_indexes.add(change[1], unique=False)
+            
+    @property
+    def backend(self) -> StorageBackend:
+        """Get the storage backend."""
+        return self._backend
+        
+    def use_backend(self, backend: StorageBackend) -> None:
+        """Switch to another storage backend, closing the current one."""
+        self._backend.close()
+        self._initialize(backend)
         
     # Order methods
+    @contextmanager
+    def lock_order(self, order_id: UUID) -> Iterator[Optional[Order]]:
+        """
+        Hold an order's lock for a read-modify-write and yield the order, or None if it doesn't exist.
+        Every change to an order should be made under this lock and saved with update_order
+        so concurrent updates aren't lost.
+        """
+        with self._order_locks.for_key(order_id), self._backend.order_lock(order_id):
+            yield self.get_order(order_id)
+            
     def add_order(self, order: Order) -> None:
         """Add an order to the database."""
-        self._orders[order.id] = order
+        self._backend.add_order(order)
+        self._order_indexes.add(order)
         
     def get_order(self, order_id: UUID) -> Optional[Order]:
         """Get an order by ID."""
-        return self._orders.get(order_id)
+        return self._backend.get_order(order_id)
         
     def get_all_orders(self) -> List[Order]:
         """Get all orders."""
-        return list(self._orders.values())
+        return self._backend.get_all_orders()
+        
+    def get_orders_by_customer(self, customer_id: UUID) -> List[Order]:
+        """Get a customer's orders, oldest first."""
+        self._sync()
+        return self._get_orders(self._order_indexes.get_by_customer(customer_id))
+        
+    def get_orders_by_status(self, status: OrderStatus) -> List[Order]:
+        """Get the orders with a status, in the order they reached it."""
+        self._sync()
+        return self._get_orders(self._order_indexes.get_by_status(status))
+        
+    def get_orders_page(
+        self,
+        after: Optional[Tuple[int, int]] = None,
+        start_us: Optional[int] = None,
+        end_us: Optional[int] = None,
+        limit: Optional[int] = None,
+        status: Optional[OrderStatus] = None
+    ) -> Tuple[List[Order], Optional[Tuple[int, int]]]:
+        """
+        Get a page of the orders created in [start_us, end_us), oldest first, optionally with
+        one status. Returns the orders and the key of the next page, or None on the last page.
+        """
+        self._sync()
+        order_ids, next_key = self._order_indexes.get_page_by_created(after, start_us, end_us, limit, status)
+        return self._get_orders(order_ids), next_key
+        
+    def _get_orders(self, order_ids: List[UUID]) -> List[Order]:
+        """Look up orders by ID, skipping any deleted since they were listed."""
+        orders = (self._backend.get_order(order_id) for order_id in order_ids)
+        return [order for order in orders if order is not None]
         
     def update_order(self, order: Order) -> bool:
         """Update an existing order."""
-        if order.id in self._orders:
-            self._orders[order.id] = order
-            return True
-        return False
+        if not self._backend.update_order(order):
+            return False
+        self._order_indexes.refresh_status(order.id)
+        return True
+        
+    def save_order_status(self, order: Order) -> bool:
+        """Save an existing order after changing its status."""
+        return self._backend.update_order_status(order)
+        
+    def save_order_item(self, order: Order, dish: Dish) -> bool:
+        """Save an existing order after changing the quantity of one of its dishes."""
+        return self._backend.update_order_item(order, dish)
         
     def delete_order(self, order_id: UUID) -> bool:
         """Delete an order by ID."""
-        if order_id in self._orders:
-            del self._orders[order_id]
-            return True
-        return False
-            
+        order = self._backend.get_order(order_id)
+        if order is None or not self._backend.delete_order(order_id):
+            return False
+        self._order_indexes.remove(order)
+        return True
+        
     # Customer methods
     def add_customer(self, customer: Customer) -> None:
-        """Add a customer to the database."""
-        self._customers[customer.id] = customer
-        
+        """Add a customer to the database, raising DuplicateEmailError if the email is taken."""
+        self._sync()
+        # Indexing first claims the email, so two concurrent adds can't both store it
+        self._customer_indexes.add(customer)
+        try:
+            self._backend.add_customer(customer)
+        except BaseException:
+            self._customer_indexes.remove(customer, self._backend.get_customer(customer.id))
+            raise
+            
     def get_customer(self, customer_id: UUID) -> Optional[Customer]:
         """Get a customer by ID."""
-        return self._customers.get(customer_id)
+        return self._backend.get_customer(customer_id)
+        
+    def get_customer_by_email(self, email: str) -> Optional[Customer]:
+        """Get the customer with an email, in any case."""
+        self._sync()
+        customer_id = self._customer_indexes.get_by_email(email)
+        return None if customer_id is None else self._backend.get_customer(customer_id)
         
     def get_all_customers(self) -> List[Customer]:
         """Get all customers."""
-        return list(self._customers.values())
+        return self._backend.get_all_customers()
+        
+    def search_customers(self, prefix: str, limit: Optional[int] = None) -> List[Customer]:
+        """Find customers by the start of their name or phone number, best matches first."""
+        self._sync()
+        customer_ids = self._customer_indexes.search(prefix, limit)
+        customers = (self._backend.get_customer(customer_id) for customer_id in customer_ids)
+        return [customer for customer in customers if customer is not None]
         
-    # Menu methods
+    def get_customers_page(
+        self,
+        after: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Customer], Optional[int]]:
+        """Get a page of customers in the order they were added, and the key of the next page."""
+        self._sync()
+        customer_ids, next_key = self._customer_indexes.get_page(after, limit)
+        customers = (self._backend.get_customer(customer_id) for customer_id in customer_ids)
+        return [customer for customer in customers if customer is not None], next_key
+        
+    # Menu methods (the menu guards its own indexes)
     def get_menu(self) -> Menu:
         """Get the menu."""
+        self._sync()
         return self._menu
         
     def add_dish_to_menu(self, dish: Dish) -> None:
         """Add a dish to the menu."""
-        self._menu.add_dish(dish) 
\ No newline at end of file
+        self.add_dishes_to_menu([dish])
+        
+    def add_dishes_to_menu(self, dishes: Iterable[Dish]) -> List[Dish]:
+        """Add many dishes to the menu at once."""
+        # Indexing first claims the dishes, so two concurrent adds can't both store them
+        added = self._menu.add_dishes(dishes)
+        if added:
+            try:
+                self._backend.add_dishes(added)
+            except BaseException:
+                for dish in added:
+                    self._menu.remove_dish(dish.id)
+                raise
+        return added
\ No newline at end of file
@@ -1,16 +1,10 @@
-from enum import Enum
 from typing import List
 from uuid import UUID
 
 from app.models.dish import Dish
 from app.models.interfaces import OrderFactory
 from app.models.order import Order
-
-
-class OrderType(Enum):
-    REGULAR = "regular"
-    BULK = "bulk"
-    EXPRESS = "express"
+from app.models.order_type import OrderType
 
 
 class RegularOrderFactory(OrderFactory):
@@ -18,7 +12,7 @@ class RegularOrderFactory(OrderFactory):
     
     def create_order(self, customer_id: UUID, dishes: List[Dish]) -> Order:
         """Create a regular order."""
-        return Order(customer_id, dishes)
+        return Order(customer_id, dishes, OrderType.REGULAR)
 
 
 class BulkOrderFactory(OrderFactory):
@@ -26,10 +20,8 @@ class BulkOrderFactory(OrderFactory):
     
     def create_order(self, customer_id: UUID, dishes: List[Dish]) -> Order:
         """Create a bulk order with a discount."""
-        order = Order(customer_id, dishes)
-        # Apply a 10% discount for bulk orders
-        # In a real implementation, we would extend the Order class for different order types
-        return order
+        # The pricing engine applies the bulk discount to BULK orders
+        return Order(customer_id, dishes, OrderType.BULK)
 
 
 class ExpressOrderFactory(OrderFactory):
@@ -37,9 +29,8 @@ class ExpressOrderFactory(OrderFactory):
     
     def create_order(self, customer_id: UUID, dishes: List[Dish]) -> Order:
         """Create an express order with priority handling."""
-        order = Order(customer_id, dishes)
-        # Express orders would have priority handling in a real implementation
-        return order
+        # The kitchen scheduler serves express orders ahead of the others
+        return Order(customer_id, dishes, OrderType.EXPRESS)
 
 
 class OrderFactoryProvider:
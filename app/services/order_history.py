@@ -0,0 +1,115 @@
+import os
+import re
+from contextlib import ExitStack
+from typing import Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from app.models.order import Order, OrderStatus
+from app.services.order_database import OrderDatabase
+from app.services.order_segments import OrderSegment, write_segment
+
+# Orders read from the database per page while exporting a segment
+EXPORT_PAGE_SIZE = 10_000
+
+_SEGMENT_NAME = re.compile(r"^orders-(\d+)-(\d+)\.seg$")
+
+
+class OrderHistoryService:
+    """
+    Service for reporting over past orders kept in memory-mapped segment files.
+    Follows the Single Responsibility Principle by focusing only on historical scans.
+    
+    Each segment holds the orders created in one period, named after that period, so scans
+    over a date range open only the segments that overlap it and then bisect their time column.
+    Scans read the columns they filter on in place and never rebuild Order objects.
+    """
+    
+    def __init__(self, directory: str):
+        self.db = OrderDatabase()
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        
+    def _periods(self) -> List[Tuple[int, int, str]]:
+        """Get the (start_us, end_us, path) of every segment, oldest first."""
+        periods = []
+        for name in os.listdir(self.directory):
+            match = _SEGMENT_NAME.match(name)
+            if match:
+                periods.append((int(match.group(1)), int(match.group(2)), os.path.join(self.directory, name)))
+        return sorted(periods)
+        
+    def export(self, start_us: int, end_us: int) -> int:
+        """
+        Write the orders created in [start_us, end_us) to a new segment. Periods can't overlap,
+        so each order is counted once. Returns the number of orders written.
+        """
+        if start_us >= end_us:
+            raise ValueError("The period must end after it starts")
+        for other_start, other_end, path in self._periods():
+            if start_us < other_end and other_start < end_us:
+                raise ValueError(f"The period overlaps the segment {os.path.basename(path)}")
+        path = os.path.join(self.directory, f"orders-{start_us:016d}-{end_us:016d}.seg")
+        return write_segment(path, self._iter_orders(start_us, end_us))
+        
+    def _iter_orders(self, start_us: int, end_us: int) -> Iterator[Order]:
+        """Iterate over the orders created in a period a page at a time, oldest first."""
+        after = None
+        while True:
+            orders, after = self.db.get_orders_page(after, start_us, end_us, EXPORT_PAGE_SIZE)
+            yield from orders
+            if after is None:
+                return
+                
+    def _open(self, stack: ExitStack, start_us: Optional[int], end_us: Optional[int]) -> List[OrderSegment]:
+        """Open the segments that may hold orders created in [start_us, end_us)."""
+        segments = []
+        for period_start, period_end, path in self._periods():
+            if (start_us is None or period_end > start_us) and (end_us is None or period_start < end_us):
+                segment = stack.enter_context(OrderSegment(path))
+                if segment.overlaps(start_us, end_us):
+                    segments.append(segment)
+        return segments
+        
+    def scan(
+        self,
+        start_us: Optional[int] = None,
+        end_us: Optional[int] = None,
+        customer_id: Optional[UUID] = None,
+        status: Optional[OrderStatus] = None
+    ) -> List[UUID]:
+        """Get the IDs of past orders created in [start_us, end_us) matching the filters, oldest first."""
+        with ExitStack() as stack:
+            return [
+                order_id
+                for segment in self._open(stack, start_us, end_us)
+                for order_id in segment.scan(status, start_us, end_us, customer_id)
+            ]
+            
+    def summarize(
+        self,
+        start_us: Optional[int] = None,
+        end_us: Optional[int] = None,
+        customer_id: Optional[UUID] = None
+    ) -> Dict[OrderStatus, Tuple[int, int]]:
+        """Count the past orders with each status and sum their totals in cents."""
+        summary = {status: (0, 0) for status in OrderStatus}
+        with ExitStack() as stack:
+            for segment in self._open(stack, start_us, end_us):
+                for status, (count, total_cents) in segment.summarize(start_us, end_us, customer_id).items():
+                    summary[status] = (summary[status][0] + count, summary[status][1] + total_cents)
+        return summary
+        
+    def dish_quantities(
+        self,
+        start_us: Optional[int] = None,
+        end_us: Optional[int] = None,
+        customer_id: Optional[UUID] = None,
+        status: Optional[OrderStatus] = None
+    ) -> Dict[UUID, int]:
+        """Sum how many of each dish past orders contained."""
+        quantities: Dict[UUID, int] = {}
+        with ExitStack() as stack:
+            for segment in self._open(stack, start_us, end_us):
+                for dish_id, quantity in segment.dish_quantities(status, start_us, end_us, customer_id).items():
+                    quantities[dish_id] = quantities.get(dish_id, 0) + quantity
+        return quantities
@@ -0,0 +1,140 @@
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from app.models.interfaces import OrderObserver
+from app.models.locks import ReadWriteLock
+from app.models.order import Order, OrderStatus
+from app.models.order_events import OrderEvent, OrderEventKind
+
+
+class OrderIndexes(OrderObserver):
+    """
+    Secondary indexes of order IDs by customer, by status and by creation time, maintained
+    by OrderDatabase. Each group is an insertion-ordered dict used as a set, so adding, moving
+    and removing an order are O(1). Subscribed to the order event bus, so orders move between
+    status groups on every status change, including changes made directly through
+    Order.update_status.
+    
+    The time index is a sorted list of (created_at_us, order ID as int) keys, so a page of
+    orders is found by bisection wherever it starts.
+    """
+    
+    def __init__(self, get_order: Callable[[UUID], Optional[Order]]):
+        self._get_order = get_order
+        self._by_customer: Dict[UUID, Dict[UUID, None]] = {}
+        self._by_status: Dict[OrderStatus, Dict[UUID, None]] = {status: {} for status in OrderStatus}
+        self._by_created: List[Tuple[int, int]] = []
+        self._lock = ReadWriteLock()
+        
+    def add(self, order: Order) -> None:
+        """Index an order; indexing an order again changes nothing."""
+        order_id = order.id
+        key = (order.created_at_us, order_id.int)
+        with self._lock.write():
+            self._by_customer.setdefault(order.customer_id, {})[order_id] = None
+            self._set_status(order_id, order.status)
+            position = bisect_left(self._by_created, key)
+            if position == len(self._by_created) or self._by_created[position] != key:
+                self._by_created.insert(position, key)
+                
+    def add_all(self, orders: Iterable[Order]) -> None:
+        """Index many orders at once, sorting the time index only once."""
+        with self._lock.write():
+            for order in orders:
+                self._by_customer.setdefault(order.customer_id, {})[order.id] = None
+                self._by_status[order.status][order.id] = None
+                self._by_created.append((order.created_at_us, order.id.int))
+            self._by_created.sort()
+            
+    def remove(self, order: Order) -> None:
+        """Drop an order from the indexes."""
+        order_id = order.id
+        with self._lock.write():
+            orders = self._by_customer.get(order.customer_id)
+            if orders is not None:
+                orders.pop(order_id, None)
+                if not orders:
+                    del self._by_customer[order.customer_id]
+            self._set_status(order_id, None)
+            key = (order.created_at_us, order_id.int)
+            position = bisect_left(self._by_created, key)
+            if position < len(self._by_created) and self._by_created[position] == key:
+                del self._by_created[position]
+                
+    def _set_status(self, order_id: UUID, status: Optional[OrderStatus]) -> None:
+        """Move an order into one status group. Must be called with the write lock held."""
+        for status_group, orders in self._by_status.items():
+            if status_group is status:
+                orders[order_id] = None
+            else:
+                orders.pop(order_id, None)
+                
+    def set_status(self, order_id: UUID, status: OrderStatus) -> None:
+        """Move an order to the group of a status it is known to have."""
+        with self._lock.write():
+            self._set_status(order_id, status)
+            
+    def refresh_status(self, order_id: UUID) -> None:
+        """Move an order to the group of its current stored status."""
+        with self._lock.write():
+            # Reading the status under the lock means the last refresh always wins,
+            # even if events for the same order are delivered out of order
+            order = self._get_order(order_id)
+            if order is not None:
+                self._set_status(order_id, order.status)
+                
+    def get_by_customer(self, customer_id: UUID) -> List[UUID]:
+        """Get the IDs of a customer's orders, oldest first."""
+        with self._lock.read():
+            return list(self._by_customer.get(customer_id, ()))
+            
+    def get_by_status(self, status: OrderStatus) -> List[UUID]:
+        """Get the IDs of orders with a status, in the order they reached it."""
+        with self._lock.read():
+            return list(self._by_status[status])
+            
+    def get_page_by_created(
+        self,
+        after: Optional[Tuple[int, int]] = None,
+        start_us: Optional[int] = None,
+        end_us: Optional[int] = None,
+        limit: Optional[int] = None,
+        status: Optional[OrderStatus] = None
+    ) -> Tuple[List[UUID], Optional[Tuple[int, int]]]:
+        """
+        Get the IDs of orders created in [start_us, end_us), oldest first, starting after the
+        given (created_at_us, order ID as int) key. Returns the IDs and the key to pass as
+        `after` for the next page, or None if this is the last page.
+        With a status, orders are filtered as the index is walked, so a page costs as much
+        as the number of orders skipped to fill it.
+        """
+        with self._lock.read():
+            index = self._by_created
+            start = 0 if start_us is None else bisect_left(index, (start_us,))
+            if after is not None:
+                start = max(start, bisect_left(index, (after[0], after[1] + 1)))
+            end = len(index) if end_us is None else bisect_left(index, (end_us,))
+            if status is None:
+                stop = end if limit is None else min(end, start + limit)
+                keys = index[start:stop]
+            else:
+                members = self._by_status[status]
+                keys = []
+                stop = start
+                while stop < end and (limit is None or len(keys) < limit):
+                    key = index[stop]
+                    stop += 1
+                    if UUID(int=key[1]) in members:
+                        keys.append(key)
+        next_key = keys[-1] if stop < end and keys else None
+        return [UUID(int=order_id) for _, order_id in keys], next_key
+        
+    def on_event(self, event: OrderEvent) -> None:
+        """Keep the status index up to date."""
+        if event.kind == OrderEventKind.STATUS_CHANGED:
+            self.refresh_status(event.order_id)
+            
+    def update(self, order_id: UUID) -> None:
+        """Re-read an order's status."""
+        self.refresh_status(order_id)
@@ -0,0 +1,188 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from app.models.order import Order, dish_at
+from app.services.journal import fsync_directory
+from app.services.order_archive import OrderColumnArrays, OrderColumns
+
+# A segment file is a header followed by fixed-width columns, each starting on an 8-byte
+# boundary, in _COLUMNS order and then the dish ID table. Column sizes follow from the counts
+# in the header, so any column can be mapped without reading the others.
+SEGMENT_MAGIC = b"ORDSEG\x00\x01"
+SEGMENT_VERSION = 1
+_HEADER = struct.Struct("<8sHHIQQQqq")
+_HEADER_SIZE = 64
+_DISH_ID_SIZE = 16
+
+# (attribute, typecode, length in rows, items or dishes); "rows+1" is the item offsets column
+_COLUMNS = [
+    ("_id_high", "Q", "rows"),
+    ("_id_low", "Q", "rows"),
+    ("_customer_high", "Q", "rows"),
+    ("_customer_low", "Q", "rows"),
+    ("_created", "q", "rows"),
+    ("_updated", "q", "rows"),
+    ("_totals", "q", "rows"),
+    ("_item_starts", "Q", "rows+1"),
+    ("_item_dishes", "I", "items"),
+    ("_item_quantities", "I", "items"),
+    ("_statuses", "B", "rows"),
+    ("_order_types", "B", "rows"),
+]
+
+
+def _aligned(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _column_layout(rows: int, items: int) -> Tuple[List[Tuple[str, str, int, int]], int]:
+    """Get (attribute, typecode, offset, length) for every column, and where the dish table starts."""
+    lengths = {"rows": rows, "rows+1": rows + 1, "items": items}
+    layout = []
+    offset = _HEADER_SIZE
+    for attribute, typecode, length in _COLUMNS:
+        count = lengths[length]
+        layout.append((attribute, typecode, offset, count))
+        offset = _aligned(offset + count * array(typecode).itemsize)
+    return layout, offset
+
+
+def _sorted_by_creation(columns: OrderColumnArrays) -> OrderColumnArrays:
+    """Get the columns with rows in creation order, as segments require."""
+    created = columns._created
+    if all(map(int.__le__, created, created[1:])):
+        return columns
+    order = sorted(range(len(columns)), key=created.__getitem__)
+    result = OrderColumnArrays()
+    for attribute, typecode, length in _COLUMNS:
+        if length == "rows":
+            column = getattr(columns, attribute)
+            setattr(result, attribute, array(typecode, map(column.__getitem__, order)))
+    starts = columns._item_starts
+    for row in order:
+        start, stop = starts[row], starts[row + 1]
+        result._item_dishes.extend(columns._item_dishes[start:stop])
+        result._item_quantities.extend(columns._item_quantities[start:stop])
+        result._item_starts.append(len(result._item_dishes))
+    return result
+
+
+def write_segment(path: str, orders: Iterable[Order]) -> int:
+    """
+    Write orders to a new segment file, sorted by creation time. The file is written under a
+    temporary name and renamed into place, so a segment is either complete or absent.
+    Returns the number of orders written.
+    """
+    columns = OrderColumnArrays()
+    columns.append_orders(orders)
+    columns = _sorted_by_creation(columns)
+    rows = len(columns)
+    # Items refer to dishes by their position in the segment's own dish table
+    dish_positions = {index: position for position, index in enumerate(dict.fromkeys(columns._item_dishes))}
+    columns._item_dishes = array("I", map(dish_positions.__getitem__, columns._item_dishes))
+    dish_ids = b"".join(dish_at(index).id.bytes for index in dish_positions)
+    
+    layout, dish_table = _column_layout(rows, len(columns._item_dishes))
+    created = columns._created
+    header = _HEADER.pack(
+        SEGMENT_MAGIC, SEGMENT_VERSION, 0, 0, rows, len(columns._item_dishes), len(dish_positions),
+        created[0] if rows else 0, created[-1] if rows else 0
+    )
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        file.write(header.ljust(_HEADER_SIZE, b"\0"))
+        for attribute, _, offset, _ in layout:
+            column = getattr(columns, attribute)
+            if sys.byteorder == "big":
+                column = array(column.typecode, column)
+                column.byteswap()
+            file.write(b"\0" * (offset - file.tell()))
+            column.tofile(file)
+        file.write(b"\0" * (dish_table - file.tell()))
+        file.write(dish_ids)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+    fsync_directory(path)
+    return rows
+
+
+class OrderSegment(OrderColumns):
+    """
+    A segment file mapped into memory. Every column is a memoryview straight over the mapping,
+    so opening a segment reads only its header and scans touch only the columns they filter on.
+    Rows are in creation order, so time ranges are found by bisection instead of scanned.
+    Close the segment, or use it as a context manager, once no scan is running over it.
+    """
+    
+    def __init__(self, path: str):
+        if sys.byteorder == "big":
+            raise NotImplementedError("Segments can only be mapped on little-endian machines")
+        self.path = path
+        with open(path, "rb") as file:
+            self._mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mapping)
+        try:
+            self._map_columns()
+        except ValueError:
+            self.close()
+            raise
+            
+    def _map_columns(self) -> None:
+        if len(self._view) < _HEADER_SIZE:
+            raise ValueError(f"Not an order segment: {self.path}")
+        magic, version, _, _, rows, items, dishes, first_created, last_created = _HEADER.unpack_from(self._view)
+        if magic != SEGMENT_MAGIC or version != SEGMENT_VERSION:
+            raise ValueError(f"Not an order segment: {self.path}")
+        layout, dish_table = _column_layout(rows, items)
+        if len(self._view) < dish_table + dishes * _DISH_ID_SIZE:
+            raise ValueError(f"Truncated order segment: {self.path}")
+        for attribute, typecode, offset, count in layout:
+            setattr(self, attribute, self._view[offset:offset + count * array(typecode).itemsize].cast(typecode))
+        self._dish_ids = self._view[dish_table:dish_table + dishes * _DISH_ID_SIZE]
+        self.first_created_us = first_created
+        self.last_created_us = last_created
+        
+    def __len__(self) -> int:
+        return len(self._statuses)
+        
+    def __enter__(self) -> "OrderSegment":
+        return self
+        
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+        
+    def overlaps(self, start_us: Optional[int], end_us: Optional[int]) -> bool:
+        """Check whether the segment may hold orders created in [start_us, end_us)."""
+        if not len(self):
+            return False
+        return (start_us is None or self.last_created_us >= start_us) and (
+            end_us is None or self.first_created_us < end_us
+        )
+        
+    def _rows(self, start_us: Optional[int], end_us: Optional[int]) -> Tuple[range, bool]:
+        start = 0 if start_us is None else bisect_left(self._created, start_us)
+        stop = len(self) if end_us is None else bisect_left(self._created, end_us)
+        return range(start, max(start, stop)), True
+        
+    def _dish_id(self, index: int) -> UUID:
+        offset = index * _DISH_ID_SIZE
+        return UUID(bytes=bytes(self._dish_ids[offset:offset + _DISH_ID_SIZE]))
+        
+    def close(self) -> None:
+        """Release the column views and unmap the file."""
+        for attribute, _, _ in _COLUMNS:
+            column = self.__dict__.pop(attribute, None)
+            if column is not None:
+                column.release()
+        dish_ids = self.__dict__.pop("_dish_ids", None)
+        if dish_ids is not None:
+            dish_ids.release()
+        self._view.release()
+        self._mapping.close()
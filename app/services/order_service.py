@@ -1,8 +1,9 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 
 from app.models.dish import Dish
-from app.models.order import Order, OrderStatus
+from app.models.order import MAX_DISH_QUANTITY, Order, OrderStatus
+from app.models.order_events import OrderEventBus, OrderEventKind
 from app.services.order_database import OrderDatabase
 from app.services.order_factory import OrderFactoryProvider, OrderType
 
@@ -31,8 +32,9 @@ class OrderService:
         factory = OrderFactoryProvider.get_factory(order_type)
         order = factory.create_order(customer_id, dishes)
         
-        # Save the order to the database
+        # Save the order to the database and let subscribers (e.g. the kitchen) know
         self.db.add_order(order)
+        order.notify(OrderEventKind.CREATED)
         
         return order
         
@@ -44,34 +46,66 @@ class OrderService:
         """Get all orders."""
         return self.db.get_all_orders()
         
+    def get_orders_by_customer(self, customer_id: UUID) -> List[Order]:
+        """Get a customer's orders, oldest first."""
+        return self.db.get_orders_by_customer(customer_id)
+        
+    def get_orders_by_status(self, status: OrderStatus) -> List[Order]:
+        """Get the orders with a status."""
+        return self.db.get_orders_by_status(status)
+        
+    def get_orders_page(
+        self,
+        after: Optional[Tuple[int, int]] = None,
+        start_us: Optional[int] = None,
+        end_us: Optional[int] = None,
+        limit: Optional[int] = None,
+        status: Optional[OrderStatus] = None
+    ) -> Tuple[List[Order], Optional[Tuple[int, int]]]:
+        """Get a page of orders in creation order, and the key of the next page."""
+        return self.db.get_orders_page(after, start_us, end_us, limit, status)
+        
     def update_order_status(self, order_id: UUID, status: OrderStatus) -> bool:
         """Update an order's status."""
-        order = self.db.get_order(order_id)
-        if order:
-            order.update_status(status)
-            return True
-        return False
-        
+        # Events go out once the order's lock is released, so observers that update
+        # other orders can't deadlock against us
+        with OrderEventBus().batch(), self.db.lock_order(order_id) as order:
+            if order:
+                order.update_status(status)
+                return self.db.save_order_status(order)
+            return False
+            
     def add_dish_to_order(self, order_id: UUID, dish_id: UUID) -> bool:
         """Add a dish to an existing order."""
-        order = self.db.get_order(order_id)
         menu = self.db.get_menu()
         
-        if order and order.status == OrderStatus.CREATED:
-            dish = menu.get_dish(dish_id)
-            if dish:
-                order.add_dish(dish)
-                return True
-        return False
-        
+        with self.db.lock_order(order_id) as order:
+            if order and order.status == OrderStatus.CREATED:
+                dish = menu.get_dish(dish_id)
+                if dish and order.get_quantity(dish_id) < MAX_DISH_QUANTITY:
+                    order.add_dish(dish)
+                    return self.db.save_order_item(order, dish)
+            return False
+            
     def remove_dish_from_order(self, order_id: UUID, dish_id: UUID) -> bool:
         """Remove a dish from an existing order."""
-        order = self.db.get_order(order_id)
-        
-        if order and order.status == OrderStatus.CREATED:
-            return order.remove_dish(dish_id)
-        return False
-        
+        with self.db.lock_order(order_id) as order:
+            if order and order.status == OrderStatus.CREATED:
+                dish = order.get_dish(dish_id)
+                if dish and order.remove_dish(dish_id):
+                    return self.db.save_order_item(order, dish)
+            return False
+            
+    def set_dish_quantity(self, order_id: UUID, dish_id: UUID, quantity: int) -> bool:
+        """Set how many of a dish are in an existing order; zero removes the dish."""
+        with self.db.lock_order(order_id) as order:
+            if order and order.status == OrderStatus.CREATED and 0 <= quantity <= MAX_DISH_QUANTITY:
+                dish = self.db.get_menu().get_dish(dish_id) or order.get_dish(dish_id)
+                if dish:
+                    order.set_dish_quantity(dish, quantity)
+                    return self.db.save_order_item(order, dish)
+            return False
+            
     def calculate_order_total(self, order_id: UUID) -> Optional[float]:
         """Calculate the total price of an order."""
         order = self.db.get_order(order_id)
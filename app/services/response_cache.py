@@ -0,0 +1,122 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, Hashable, Optional
+from uuid import UUID
+
+
+def dishes_key(etag: str) -> Hashable:
+    """
+    Cache key for the whole dish list at one menu version.
+    Catalog keys carry the menu ETag, so a body is only ever served with the ETag of the
+    snapshot it was encoded from, and a menu change needs no invalidation.
+    """
+    return ("dishes", etag)
+
+
+def dish_key(dish_id: UUID) -> Hashable:
+    """Cache key for a single dish."""
+    return ("dish", dish_id)
+
+
+def category_key(category: Optional[str], etag: str) -> Hashable:
+    """Cache key for the dishes in one category at one menu version."""
+    return ("category", category, etag)
+
+
+def customer_key(customer_id: UUID) -> Hashable:
+    """Cache key for a single customer."""
+    return ("customer", customer_id)
+
+
+class ResponseCache:
+    """
+    Singleton LRU cache of fully encoded JSON response bodies. Entries stay current in one of
+    three ways, depending on the data behind them:
+    - Catalog keys (dishes_key, category_key) carry the menu ETag, so a menu change moves
+      readers to new keys and the old entries age out; nothing is invalidated.
+    - Dish keys need neither, as a dish never changes once added; routes check that the dish
+      is still on the menu before serving its body.
+    - Customer keys are invalidated whenever a customer is stored, and a generation counter
+      keeps a body encoded before an invalidation from being cached after it.
+    """
+    
+    _instance = None
+    
+    DEFAULT_MAX_ENTRIES = 1024
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ResponseCache, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+        
+    def _initialize(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """Initialize the cache."""
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = Lock()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bumped on every invalidation so bodies encoded from older data are not cached
+        self._generation = 0
+        
+    def __len__(self) -> int:
+        return len(self._entries)
+        
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Get a cached body, marking it as recently used."""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+            
+    def put(self, key: Hashable, body: bytes, generation: Optional[int] = None) -> None:
+        """
+        Cache a body, evicting the least recently used entries when full.
+        If a generation is given, the body is dropped when an invalidation happened since.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+                
+    def get_or_encode(self, key: Hashable, encode: Callable[[], bytes]) -> bytes:
+        """Get a cached body, encoding and caching it on a miss."""
+        generation = self._generation
+        body = self.get(key)
+        if body is None:
+            body = encode()
+            self.put(key, body, generation)
+        return body
+        
+    def invalidate(self, *keys: Hashable) -> None:
+        """Drop the given keys from the cache."""
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+                
+    def clear(self) -> None:
+        """Drop every cached body."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            
+    def stats(self) -> Dict[str, int]:
+        """Get cache size and hit/miss counters."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
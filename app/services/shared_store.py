@@ -0,0 +1,497 @@
+"""
+Share one storage backend between worker processes through a store process on a Unix socket.
+
+Start the store, then point every worker at its socket with ORDER_STORE_SOCKET:
+    python -m app.services.shared_store --socket /tmp/orders.sock --data-dir data
+    ORDER_STORE_SOCKET=/tmp/orders.sock uvicorn app.main:app --workers 8
+"""
+import argparse
+import os
+import pickle
+import socket
+import socketserver
+import struct
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
+
+from app.models.customer import Customer
+from app.models.dish import Dish
+from app.models.locks import StripedLock
+from app.models.order import Order
+from app.services.customer_indexes import CustomerIndexes
+from app.services.journaled_backend import JournaledBackend
+from app.services.kitchen_scheduler import KitchenScheduler, KitchenTicket
+from app.services.kitchen_stream import KitchenEvent, KitchenStream
+from app.services.order_service import OrderService
+from app.services.sqlite_backend import SQLiteBackend
+from app.services.storage_backend import StorageBackend
+
+# Changes kept for workers to poll; a worker that falls further behind reloads everything
+DEFAULT_CHANGE_LOG_SIZE = 100_000
+
+# Kitchen display events kept for workers to poll, as many as one stream's replay log
+DEFAULT_KITCHEN_LOG_SIZE = 1000
+
+# Messages are pickled and prefixed with their length. Pickle is only safe between
+# processes that trust each other, so the socket is only accessible to its owner.
+_LENGTH = struct.Struct("<I")
+
+# Backend methods workers may call, and the change each call publishes on success
+_METHODS: Dict[str, Optional[Callable[[tuple], tuple]]] = {
+    "add_order": lambda args: ("order_added", args[0]),
+    "get_order": None,
+    "get_all_orders": None,
+    "update_order": lambda args: ("status", args[0].id, args[0].status),
+    "update_order_status": lambda args: ("status", args[0].id, args[0].status),
+    "update_order_item": None,
+    "get_customer": None,
+    "get_all_customers": None,
+    "add_dishes": lambda args: ("dishes", args[0]),
+    "get_all_dishes": None,
+    "archive_closed_orders": None,
+}
+
+# Kitchen scheduler methods that read or change the queue and station state kept in the store
+_KITCHEN_METHODS = {
+    "__len__", "_push", "discard", "get_queue", "get_station_ticket", "_pop_ticket", "_set_station", "_release",
+}
+
+
+def _send(connection: socket.socket, message: Any) -> None:
+    data = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+    connection.sendall(_LENGTH.pack(len(data)) + data)
+
+
+def _receive(stream) -> Any:
+    header = stream.read(_LENGTH.size)
+    if len(header) < _LENGTH.size:
+        raise ConnectionError("The connection was closed")
+    (length,) = _LENGTH.unpack(header)
+    data = stream.read(length)
+    if len(data) < length:
+        raise ConnectionError("The connection was closed")
+    return pickle.loads(data)
+
+
+class _ConnectionHandler(socketserver.StreamRequestHandler):
+    """Serves one worker connection: one request at a time, answered in order."""
+    
+    server: "_UnixServer"
+    
+    def handle(self) -> None:
+        store = self.server.store
+        held: List[UUID] = []
+        try:
+            while True:
+                try:
+                    client_id, method, args = _receive(self.rfile)
+                except ConnectionError:
+                    return
+                try:
+                    result = ("ok", store.dispatch(client_id, method, args, held))
+                except Exception as error:
+                    result = ("error", error)
+                try:
+                    _send(self.request, result)
+                except pickle.PicklingError:
+                    _send(self.request, ("error", RuntimeError(repr(result[1]))))
+        finally:
+            # Locks held by a worker that went away would otherwise block everyone else
+            for order_id in reversed(held):
+                store.order_locks.for_key(order_id).release()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    
+    def __init__(self, path: str, store: "StoreServer"):
+        self.store = store
+        super().__init__(path, _ConnectionHandler)
+
+
+class StoreServer:
+    """
+    Serves one storage backend to any number of worker processes over a Unix socket.
+    Every change is also recorded in a change log, which workers poll to keep their
+    in-memory indexes current, and order locks are held here so that read-modify-writes
+    of one order are serialized across processes. Customer emails are checked for
+    uniqueness here too, since workers only see each other's customers after a poll.
+    The kitchen queue lives here as well, so every worker's stations pull from one queue, and
+    kitchen display events are numbered here, so every worker's screens see the same events.
+    """
+    
+    def __init__(self, path: str, backend: StorageBackend, change_log_size: int = DEFAULT_CHANGE_LOG_SIZE):
+        self.path = path
+        self.backend = backend
+        self.order_locks = StripedLock()
+        self._changes: Deque[Tuple[int, str, tuple]] = deque(maxlen=change_log_size)
+        self._sequence = 0
+        self._changes_lock = threading.Lock()
+        self._customers = CustomerIndexes()
+        self._customers.add_all(backend.get_all_customers())
+        # Only holds tickets and stations; workers change order statuses themselves
+        self.kitchen = KitchenScheduler(None)
+        self._kitchen_events: Deque[KitchenEvent] = deque(maxlen=DEFAULT_KITCHEN_LOG_SIZE)
+        self._kitchen_last_id = 0
+        self._kitchen_condition = threading.Condition()
+        if os.path.exists(path):
+            os.remove(path)
+        # Created with owner-only permissions, so no other user can connect
+        umask = os.umask(0o177)
+        try:
+            self._server = _UnixServer(path, self)
+        finally:
+            os.umask(umask)
+        self._thread: Optional[threading.Thread] = None
+        
+    def dispatch(self, client_id: str, method: str, args: tuple, held: List[UUID]) -> Any:
+        """Run one request from a worker."""
+        if method == "poll_changes":
+            return self._poll(client_id, args[0])
+        if method == "lock_order":
+            self.order_locks.for_key(args[0]).acquire()
+            held.append(args[0])
+            return None
+        if method == "unlock_order":
+            held.remove(args[0])
+            self.order_locks.for_key(args[0]).release()
+            return None
+        if method == "delete_order":
+            order = self.backend.get_order(args[0])
+            deleted = order is not None and self.backend.delete_order(args[0])
+            if deleted:
+                self._record(client_id, ("order_deleted", order))
+            return deleted
+        if method == "add_customer":
+            customer = args[0]
+            self._customers.add(customer)
+            try:
+                self.backend.add_customer(customer)
+            except BaseException:
+                self._customers.remove(customer, self.backend.get_customer(customer.id))
+                raise
+            self._record(client_id, ("customer", customer))
+            return None
+        if method == "publish_kitchen_event":
+            return self._publish_kitchen_event(*args)
+        if method == "poll_kitchen_events":
+            return self._poll_kitchen_events(*args)
+        if method == "kitchen":
+            name, kitchen_args = args
+            if name not in _KITCHEN_METHODS:
+                raise ValueError(f"Unknown kitchen method: {name}")
+            return getattr(self.kitchen, name)(*kitchen_args)
+        if method not in _METHODS:
+            raise ValueError(f"Unknown store method: {method}")
+        result = getattr(self.backend, method)(*args)
+        change = _METHODS[method]
+        # Updates return False for orders that don't exist, and nothing changed then
+        if change is not None and result is not False:
+            self._record(client_id, change(args))
+        return result
+        
+    def _record(self, client_id: str, change: tuple) -> None:
+        with self._changes_lock:
+            self._sequence += 1
+            self._changes.append((self._sequence, client_id, change))
+            
+    def _poll(self, client_id: str, since: Optional[int]) -> Tuple[int, Optional[List[tuple]]]:
+        """Get the latest sequence number and the changes by other workers after since."""
+        with self._changes_lock:
+            if since is None:
+                return self._sequence, []
+            if since > self._sequence or (
+                since < self._sequence and (not self._changes or self._changes[0][0] > since + 1)
+            ):
+                # The log no longer reaches back to since, or the store was restarted
+                return self._sequence, None
+            # Walk back from the newest change, so a poll costs only what is new
+            changes = []
+            for sequence, author, change in reversed(self._changes):
+                if sequence <= since:
+                    break
+                if author != client_id:
+                    changes.append(change)
+            changes.reverse()
+            return self._sequence, changes
+            
+    def _publish_kitchen_event(self, event_type: str, data: Dict[str, Any]) -> KitchenEvent:
+        """Number a kitchen display event and wake the workers waiting for one."""
+        with self._kitchen_condition:
+            self._kitchen_last_id += 1
+            event = KitchenEvent(self._kitchen_last_id, event_type, data)
+            self._kitchen_events.append(event)
+            self._kitchen_condition.notify_all()
+        return event
+        
+    def _poll_kitchen_events(
+        self,
+        since: Optional[int],
+        timeout: float
+    ) -> Tuple[int, Optional[List[KitchenEvent]]]:
+        """
+        Get the latest kitchen event id and the events after since, waiting up to timeout for
+        one if there are none yet; the events are None if the log no longer reaches back to since.
+        """
+        with self._kitchen_condition:
+            if since is None:
+                return self._kitchen_last_id, []
+            self._kitchen_condition.wait_for(lambda: self._kitchen_last_id != since, timeout)
+            events = self._kitchen_events
+            if since > self._kitchen_last_id or (
+                since < self._kitchen_last_id and (not events or events[0].id > since + 1)
+            ):
+                return self._kitchen_last_id, None
+            return self._kitchen_last_id, [event for event in events if event.id > since]
+            
+    def start(self) -> None:
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="store-server", daemon=True)
+        self._thread.start()
+        
+    def serve_forever(self) -> None:
+        """Serve until shut down."""
+        self._server.serve_forever()
+        
+    def close(self) -> None:
+        """Stop serving, then close the backend."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+        self._server.server_close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.backend.close()
+
+
+class SharedBackend(StorageBackend):
+    """
+    Backend of a worker process, forwarding every call to a StoreServer.
+    Each thread keeps its own connection, so requests from different threads never queue
+    behind each other here, and an order lock is held through the connection of the thread
+    that took it.
+    """
+    
+    shared = True
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._client_id = uuid4().hex
+        self._local = threading.local()
+        self._connections: Set[Tuple[socket.socket, Any]] = set()
+        self._connections_lock = threading.Lock()
+        self._closed = False
+        self._since, _ = self._call("poll_changes", None)
+        
+    def _connection(self) -> Tuple[socket.socket, Any]:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.path)
+            connection = (sock, sock.makefile("rb"))
+            with self._connections_lock:
+                if self._closed:
+                    connection[1].close()
+                    sock.close()
+                    raise ConnectionError("The store connection was closed")
+                self._connections.add(connection)
+            self._local.connection = connection
+        return connection
+        
+    def _call(self, method: str, *args: Any) -> Any:
+        sock, stream = self._connection()
+        _send(sock, (self._client_id, method, args))
+        status, result = _receive(stream)
+        if status == "error":
+            raise result
+        return result
+        
+    # Order methods
+    def add_order(self, order: Order) -> None:
+        """Store a new order."""
+        self._call("add_order", order)
+        
+    def get_order(self, order_id: UUID) -> Optional[Order]:
+        """Get an order by ID."""
+        return self._call("get_order", order_id)
+        
+    def get_all_orders(self) -> List[Order]:
+        """Get all orders in the order they were added."""
+        return self._call("get_all_orders")
+        
+    def update_order(self, order: Order) -> bool:
+        """Store the current state of an existing order."""
+        return self._call("update_order", order)
+        
+    def update_order_status(self, order: Order) -> bool:
+        """Store an existing order after only its status changed."""
+        return self._call("update_order_status", order)
+        
+    def update_order_item(self, order: Order, dish: Dish) -> bool:
+        """Store an existing order after only the quantity of one dish changed."""
+        return self._call("update_order_item", order, dish)
+        
+    def delete_order(self, order_id: UUID) -> bool:
+        """Delete an order by ID."""
+        return self._call("delete_order", order_id)
+        
+    def archive_closed_orders(self, closed_before_us: Optional[int] = None) -> int:
+        """Archive closed orders in the store."""
+        return self._call("archive_closed_orders", closed_before_us)
+        
+    # Customer methods
+    def add_customer(self, customer: Customer) -> None:
+        """Store a customer."""
+        self._call("add_customer", customer)
+        
+    def get_customer(self, customer_id: UUID) -> Optional[Customer]:
+        """Get a customer by ID."""
+        return self._call("get_customer", customer_id)
+        
+    def get_all_customers(self) -> List[Customer]:
+        """Get all customers in the order they were added."""
+        return self._call("get_all_customers")
+        
+    # Dish methods
+    def add_dishes(self, dishes: List[Dish]) -> None:
+        """Store dishes added to the menu."""
+        self._call("add_dishes", list(dishes))
+        
+    def get_all_dishes(self) -> List[Dish]:
+        """Get every stored dish in the order they were added."""
+        return self._call("get_all_dishes")
+        
+    # Sharing
+    def poll_changes(self) -> Optional[List[tuple]]:
+        """Get the changes other workers made since the last poll, or None if some were missed."""
+        self._since, changes = self._call("poll_changes", self._since)
+        return changes
+        
+    @contextmanager
+    def order_lock(self, order_id: UUID) -> Iterator[None]:
+        """Hold an order's lock in the store, so other workers wait for this change."""
+        self._call("lock_order", order_id)
+        try:
+            yield
+        finally:
+            self._call("unlock_order", order_id)
+            
+    def close(self) -> None:
+        """Close every thread's connection to the store; no new ones are opened after."""
+        with self._connections_lock:
+            self._closed = True
+            # The socket stays open until the stream read from it is closed too. Shutting it
+            # down first wakes threads blocked reading it, such as a kitchen stream's poll.
+            for sock, stream in self._connections:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                stream.close()
+                sock.close()
+            self._connections.clear()
+
+
+class SharedKitchenScheduler(KitchenScheduler):
+    """
+    Kitchen scheduler of a worker process, keeping its tickets and stations in the StoreServer.
+    Every order event happens in exactly one worker, whose scheduler passes it on to the store,
+    so the queue there holds the tickets of all workers and any worker can hand them out.
+    """
+    
+    def __init__(self, order_service: OrderService, backend: SharedBackend):
+        super().__init__(order_service)
+        self.backend = backend
+        
+    def _kitchen(self, method: str, *args: Any) -> Any:
+        return self.backend._call("kitchen", method, args)
+        
+    def __len__(self) -> int:
+        return self._kitchen("__len__")
+        
+    def _push(self, tickets: List[KitchenTicket]) -> None:
+        """Queue tickets in the store."""
+        if tickets:
+            self._kitchen("_push", tickets)
+            
+    def discard(self, order_id: UUID) -> bool:
+        """Take an order out of the store's queue."""
+        return self._kitchen("discard", order_id)
+        
+    def get_queue(self, limit: Optional[int] = None) -> List[KitchenTicket]:
+        """Get the store's queued tickets in the order stations will pull them."""
+        return self._kitchen("get_queue", limit)
+        
+    def get_station_ticket(self, station: str) -> Optional[UUID]:
+        """Get the order a station is currently working on."""
+        return self._kitchen("get_station_ticket", station)
+        
+    def _pop_ticket(self) -> Optional[KitchenTicket]:
+        return self._kitchen("_pop_ticket")
+        
+    def _set_station(self, station: str, order_id: Optional[UUID]) -> Optional[UUID]:
+        return self._kitchen("_set_station", station, order_id)
+        
+    def _release(self, order_id: UUID, left_kitchen: bool) -> None:
+        self._kitchen("_release", order_id, left_kitchen)
+
+
+class SharedKitchenStream(KitchenStream):
+    """
+    Kitchen stream of a worker process, numbering its events in the StoreServer.
+    Events are published to the store, and a background thread long-polls the store for the
+    events of every worker, own ones included, and pushes them to this worker's screens. Event
+    ids are the store's, so a screen can resume on any worker. The thread stops once the
+    backend's connections are closed.
+    """
+    
+    def __init__(self, backend: SharedBackend, poll_timeout: float = 1.0, **options: Any):
+        super().__init__(**options)
+        self.backend = backend
+        self.poll_timeout = poll_timeout
+        self._last_id, _ = backend._call("poll_kitchen_events", None, 0)
+        self._thread = threading.Thread(target=self._receive, name="kitchen-stream", daemon=True)
+        self._thread.start()
+        
+    def publish(self, event_type: str, data: Dict[str, Any]) -> KitchenEvent:
+        """Publish an event through the store; screens here receive it from there like any other."""
+        return self.backend._call("publish_kitchen_event", event_type, data)
+        
+    def _receive(self) -> None:
+        """Push the events of every worker to this worker's screens, until the store is unreachable."""
+        while True:
+            try:
+                last_id, events = self.backend._call("poll_kitchen_events", self._last_id, self.poll_timeout)
+            except (OSError, ValueError):
+                return
+            if events is None:
+                # Too far behind to replay; screens reload the kitchen state instead
+                events = [KitchenEvent(last_id, "resync", {"dropped": None})]
+            with self._lock:
+                for event in events:
+                    self._record(event)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--socket", required=True, help="path of the Unix socket to listen on")
+    parser.add_argument("--data-dir", default="data", help="journal directory")
+    parser.add_argument("--database", help="SQLite database file, instead of the journal")
+    args = parser.parse_args()
+    
+    backend = SQLiteBackend(args.database) if args.database else JournaledBackend(args.data_dir)
+    server = StoreServer(args.socket, backend)
+    print(f"Serving the order store on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from app.models.customer import Customer
+from app.models.dish import Dish
+from app.models.order import Order, OrderStatus
+from app.models.order_type import OrderType
+from app.services.storage_backend import StorageBackend
+
+# FastAPI runs sync routes on a threadpool of 40 threads, so 40 readers never have to wait
+DEFAULT_POOL_SIZE = 40
+# Most writes that can share one commit
+DEFAULT_COMMIT_BATCH_SIZE = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    seq INTEGER PRIMARY KEY,
+    id BLOB NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    phone TEXT,
+    address TEXT
+);
+CREATE TABLE IF NOT EXISTS dishes (
+    seq INTEGER PRIMARY KEY,
+    id BLOB NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    price REAL NOT NULL,
+    description TEXT,
+    category TEXT
+);
+CREATE TABLE IF NOT EXISTS orders (
+    seq INTEGER PRIMARY KEY,
+    id BLOB NOT NULL UNIQUE,
+    customer_id BLOB NOT NULL,
+    order_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at_us INTEGER NOT NULL,
+    updated_at_us INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS order_items (
+    order_id BLOB NOT NULL,
+    position INTEGER NOT NULL,
+    dish_id BLOB NOT NULL,
+    name TEXT NOT NULL,
+    price REAL NOT NULL,
+    description TEXT,
+    category TEXT,
+    quantity INTEGER NOT NULL,
+    PRIMARY KEY (order_id, position)
+) WITHOUT ROWID;
+"""
+
+# Statements are kept as constants so each connection's statement cache compiles them once
+INSERT_CUSTOMER = "INSERT OR REPLACE INTO customers (id, name, email, phone, address) VALUES (?, ?, ?, ?, ?)"
+SELECT_CUSTOMER = "SELECT id, name, email, phone, address FROM customers WHERE id = ?"
+SELECT_CUSTOMERS = "SELECT id, name, email, phone, address FROM customers ORDER BY seq"
+INSERT_DISH = "INSERT OR IGNORE INTO dishes (id, name, price, description, category) VALUES (?, ?, ?, ?, ?)"
+SELECT_DISHES = "SELECT id, name, price, description, category FROM dishes ORDER BY seq"
+UPSERT_ORDER = """
+INSERT INTO orders (id, customer_id, order_type, status, created_at_us, updated_at_us) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    customer_id = excluded.customer_id,
+    order_type = excluded.order_type,
+    status = excluded.status,
+    created_at_us = excluded.created_at_us,
+    updated_at_us = excluded.updated_at_us
+"""
+UPDATE_ORDER = "UPDATE orders SET status = ?, updated_at_us = ? WHERE id = ?"
+DELETE_ORDER = "DELETE FROM orders WHERE id = ?"
+SELECT_ORDER = "SELECT id, customer_id, order_type, status, created_at_us, updated_at_us FROM orders WHERE id = ?"
+SELECT_ORDERS = "SELECT id, customer_id, order_type, status, created_at_us, updated_at_us FROM orders ORDER BY seq"
+INSERT_ITEM = """
+INSERT INTO order_items (order_id, position, dish_id, name, price, description, category, quantity)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+DELETE_ITEMS = "DELETE FROM order_items WHERE order_id = ?"
+SELECT_ITEMS = """
+SELECT order_id, dish_id, name, price, description, category, quantity
+FROM order_items WHERE order_id = ? ORDER BY position
+"""
+SELECT_ALL_ITEMS = """
+SELECT order_id, dish_id, name, price, description, category, quantity
+FROM order_items ORDER BY order_id, position
+"""
+
+_Row = Tuple[Any, ...]
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of SQLite connections shared by request threads.
+    Connections are opened on first demand; once size are in use, callers wait for one to be returned.
+    """
+    
+    def __init__(self, connect: Callable[[], sqlite3.Connection], size: int = DEFAULT_POOL_SIZE):
+        if size < 1:
+            raise ValueError(f"Pool size must be positive: {size}")
+        self._connect = connect
+        self.size = size
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection for the duration of the block."""
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                opened = len(self._opened) < self.size
+                if opened:
+                    connection = self._connect()
+                    self._opened.append(connection)
+            if not opened:
+                connection = self._idle.get()
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+            
+    def close(self) -> None:
+        """Close every connection the pool has opened."""
+        with self._lock:
+            for connection in self._opened:
+                connection.close()
+            self._opened.clear()
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Backend storing everything in a SQLite database file in WAL mode.
+    Reads run in parallel on pooled connections and see a consistent snapshot per call.
+    Writes are handed to a single writer thread that applies whatever has queued up in one
+    transaction (group commit), so concurrent writers share the cost of a commit. Each write
+    still returns only once its batch is committed, and a failing write is rolled back on
+    its own without affecting the rest of its batch.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        commit_batch_size: int = DEFAULT_COMMIT_BATCH_SIZE,
+        synchronous: str = "NORMAL"
+    ):
+        self.path = path
+        self.synchronous = synchronous
+        self.commit_batch_size = commit_batch_size
+        self._pool = ConnectionPool(self._connect, pool_size)
+        self._writer_connection = self._connect()
+        self._writer_connection.execute("PRAGMA journal_mode = WAL")
+        self._writer_connection.executescript(SCHEMA)
+        self._writes: "queue.Queue[Optional[Tuple[Callable[[sqlite3.Connection], Any], Future]]]" = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run_writer, name="sqlite-writer", daemon=True)
+        self._writer.start()
+        
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; transactions are managed explicitly."""
+        connection = sqlite3.connect(
+            self.path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=128
+        )
+        connection.execute(f"PRAGMA synchronous = {self.synchronous}")
+        connection.execute("PRAGMA busy_timeout = 5000")
+        return connection
+        
+    # Writing
+    def _write(self, operation: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Queue a write for the writer thread and wait until it is committed."""
+        if self._closed:
+            raise RuntimeError("The SQLite backend is closed")
+        future: Future = Future()
+        self._writes.put((operation, future))
+        return future.result()
+        
+    def _run_writer(self) -> None:
+        """Writer loop: apply queued writes in batches, one commit per batch."""
+        connection = self._writer_connection
+        while True:
+            item = self._writes.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self.commit_batch_size:
+                try:
+                    item = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._apply_batch(connection, batch)
+            if stop:
+                return
+                
+    @staticmethod
+    def _apply_batch(
+        connection: sqlite3.Connection,
+        batch: List[Tuple[Callable[[sqlite3.Connection], Any], Future]]
+    ) -> None:
+        """Run a batch of writes in one transaction and resolve their futures."""
+        outcomes: List[Tuple[Future, Any, Optional[BaseException]]] = []
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            for operation, future in batch:
+                connection.execute("SAVEPOINT write")
+                try:
+                    result = operation(connection)
+                except Exception as error:
+                    connection.execute("ROLLBACK TO write")
+                    outcomes.append((future, None, error))
+                else:
+                    outcomes.append((future, result, None))
+                connection.execute("RELEASE write")
+            connection.execute("COMMIT")
+        except Exception as error:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            for _, future in batch:
+                future.set_exception(error)
+            return
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+                
+    # Reading
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection inside a read transaction, so several queries see one snapshot."""
+        with self._pool.connection() as connection:
+            connection.execute("BEGIN")
+            try:
+                yield connection
+            finally:
+                connection.execute("COMMIT")
+                
+    # Row conversion
+    @staticmethod
+    def _order_params(order: Order) -> Tuple[Any, ...]:
+        return (
+            order.id.bytes, order.customer_id.bytes, order.order_type.value, order.status.value,
+            order.created_at_us, order.updated_at_us
+        )
+        
+    @staticmethod
+    def _item_params(order: Order) -> List[Tuple[Any, ...]]:
+        order_id = order.id.bytes
+        return [
+            (order_id, position, dish.id.bytes, dish.name, dish.price, dish.description, dish.category, quantity)
+            for position, (dish, quantity) in enumerate(order.line_items)
+        ]
+        
+    @staticmethod
+    def _dish(dish_id: bytes, name: str, price: float, description: Optional[str], category: Optional[str]) -> Dish:
+        # Rows were validated when they were written, so skip validation on the way back
+        return Dish.model_construct(
+            id=UUID(bytes=dish_id), name=name, price=price, description=description, category=category
+        )
+        
+    @classmethod
+    def _order(cls, row: _Row, items: Sequence[_Row]) -> Order:
+        order_id, customer_id, order_type, status, created_at_us, updated_at_us = row
+        return Order.restore(
+            UUID(bytes=order_id),
+            UUID(bytes=customer_id),
+            OrderType(order_type),
+            OrderStatus(status),
+            [(cls._dish(*item[1:6]), item[6]) for item in items],
+            created_at_us,
+            updated_at_us
+        )
+        
+    @staticmethod
+    def _customer(row: _Row) -> Customer:
+        customer_id, name, email, phone, address = row
+        return Customer.model_construct(
+            id=UUID(bytes=customer_id), name=name, email=email, phone=phone, address=address
+        )
+        
+    # Order methods
+    def add_order(self, order: Order) -> None:
+        """Store a new order."""
+        params, items = self._order_params(order), self._item_params(order)
+        
+        def write(connection: sqlite3.Connection) -> None:
+            connection.execute(UPSERT_ORDER, params)
+            connection.execute(DELETE_ITEMS, (params[0],))
+            connection.executemany(INSERT_ITEM, items)
+            
+        self._write(write)
+        
+    def get_order(self, order_id: UUID) -> Optional[Order]:
+        """Get an order by ID."""
+        with self._read() as connection:
+            row = connection.execute(SELECT_ORDER, (order_id.bytes,)).fetchone()
+            if row is None:
+                return None
+            items = connection.execute(SELECT_ITEMS, (order_id.bytes,)).fetchall()
+        return self._order(row, items)
+        
+    def get_all_orders(self) -> List[Order]:
+        """Get all orders in the order they were added."""
+        with self._read() as connection:
+            rows = connection.execute(SELECT_ORDERS).fetchall()
+            items = connection.execute(SELECT_ALL_ITEMS).fetchall()
+        items_by_order: Dict[bytes, List[_Row]] = {
+            order_id: list(group) for order_id, group in groupby(items, key=lambda item: item[0])
+        }
+        return [self._order(row, items_by_order.get(row[0], ())) for row in rows]
+        
+    def update_order(self, order: Order) -> bool:
+        """Store the current state of an existing order."""
+        order_id = order.id.bytes
+        items = self._item_params(order)
+        
+        def write(connection: sqlite3.Connection) -> bool:
+            updated = connection.execute(UPDATE_ORDER, (order.status.value, order.updated_at_us, order_id))
+            if not updated.rowcount:
+                return False
+            connection.execute(DELETE_ITEMS, (order_id,))
+            connection.executemany(INSERT_ITEM, items)
+            return True
+            
+        return self._write(write)
+        
+    def update_order_status(self, order: Order) -> bool:
+        """Store an existing order after only its status changed."""
+        params = (order.status.value, order.updated_at_us, order.id.bytes)
+        return self._write(lambda connection: connection.execute(UPDATE_ORDER, params).rowcount > 0)
+        
+    def delete_order(self, order_id: UUID) -> bool:
+        """Delete an order by ID."""
+        
+        def write(connection: sqlite3.Connection) -> bool:
+            connection.execute(DELETE_ITEMS, (order_id.bytes,))
+            return connection.execute(DELETE_ORDER, (order_id.bytes,)).rowcount > 0
+            
+        return self._write(write)
+        
+    # Customer methods
+    def add_customer(self, customer: Customer) -> None:
+        """Store a customer."""
+        params = (customer.id.bytes, customer.name, customer.email, customer.phone, customer.address)
+        self._write(lambda connection: connection.execute(INSERT_CUSTOMER, params))
+        
+    def get_customer(self, customer_id: UUID) -> Optional[Customer]:
+        """Get a customer by ID."""
+        with self._read() as connection:
+            row = connection.execute(SELECT_CUSTOMER, (customer_id.bytes,)).fetchone()
+        return None if row is None else self._customer(row)
+        
+    def get_all_customers(self) -> List[Customer]:
+        """Get all customers in the order they were added."""
+        with self._read() as connection:
+            rows = connection.execute(SELECT_CUSTOMERS).fetchall()
+        return [self._customer(row) for row in rows]
+        
+    # Dish methods
+    def add_dishes(self, dishes: List[Dish]) -> None:
+        """Store dishes added to the menu."""
+        params = [
+            (dish.id.bytes, dish.name, dish.price, dish.description, dish.category)
+            for dish in dishes
+        ]
+        self._write(lambda connection: connection.executemany(INSERT_DISH, params))
+        
+    def get_all_dishes(self) -> List[Dish]:
+        """Get every stored dish in the order they were added."""
+        with self._read() as connection:
+            rows = connection.execute(SELECT_DISHES).fetchall()
+        return [self._dish(*row) for row in rows]
+        
+    def close(self) -> None:
+        """Finish queued writes, then close every connection."""
+        if self._closed:
+            return
+        self._closed = True
+        self._writes.put(None)
+        self._writer.join()
+        self._writer_connection.close()
+        self._pool.close()
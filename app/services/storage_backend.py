@@ -0,0 +1,230 @@
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from time import time_ns
+from typing import Callable, ContextManager, Dict, List, Optional, Tuple, TypeVar
+from uuid import UUID
+
+from app.models.customer import Customer
+from app.models.dish import Dish
+from app.models.locks import ReadWriteLock
+from app.models.order import Order
+from app.services.order_archive import CLOSED_STATUSES, ArchiveView, OrderArchive
+
+# Closed orders are archived once they haven't changed for this long
+DEFAULT_ARCHIVE_AFTER = 600.0
+# Saves of closed orders between archive sweeps
+ARCHIVE_SWEEP_EVERY = 1000
+
+T = TypeVar("T")
+
+
+class StorageBackend(ABC):
+    """
+    Interface for where OrderDatabase keeps orders, customers and dishes.
+    Orders handed out by a backend may be copies, so changes to an order only stick once
+    they are passed back through update_order.
+    
+    A shared backend is also changed by other processes. OrderDatabase then keeps its
+    in-memory indexes current by applying poll_changes, and locks orders through order_lock.
+    """
+    
+    shared = False
+    
+    # Order methods
+    @abstractmethod
+    def add_order(self, order: Order) -> None:
+        """Store a new order."""
+        pass
+        
+    @abstractmethod
+    def get_order(self, order_id: UUID) -> Optional[Order]:
+        """Get an order by ID."""
+        pass
+        
+    @abstractmethod
+    def get_all_orders(self) -> List[Order]:
+        """Get all orders in the order they were added."""
+        pass
+        
+    @abstractmethod
+    def update_order(self, order: Order) -> bool:
+        """Store the current state of an existing order."""
+        pass
+        
+    @abstractmethod
+    def delete_order(self, order_id: UUID) -> bool:
+        """Delete an order by ID."""
+        pass
+        
+    def update_order_status(self, order: Order) -> bool:
+        """Store an existing order after only its status changed."""
+        return self.update_order(order)
+        
+    def update_order_item(self, order: Order, dish: Dish) -> bool:
+        """Store an existing order after only the quantity of one dish changed."""
+        return self.update_order(order)
+        
+    # Customer methods
+    @abstractmethod
+    def add_customer(self, customer: Customer) -> None:
+        """Store a customer."""
+        pass
+        
+    @abstractmethod
+    def get_customer(self, customer_id: UUID) -> Optional[Customer]:
+        """Get a customer by ID."""
+        pass
+        
+    @abstractmethod
+    def get_all_customers(self) -> List[Customer]:
+        """Get all customers in the order they were added."""
+        pass
+        
+    # Dish methods; the menu builds its lookup indexes in memory from these
+    @abstractmethod
+    def add_dishes(self, dishes: List[Dish]) -> None:
+        """Store dishes added to the menu."""
+        pass
+        
+    @abstractmethod
+    def get_all_dishes(self) -> List[Dish]:
+        """Get every stored dish in the order they were added."""
+        pass
+        
+    def archive_closed_orders(self, closed_before_us: Optional[int] = None) -> int:
+        """
+        Move orders closed before the given time, or all closed orders, to compact storage.
+        Returns the number of orders moved; backends that don't keep orders in memory move none.
+        """
+        return 0
+        
+    def poll_changes(self) -> Optional[List[tuple]]:
+        """
+        Get the changes other processes made since the last poll, oldest first, as tuples:
+        ("dishes", [Dish]), ("order_added", Order), ("status", order ID, OrderStatus),
+        ("order_deleted", Order) or ("customer", Customer).
+        Returns None when changes were missed and everything must be reloaded.
+        """
+        return []
+        
+    def order_lock(self, order_id: UUID) -> ContextManager[None]:
+        """Lock an order against changes by other processes."""
+        return nullcontext()
+        
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+        pass
+
+
+class InMemoryBackend(StorageBackend):
+    """
+    Default backend keeping everything in dicts; nothing survives a restart.
+    Orders are stored by reference, so changes to them are visible before update_order.
+    Each collection has its own read/write lock, so readers of one never wait on writers of another.
+    
+    Delivered and cancelled orders that haven't changed for archive_after seconds are moved
+    to a columnar OrderArchive, swept every ARCHIVE_SWEEP_EVERY saves of closed orders. Reads
+    find archived orders transparently as copies; saving a changed copy makes it live again.
+    With archive_after set to None, orders are only archived by calling archive_closed_orders.
+    """
+    
+    def __init__(self, archive_after: Optional[float] = DEFAULT_ARCHIVE_AFTER):
+        self.archive_after = archive_after
+        self._archive = OrderArchive()
+        self._closed_since_sweep = 0
+        self._orders: Dict[UUID, Order] = {}
+        self._customers: Dict[UUID, Customer] = {}
+        self._dishes: List[Dish] = []
+        self._orders_lock = ReadWriteLock()
+        self._customers_lock = ReadWriteLock()
+        
+    # Order methods
+    def add_order(self, order: Order) -> None:
+        """Store a new order."""
+        with self._orders_lock.write():
+            self._orders[order.id] = order
+            
+    def get_order(self, order_id: UUID) -> Optional[Order]:
+        """Get an order by ID."""
+        with self._orders_lock.read():
+            order = self._orders.get(order_id)
+            return order if order is not None else self._archive.get(order_id)
+            
+    def get_all_orders(self) -> List[Order]:
+        """Get all orders, archived ones first, otherwise in the order they were added."""
+        archived, orders = self._orders_view()
+        return list(archived) + orders
+        
+    def update_order(self, order: Order) -> bool:
+        """Store the current state of an existing order."""
+        with self._orders_lock.write():
+            if order.id in self._orders:
+                self._orders[order.id] = order
+            elif self._archive.remove(order.id):
+                self._orders[order.id] = order
+            else:
+                return False
+        if order.status in CLOSED_STATUSES:
+            # Only paces the sweeps, so a count lost to a race doesn't matter
+            self._closed_since_sweep += 1
+            if self._closed_since_sweep >= ARCHIVE_SWEEP_EVERY and self.archive_after is not None:
+                self.archive_closed_orders(time_ns() // 1000 - int(self.archive_after * 1_000_000))
+        return True
+        
+    def delete_order(self, order_id: UUID) -> bool:
+        """Delete an order by ID."""
+        with self._orders_lock.write():
+            if order_id in self._orders:
+                del self._orders[order_id]
+                return True
+            return self._archive.remove(order_id)
+            
+    def archive_closed_orders(self, closed_before_us: Optional[int] = None) -> int:
+        """Move orders closed before the given time, or all closed orders, to the archive."""
+        with self._orders_lock.write():
+            self._closed_since_sweep = 0
+            closed = [
+                order for order in self._orders.values()
+                if order.status in CLOSED_STATUSES
+                and (closed_before_us is None or order.updated_at_us < closed_before_us)
+            ]
+            self._archive.extend(closed)
+            for order in closed:
+                del self._orders[order.id]
+        return len(closed)
+        
+    def scan_archive(self, scan: Callable[[OrderArchive], T]) -> T:
+        """Run a reporting scan over the archived orders, such as OrderArchive.summarize."""
+        with self._orders_lock.read():
+            return scan(self._archive)
+            
+    def _orders_view(self) -> Tuple[ArchiveView, List[Order]]:
+        """Capture the archived and live orders, for reading the archive after the lock is released."""
+        with self._orders_lock.read():
+            return self._archive.view(), list(self._orders.values())
+            
+    # Customer methods
+    def add_customer(self, customer: Customer) -> None:
+        """Store a customer."""
+        with self._customers_lock.write():
+            self._customers[customer.id] = customer
+            
+    def get_customer(self, customer_id: UUID) -> Optional[Customer]:
+        """Get a customer by ID."""
+        with self._customers_lock.read():
+            return self._customers.get(customer_id)
+            
+    def get_all_customers(self) -> List[Customer]:
+        """Get all customers in the order they were added."""
+        with self._customers_lock.read():
+            return list(self._customers.values())
+            
+    # Dish methods
+    def add_dishes(self, dishes: List[Dish]) -> None:
+        """Store dishes added to the menu."""
+        # The menu already holds the dishes; this copy only exists for get_all_dishes
+        self._dishes.extend(dishes)
+        
+    def get_all_dishes(self) -> List[Dish]:
+        """Get every stored dish in the order they were added."""
+        return list(self._dishes)
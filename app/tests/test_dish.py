@@ -41,4 +41,13 @@ def test_dish_equality():
     assert dish1 == dish2
     
     # A dish should not be equal to a non-dish object
-    assert dish1 != "not a dish" 
\ No newline at end of file
+    assert dish1 != "not a dish" 
+
+def test_dish_hash():
+    """Test that equal dishes hash the same so they can be used in sets and dict keys."""
+    dish1 = Dish(name="Pizza", price=12.99)
+    dish2 = Dish(name="Pizza", price=12.99)
+    dish2.id = dish1.id
+    
+    assert hash(dish1) == hash(dish2)
+    assert len({dish1, dish2}) == 1
@@ -0,0 +1,135 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models.dish import Dish
+from app.routes import dishes
+from app.services.order_database import OrderDatabase
+from app.services.response_cache import ResponseCache
+
+
+@pytest.fixture
+def client():
+    """Test client for the dishes router backed by a fresh database."""
+    OrderDatabase()._initialize()
+    ResponseCache().clear()
+    app = FastAPI()
+    app.include_router(dishes.router)
+    return TestClient(app)
+
+
+def test_dishes_etag_and_not_modified(client):
+    """Test that menu reads carry an ETag and unchanged menus answer 304."""
+    client.post("/dishes/", json={"name": "Pizza", "price": 12.99, "category": "Main Course"})
+    
+    response = client.get("/dishes/")
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    
+    cached = client.get("/dishes/", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    
+    by_category = client.get("/dishes/category/Main Course", headers={"If-None-Match": etag})
+    assert by_category.status_code == 304
+
+
+def test_dishes_pages(client):
+    """Test walking the dish list with cursors, in insertion and price order."""
+    for name, price in [("Pizza", 12.99), ("Soda", 2.49), ("Pasta", 10.99)]:
+        client.post("/dishes/", json={"name": name, "price": price})
+        
+    first = client.get("/dishes/?limit=2")
+    assert [dish["name"] for dish in first.json()] == ["Pizza", "Soda"]
+    last = client.get(f"/dishes/?limit=2&cursor={first.headers['X-Next-Cursor']}")
+    assert [dish["name"] for dish in last.json()] == ["Pasta"]
+    assert "X-Next-Cursor" not in last.headers
+    
+    first = client.get("/dishes/?limit=2&sort=-price")
+    assert [dish["name"] for dish in first.json()] == ["Pizza", "Pasta"]
+    last = client.get(f"/dishes/?limit=2&sort=-price&cursor={first.headers['X-Next-Cursor']}")
+    assert [dish["name"] for dish in last.json()] == ["Soda"]
+    assert client.get("/dishes/?limit=2&cursor=nonsense").status_code == 400
+
+
+def test_dishes_etag_changes_after_edit(client):
+    """Test that adding a dish invalidates previously issued ETags."""
+    etag = client.get("/dishes/").headers["ETag"]
+    client.post("/dishes/", json={"name": "Pasta", "price": 10.99})
+    
+    response = client.get("/dishes/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert [dish["name"] for dish in response.json()] == ["Pasta"]
+
+
+
+def test_cached_category_is_invalidated_by_new_dish(client):
+    """Test that cached category listings pick up newly added dishes."""
+    client.post("/dishes/", json={"name": "Pizza", "price": 12.99, "category": "Main Course"})
+    assert len(client.get("/dishes/category/Main Course").json()) == 1
+    assert len(client.get("/dishes/category/Main Course").json()) == 1
+    
+    client.post("/dishes/", json={"name": "Pasta", "price": 10.99, "category": "Main Course"})
+    assert len(client.get("/dishes/category/Main Course").json()) == 2
+
+
+def test_bulk_import_json_array(client):
+    """Test importing a JSON array with one invalid row."""
+    version = client.post("/dishes/bulk", json=[]).json()["version"]
+    
+    response = client.post("/dishes/bulk", json=[
+        {"name": "Pizza", "price": 12.99, "category": "Main Course"},
+        {"name": "Broken"},
+        {"name": "Salad", "price": 8.99}
+    ])
+    result = response.json()
+    
+    assert response.status_code == 200
+    assert result["imported"] == 2
+    assert result["failed"] == 1
+    assert result["errors"][0]["row"] == 1
+    assert result["errors"][0]["errors"][0]["loc"] == ["price"]
+    assert result["version"] == version + 1
+    assert [dish["name"] for dish in client.get("/dishes/").json()] == ["Pizza", "Salad"]
+
+
+def test_bulk_import_ndjson(client):
+    """Test importing newline-delimited JSON, including a malformed line."""
+    body = b'{"name": "Pizza", "price": 12.99}\n\nnot json\n{"name": "Soda", "price": 2.49}'
+    
+    response = client.post(
+        "/dishes/bulk",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    result = response.json()
+    
+    assert result["imported"] == 2
+    assert result["failed"] == 1
+    assert result["errors"][0]["row"] == 1
+    assert len(client.get("/dishes/").json()) == 2
+
+
+def test_bulk_import_rejects_non_array(client):
+    """Test that a JSON body other than an array is rejected."""
+    response = client.post("/dishes/bulk", json={"name": "Pizza", "price": 12.99})
+    assert response.status_code == 400
+
+
+def test_cached_bodies_match_their_etag(client):
+    """Test that a menu change no cache invalidation saw yet still serves the new body with its ETag."""
+    client.post("/dishes/", json={"name": "Pizza", "price": 12.99, "category": "Main"})
+    client.get("/dishes/")
+    client.get("/dishes/category/Main")
+    # Changed under the service, as if a request read between the change and an invalidation
+    OrderDatabase().add_dish_to_menu(Dish(name="Pasta", price=10.99, category="Main"))
+    
+    response = client.get("/dishes/")
+    by_category = client.get("/dishes/category/Main")
+    
+    assert response.headers["ETag"] == OrderDatabase().get_menu().snapshot().etag
+    assert [dish["name"] for dish in response.json()] == ["Pizza", "Pasta"]
+    assert [dish["name"] for dish in by_category.json()] == ["Pizza", "Pasta"]
+    assert by_category.headers["ETag"] == response.headers["ETag"]
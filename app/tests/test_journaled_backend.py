@@ -0,0 +1,211 @@
+import os
+import struct
+import threading
+import pytest
+from uuid import uuid4
+
+from app.models.customer import Customer
+from app.models.dish import Dish
+from app.models.order import Order, OrderStatus
+from app.models.order_type import OrderType
+from app.services.journal import Journal, encode_order
+from app.services.journaled_backend import JournaledBackend
+from app.services.order_database import OrderDatabase
+from app.services.order_service import OrderService
+from app.services.storage_backend import InMemoryBackend
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / "journal")
+
+
+@pytest.fixture
+def database():
+    """The shared database; put back on an in-memory backend after each test."""
+    db = OrderDatabase()
+    yield db
+    db.use_backend(InMemoryBackend())
+
+
+def reopen(database, directory, **options):
+    database.use_backend(JournaledBackend(directory, fsync=False, **options))
+    return database
+
+
+def test_state_survives_restart(database, directory):
+    """Test that every kind of change is journaled and replayed on startup."""
+    reopen(database, directory)
+    service = OrderService()
+    pizza = Dish(name="Pizza", price=12.99, category="Main")
+    soda = Dish(name="Soda", price=2.49, description=None)
+    database.add_dishes_to_menu([pizza, soda])
+    customer = Customer(name="John Doe", email="john@example.com", phone="555-0100")
+    database.add_customer(customer)
+    off_menu = Dish(name="Special", price=20.0)
+    kept = Order(customer.id, [pizza, off_menu], OrderType.BULK)
+    database.add_order(kept)
+    service.add_dish_to_order(kept.id, soda.id)
+    service.set_dish_quantity(kept.id, pizza.id, 3)
+    service.remove_dish_from_order(kept.id, soda.id)
+    service.update_order_status(kept.id, OrderStatus.PROCESSING)
+    deleted = service.create_order(customer.id, [pizza.id])
+    database.delete_order(deleted.id)
+    expected = [(item.dish.id, item.quantity) for item in kept.line_items]
+    
+    reopen(database, directory)
+    
+    assert [dish.id for dish in database.get_menu().get_all_dishes()] == [pizza.id, soda.id]
+    assert database.get_customer(customer.id) == customer
+    assert database.get_order(deleted.id) is None
+    restored = database.get_order(kept.id)
+    assert restored.status == OrderStatus.PROCESSING
+    assert restored.order_type == OrderType.BULK
+    assert [(item.dish.id, item.quantity) for item in restored.line_items] == expected
+    assert restored.subtotal_cents == kept.subtotal_cents
+    assert restored.created_at_us == kept.created_at_us
+    assert restored.updated_at_us == kept.updated_at_us
+
+
+def test_snapshot_replaces_older_files(database, directory):
+    """Test that snapshots compact the journal and recovery replays only the tail after them."""
+    backend = reopen(database, directory, snapshot_every=10**9).backend
+    dish = Dish(name="Pizza", price=12.99)
+    database.add_dish_to_menu(dish)
+    orders = [Order(uuid4(), [dish]) for _ in range(20)]
+    for order in orders:
+        database.add_order(order)
+    backend.snapshot()
+    orders[0].update_status(OrderStatus.CANCELLED)
+    database.save_order_status(orders[0])
+    
+    assert sorted(os.listdir(directory)) == ["journal-0000000002.bin", "snapshot-0000000002.bin"]
+    
+    backend = reopen(database, directory).backend
+    
+    assert backend.recovered_records == 1 + 20 + 1 + 1
+    assert [order.id for order in database.get_all_orders()] == [order.id for order in orders]
+    assert database.get_order(orders[0].id).status == OrderStatus.CANCELLED
+
+
+def test_snapshots_are_taken_automatically(database, directory):
+    """Test that a snapshot is written in the background after snapshot_every records."""
+    backend = reopen(database, directory, snapshot_every=5).backend
+    for i in range(6):
+        database.add_customer(Customer(name="John Doe", email=f"john{i}@example.com"))
+    backend.close()
+    
+    assert any(name.startswith("snapshot-") for name in os.listdir(directory))
+    assert len(reopen(database, directory).get_all_customers()) == 6
+
+
+def test_torn_tail_is_cut_off(database, directory):
+    """Test that a record half-written by a crash is dropped and the journal keeps working."""
+    reopen(database, directory)
+    first = Customer(name="John Doe", email="john@example.com")
+    database.add_customer(first)
+    database.add_customer(Customer(name="Jane Doe", email="jane@example.com"))
+    database.backend.close()
+    path = os.path.join(directory, "journal-0000000001.bin")
+    os.truncate(path, os.path.getsize(path) - 3)
+    
+    reopen(database, directory)
+    
+    assert database.get_all_customers() == [first]
+    second = Customer(name="Jane Doe", email="jane@example.com")
+    database.add_customer(second)
+    reopen(database, directory)
+    assert database.get_all_customers() == [first, second]
+
+
+def test_concurrent_writers_share_fsyncs(directory):
+    """Test that group commit needs fewer fsyncs than there are writes."""
+    backend = JournaledBackend(directory)
+    threads, writes = 8, 20
+    
+    def write():
+        for _ in range(writes):
+            backend.add_customer(Customer(name="John Doe", email="john@example.com"))
+            
+    workers = [threading.Thread(target=write) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    backend.close()
+    
+    assert 0 < backend._journal.fsyncs < threads * writes
+    recovered = JournaledBackend(directory)
+    assert len(recovered.get_all_customers()) == threads * writes
+    recovered.close()
+
+
+def test_changes_that_cannot_be_journaled_are_not_applied(database, directory):
+    """Test that a change whose record can't be encoded leaves memory as it was."""
+    reopen(database, directory)
+    long_address = Customer(name="John Doe", email="john@example.com", address="x" * 70_000)
+    dish = Dish(name="Pizza", price=12.99)
+    too_many = Order.restore(
+        uuid4(), uuid4(), OrderType.REGULAR, OrderStatus.CREATED, [(dish, 2**32)], 1, 1
+    )
+    
+    with pytest.raises(ValueError):
+        database.add_customer(long_address)
+    with pytest.raises(struct.error):
+        database.backend.add_order(too_many)
+    with pytest.raises(ValueError):
+        database.add_dish_to_menu(Dish(name="x" * 70_000, price=1.0))
+        
+    assert database.get_all_customers() == []
+    assert database.get_menu().get_all_dishes() == []
+    assert database.get_order(too_many.id) is None
+    # Otherwise a later order with the dish would be journaled without the dish it refers to
+    assert dish.id not in database.backend._known_dishes
+    database.add_customer(Customer(name="John Doe", email="john@example.com"))
+    reopen(database, directory)
+    assert [customer.email for customer in database.get_all_customers()] == ["john@example.com"]
+
+
+def test_snapshot_taken_during_writes_can_be_loaded(database, directory, monkeypatch):
+    """Test that an order using a dish journaled while a snapshot is written still recovers."""
+    backend = reopen(database, directory, snapshot_every=10**9).backend
+    service = OrderService()
+    pizza = Dish(name="Pizza", price=12.99)
+    database.add_dish_to_menu(pizza)
+    order = service.create_order(uuid4(), [pizza.id])
+    soda = Dish(name="Soda", price=2.49)
+    
+    class WritesFirst(list):
+        """Live orders that change just after the snapshot took its dish lists."""
+        
+        def __iter__(self):
+            database.add_dish_to_menu(soda)
+            service.set_dish_quantity(order.id, soda.id, 2)
+            return super().__iter__()
+            
+    orders_view = backend._orders_view
+    
+    def changing_orders_view():
+        archived, live = orders_view()
+        return archived, WritesFirst(live)
+        
+    monkeypatch.setattr(backend, "_orders_view", changing_orders_view)
+    backend.snapshot()
+    monkeypatch.undo()
+    
+    reopen(database, directory)
+    
+    restored = database.get_order(order.id)
+    assert [(item.dish.id, item.quantity) for item in restored.line_items] == [(pizza.id, 1), (soda.id, 2)]
+    assert [dish.id for dish in database.get_menu().get_all_dishes()] == [pizza.id, soda.id]
+
+
+def test_records_of_unknown_dishes_fail_recovery_clearly(directory):
+    """Test that a journal referring to a dish it never defined is reported, not a KeyError."""
+    os.makedirs(directory)
+    journal = Journal(os.path.join(directory, "journal-0000000001.bin"), fsync=False)
+    journal.append(encode_order(Order(uuid4(), [Dish(name="Pizza", price=12.99)])))
+    journal.close()
+    
+    with pytest.raises(ValueError, match="no earlier record defines it"):
+        JournaledBackend(directory, fsync=False)
@@ -0,0 +1,114 @@
+import pytest
+from uuid import uuid4
+
+from app import main
+from app.models.dish import Dish
+from app.models.order import OrderStatus
+from app.models.order_events import OrderEventBus
+from app.models.order_type import OrderType
+from app.routes import kitchen
+from app.services.journaled_backend import JournaledBackend
+from app.services.kitchen_scheduler import KitchenScheduler
+from app.services.order_database import OrderDatabase
+from app.services.order_service import OrderService
+from app.services.storage_backend import InMemoryBackend
+
+
+@pytest.fixture
+def service():
+    """Order service over a fresh database with one dish on the menu."""
+    db = OrderDatabase()
+    db._initialize()
+    service = OrderService()
+    service.dish = Dish(name="Pizza", price=12.99)
+    db.add_dish_to_menu(service.dish)
+    return service
+
+
+@pytest.fixture
+def scheduler(service):
+    """Scheduler subscribed to order events for the duration of a test."""
+    scheduler = KitchenScheduler(service)
+    OrderEventBus().subscribe(scheduler)
+    yield scheduler
+    OrderEventBus().unsubscribe(scheduler)
+
+
+def create(service, order_type):
+    return service.create_order(uuid4(), [service.dish.id], order_type)
+
+
+def test_express_orders_are_served_first(service, scheduler):
+    """Test that express tickets go ahead of earlier regular and bulk tickets."""
+    bulk = create(service, OrderType.BULK)
+    regular = create(service, OrderType.REGULAR)
+    express = create(service, OrderType.EXPRESS)
+    
+    assert [ticket.order_id for ticket in scheduler.get_queue()] == [express.id, regular.id, bulk.id]
+    
+    _, ticket = scheduler.pull_next()
+    assert ticket.order_id == express.id
+    assert express.status == OrderStatus.PROCESSING
+
+
+def test_pulling_next_marks_previous_ticket_ready(service, scheduler):
+    """Test that a station's next pull finishes its current ticket."""
+    first = create(service, OrderType.REGULAR)
+    second = create(service, OrderType.REGULAR)
+    
+    scheduler.pull_next("grill")
+    finished, ticket = scheduler.pull_next("grill")
+    
+    assert finished == first.id
+    assert first.status == OrderStatus.READY
+    assert ticket.order_id == second.id
+    assert scheduler.get_station_ticket("grill") == second.id
+    
+    finished, ticket = scheduler.pull_next("grill")
+    assert finished == second.id
+    assert ticket is None
+    assert scheduler.pull_next("grill") == (None, None)
+
+
+def test_aging_prevents_starvation(service):
+    """Test that a regular ticket older than the aging window beats a new express ticket."""
+    scheduler = KitchenScheduler(service, aging_seconds=0.0)
+    regular = create(service, OrderType.REGULAR)
+    express = create(service, OrderType.EXPRESS)
+    scheduler.submit(express)
+    scheduler.submit(regular)
+    
+    assert [ticket.order_id for ticket in scheduler.get_queue()] == [regular.id, express.id]
+
+
+def test_cancelled_orders_leave_the_queue(service, scheduler):
+    """Test that tickets are dropped when their order is cancelled."""
+    cancelled = create(service, OrderType.EXPRESS)
+    kept = create(service, OrderType.REGULAR)
+    
+    service.update_order_status(cancelled.id, OrderStatus.CANCELLED)
+    
+    assert len(scheduler) == 1
+    _, ticket = scheduler.pull_next()
+    assert ticket.order_id == kept.id
+
+
+def test_restored_orders_are_queued_on_startup(service, tmp_path, monkeypatch):
+    """Test that orders recovered from the journal while still waiting reach the kitchen queue."""
+    db = OrderDatabase()
+    db.use_backend(JournaledBackend(str(tmp_path), fsync=False))
+    db.add_dish_to_menu(service.dish)
+    waiting = create(service, OrderType.REGULAR)
+    started = create(service, OrderType.EXPRESS)
+    service.update_order_status(started.id, OrderStatus.PROCESSING)
+    db.backend.close()
+    monkeypatch.delenv(main.STORE_SOCKET_ENV, raising=False)
+    monkeypatch.delenv(main.DATABASE_PATH_ENV, raising=False)
+    monkeypatch.setenv(main.DATA_DIR_ENV, str(tmp_path))
+    monkeypatch.setattr(kitchen, "kitchen_scheduler", KitchenScheduler(service))
+    try:
+        main.startup_event()
+        
+        assert [ticket.order_id for ticket in kitchen.kitchen_scheduler.get_queue()] == [waiting.id]
+    finally:
+        db.use_backend(InMemoryBackend())
@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from uuid import uuid4
+
+from app.models.dish import Dish
+from app.models.order import OrderStatus
+from app.models.order_events import OrderEventBus
+from app.services.kitchen_notifier import KitchenNotifier
+from app.services.kitchen_stream import KitchenStream
+from app.services.order_database import OrderDatabase
+from app.services.order_service import OrderService
+
+
+def test_connected_screens_receive_deltas():
+    """Test that every connected screen receives published events in order."""
+    
+    async def scenario():
+        stream = KitchenStream()
+        screen1 = stream.connect()
+        screen2 = stream.connect()
+        stream.publish("order_created", {"id": "a"})
+        stream.publish("status_changed", {"id": "a", "status": "processing"})
+        return await screen1.next_events(1), await screen2.next_events(1)
+        
+    events1, events2 = asyncio.run(scenario())
+    assert [event.type for event in events1] == ["order_created", "status_changed"]
+    assert events1 == events2
+
+
+def test_idle_screen_times_out():
+    """Test that waiting without new events returns an empty batch."""
+    
+    async def scenario():
+        stream = KitchenStream()
+        return await stream.connect().next_events(0.01)
+        
+    assert asyncio.run(scenario()) == []
+
+
+def test_resume_from_last_event_id():
+    """Test that a reconnecting screen gets only the events it missed."""
+    
+    async def scenario():
+        stream = KitchenStream()
+        for number in range(5):
+            stream.publish("order_created", {"number": number})
+        return await stream.connect(last_event_id=3).next_events(1)
+        
+    events = asyncio.run(scenario())
+    assert [event.id for event in events] == [4, 5]
+
+
+def test_resume_past_replay_log_requests_resync():
+    """Test that a screen whose last event left the replay log is told to resync."""
+    
+    async def scenario():
+        stream = KitchenStream(history_size=2)
+        for number in range(5):
+            stream.publish("order_created", {"number": number})
+        return await stream.connect(last_event_id=1).next_events(1)
+        
+    events = asyncio.run(scenario())
+    assert [event.type for event in events] == ["resync"]
+    assert events[0].id == 5
+
+
+def test_slow_screen_only_loses_its_own_events():
+    """Test that an overflowing screen buffer drops old events and flags a resync."""
+    
+    async def scenario():
+        stream = KitchenStream(buffer_size=2)
+        slow = stream.connect()
+        for number in range(3):
+            stream.publish("order_created", {"number": number})
+        fast = stream.connect(last_event_id=2)
+        return await slow.next_events(1), await fast.next_events(1)
+        
+    slow_events, fast_events = asyncio.run(scenario())
+    assert [event.type for event in slow_events] == ["resync", "order_created", "order_created"]
+    assert [event.id for event in slow_events[1:]] == [2, 3]
+    assert [event.id for event in fast_events] == [3]
+
+
+def test_kitchen_notifier_publishes_order_deltas():
+    """Test that order creation and status changes reach the kitchen stream."""
+    OrderDatabase()._initialize()
+    service = OrderService()
+    stream = KitchenStream()
+    notifier = KitchenNotifier(service, stream=stream)
+    OrderEventBus().subscribe(notifier)
+    
+    async def scenario():
+        screen = stream.connect()
+        dish = Dish(name="Pizza", price=12.99)
+        service.db.add_dish_to_menu(dish)
+        order = service.create_order(uuid4(), [dish.id, dish.id])
+        service.update_order_status(order.id, OrderStatus.PROCESSING)
+        await asyncio.get_running_loop().run_in_executor(None, notifier.queue.join, 5)
+        return order, await screen.next_events(1)
+        
+    order, events = asyncio.run(scenario())
+    OrderEventBus().unsubscribe(notifier)
+    notifier.queue.stop(5)
+    
+    assert [event.type for event in events] == ["order_created", "status_changed"]
+    assert events[0].data["id"] == str(order.id)
+    assert events[0].data["items"][0]["quantity"] == 2
+    assert events[1].data == {"id": str(order.id), "status": "processing", "previous_status": "created"}
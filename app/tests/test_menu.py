@@ -94,4 +94,170 @@ def test_get_dishes_by_category():
     assert main_course in main_courses
     
     desserts = menu.get_dishes_by_category("Dessert")
-    assert len(desserts) == 0 
\ No newline at end of file
+    assert len(desserts) == 0 
+
+def test_get_all_dishes_keeps_insertion_order():
+    """Test that the menu lists dishes in the order they were added."""
+    menu = Menu()
+    dishes = [Dish(name=f"Dish {i}", price=float(i)) for i in range(5)]
+    
+    for dish in dishes:
+        menu.add_dish(dish)
+    menu.remove_dish(dishes[2].id)
+    menu.add_dish(dishes[2])
+    
+    assert menu.get_all_dishes() == [dishes[0], dishes[1], dishes[3], dishes[4], dishes[2]]
+
+
+def test_get_all_dishes_returns_copy():
+    """Test that mutating the returned list does not change the menu."""
+    menu = Menu()
+    menu.add_dish(Dish(name="Pizza", price=12.99))
+    
+    menu.get_all_dishes().clear()
+    assert len(menu.get_all_dishes()) == 1
+
+
+def test_category_index_follows_removals():
+    """Test that removing a dish also removes it from its category."""
+    menu = Menu()
+    pizza = Dish(name="Pizza", price=12.99, category="Main Course")
+    pasta = Dish(name="Pasta", price=10.99, category="Main Course")
+    
+    menu.add_dish(pizza)
+    menu.add_dish(pasta)
+    menu.remove_dish(pizza.id)
+    
+    assert menu.get_dishes_by_category("Main Course") == [pasta]
+    
+    menu.remove_dish(pasta.id)
+    assert menu.get_dishes_by_category("Main Course") == []
+
+
+def test_get_category_counts():
+    """Test the per-category dish counts."""
+    menu = Menu()
+    menu.add_dish(Dish(name="Garlic Bread", price=5.99, category="Appetizer"))
+    menu.add_dish(Dish(name="Bruschetta", price=7.99, category="Appetizer"))
+    menu.add_dish(Dish(name="Pizza", price=12.99, category="Main Course"))
+    menu.add_dish(Dish(name="Water", price=1.00))
+    
+    assert menu.get_category_counts() == {"Appetizer": 2, "Main Course": 1}
+
+
+def test_search_dishes():
+    """Test searching dish names and descriptions through the menu."""
+    menu = Menu()
+    pizza = Dish(name="Pizza", price=12.99, description="Stone baked")
+    bread = Dish(name="Garlic Bread", price=5.99, description="Baked with garlic butter")
+    
+    menu.add_dish(pizza)
+    menu.add_dish(bread)
+    
+    assert menu.search_dishes("gar") == [bread]
+    assert menu.search_dishes("baked") == [pizza, bread]
+    
+    menu.remove_dish(bread.id)
+    assert menu.search_dishes("garlic") == []
+
+
+def test_get_dishes_by_price():
+    """Test price range lookups and ordering."""
+    menu = Menu()
+    soda = Dish(name="Soda", price=2.49)
+    salad = Dish(name="Salad", price=8.99)
+    pasta = Dish(name="Pasta", price=10.99)
+    pizza = Dish(name="Pizza", price=12.99)
+    
+    for dish in (pizza, soda, pasta, salad):
+        menu.add_dish(dish)
+        
+    assert menu.get_dishes_by_price() == [soda, salad, pasta, pizza]
+    assert menu.get_dishes_by_price(max_price=10) == [soda, salad]
+    assert menu.get_dishes_by_price(min_price=8.99, max_price=10.99) == [salad, pasta]
+    assert menu.get_dishes_by_price(min_price=10, descending=True) == [pizza, pasta]
+    assert menu.get_dishes_by_price(min_price=20) == []
+
+
+def test_price_index_follows_removals():
+    """Test that removed dishes disappear from price lookups, including equal prices."""
+    menu = Menu()
+    first = Dish(name="Espresso", price=2.5)
+    second = Dish(name="Tea", price=2.5)
+    
+    menu.add_dish(first)
+    menu.add_dish(second)
+    assert menu.get_dishes_by_price(max_price=2.5) == [first, second]
+    
+    menu.remove_dish(first.id)
+    assert menu.get_dishes_by_price(max_price=2.5) == [second]
+
+
+def test_dish_pages_resume_after_their_key():
+    """Test insertion-order pages, including when the last dish seen has been removed."""
+    menu = Menu()
+    dishes = [Dish(name=f"Dish {i}", price=float(i)) for i in range(5)]
+    menu.add_dishes(dishes)
+    
+    page, after = menu.get_dishes_page(limit=2)
+    assert page == dishes[:2]
+    menu.remove_dish(dishes[1].id)
+    page, after = menu.get_dishes_page(after, limit=2)
+    assert page == dishes[2:4]
+    assert menu.get_dishes_page(after, limit=2) == ([dishes[4]], None)
+
+
+def test_price_pages_split_equal_prices():
+    """Test that price-ordered pages in both directions neither skip nor repeat equal prices."""
+    menu = Menu()
+    dishes = [Dish(name=f"Dish {i}", price=price) for i, price in enumerate([2.5, 2.5, 2.5, 4.0, 1.0])]
+    menu.add_dishes(dishes)
+    
+    for descending in (False, True):
+        seen, after = [], None
+        while True:
+            page, after = menu.get_dishes_by_price_page(descending=descending, after=after, limit=2)
+            seen.extend(page)
+            if after is None:
+                break
+        assert seen == menu.get_dishes_by_price(descending=descending)
+    assert menu.get_dishes_by_price_page(min_price=2, max_price=3, limit=3) == (dishes[:3], None)
+
+
+def test_snapshot_is_shared_until_menu_changes():
+    """Test that snapshots are reused between edits and replaced after one."""
+    menu = Menu()
+    pizza = Dish(name="Pizza", price=12.99)
+    menu.add_dish(pizza)
+    
+    snapshot = menu.snapshot()
+    assert menu.snapshot() is snapshot
+    assert snapshot.dishes == (pizza,)
+    
+    menu.add_dish(pizza)  # Duplicate, nothing changes
+    assert menu.snapshot() is snapshot
+    
+    menu.remove_dish(pizza.id)
+    assert menu.snapshot() is not snapshot
+    assert menu.snapshot().version == snapshot.version + 1
+    assert menu.snapshot().etag != snapshot.etag
+    assert snapshot.dishes == (pizza,)
+
+
+def test_add_dishes_bumps_version_once():
+    """Test that adding many dishes at once produces a single new version."""
+    menu = Menu()
+    pizza = Dish(name="Pizza", price=12.99)
+    salad = Dish(name="Salad", price=8.99)
+    menu.add_dish(pizza)
+    version = menu.version
+    
+    added = menu.add_dishes([pizza, salad, Dish(name="Soda", price=2.49)])
+    
+    assert len(added) == 2
+    assert pizza not in added
+    assert menu.version == version + 1
+    assert len(menu.get_all_dishes()) == 3
+    
+    assert menu.add_dishes([salad]) == []
+    assert menu.version == version + 1
@@ -0,0 +1,116 @@
+import threading
+import pytest
+
+from app.services.notification_queue import NotificationQueue, OverflowPolicy
+
+
+class GatedHandler:
+    """Handler that blocks until released, to simulate a slow kitchen display."""
+    
+    def __init__(self):
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self.items = []
+        
+    def __call__(self, item):
+        self.started.set()
+        self.gate.wait(5)
+        self.items.append(item)
+
+
+def test_items_are_handled_in_background():
+    """Test that put returns immediately and the worker handles every item in order."""
+    handler = GatedHandler()
+    queue = NotificationQueue(handler, max_size=10)
+    
+    for item in range(3):
+        assert queue.put(item) is True
+    assert handler.started.wait(5)
+    assert handler.items == []
+    
+    handler.gate.set()
+    assert queue.join(5)
+    assert handler.items == [0, 1, 2]
+    assert queue.metrics()["processed"] == 3
+    queue.stop(5)
+
+
+def test_drop_oldest_policy():
+    """Test that a full queue drops its oldest item to make room."""
+    handler = GatedHandler()
+    queue = NotificationQueue(handler, max_size=2, overflow=OverflowPolicy.DROP_OLDEST)
+    queue.put("busy")
+    assert handler.started.wait(5)  # The worker holds "busy", the queue is empty
+    
+    for item in ("a", "b", "c"):
+        assert queue.put(item) is True
+        
+    metrics = queue.metrics()
+    assert metrics["depth"] == 2
+    assert metrics["dropped"] == 1
+    assert metrics["high_water_mark"] == 2
+    
+    handler.gate.set()
+    queue.join(5)
+    assert handler.items == ["busy", "b", "c"]
+    queue.stop(5)
+
+
+def test_reject_policy():
+    """Test that a full queue rejects new items."""
+    handler = GatedHandler()
+    queue = NotificationQueue(handler, max_size=1, overflow=OverflowPolicy.REJECT)
+    queue.put("busy")
+    assert handler.started.wait(5)
+    
+    assert queue.put("a") is True
+    assert queue.put("b") is False
+    assert queue.metrics()["rejected"] == 1
+    
+    handler.gate.set()
+    queue.join(5)
+    assert handler.items == ["busy", "a"]
+    queue.stop(5)
+
+
+def test_block_policy_times_out():
+    """Test that a full blocking queue waits for room and gives up after the timeout."""
+    handler = GatedHandler()
+    queue = NotificationQueue(handler, max_size=1, overflow=OverflowPolicy.BLOCK, block_timeout=0.05)
+    queue.put("busy")
+    assert handler.started.wait(5)
+    queue.put("a")
+    
+    assert queue.put("b") is False
+    
+    handler.gate.set()
+    queue.join(5)
+    assert queue.put("c") is True
+    queue.join(5)
+    assert handler.items == ["busy", "a", "c"]
+    queue.stop(5)
+
+
+def test_failing_handler_does_not_stop_worker():
+    """Test that handler errors are counted and later items still get handled."""
+    handled = []
+    
+    def handler(item):
+        if item == "bad":
+            raise RuntimeError("display offline")
+        handled.append(item)
+        
+    queue = NotificationQueue(handler)
+    queue.put("bad")
+    queue.put("good")
+    queue.join(5)
+    
+    assert handled == ["good"]
+    assert queue.metrics()["failed"] == 1
+    queue.stop(5)
+
+
+def test_invalid_size():
+    """Test that a queue must hold at least one item."""
+    with pytest.raises(ValueError):
+        NotificationQueue(lambda item: None, max_size=0)
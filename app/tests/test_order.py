@@ -4,7 +4,7 @@ from datetime import datetime
 
 from app.models.dish import Dish
 from app.models.interfaces import OrderObserver
-from app.models.order import Order, OrderStatus
+from app.models.order import MAX_DISH_QUANTITY, Order, OrderStatus
 
 
 class MockOrderObserver(OrderObserver):
@@ -153,4 +153,78 @@ def test_update_status():
     assert order.status == OrderStatus.PROCESSING
     assert order.updated_at > original_updated_at
     assert len(observer.updated_order_ids) == 1
-    assert observer.updated_order_ids[0] == order.id
\ No newline at end of file
+    assert observer.updated_order_ids[0] == order.id
+
+def test_order_is_compact():
+    """Test that orders use slots and share dish objects instead of copying them."""
+    dish = Dish(name="Pizza", price=12.99)
+    order1 = Order(uuid4(), [dish, dish])
+    order2 = Order(uuid4(), [dish])
+    
+    assert not hasattr(order1, "__dict__")
+    assert order1.dishes[0] is dish
+    assert order2.dishes[0] is dish
+    assert order1.dish_count == 2
+
+
+def test_remove_dish_removes_single_occurrence():
+    """Test that removing a repeated dish only removes one of its occurrences."""
+    dish = Dish(name="Coffee", price=2.50)
+    order = Order(uuid4(), [dish, dish, dish])
+    
+    assert order.remove_dish(dish.id) is True
+    assert order.dish_count == 2
+    assert order.calculate_total() == pytest.approx(5.00)
+
+
+def test_running_total_does_not_drift():
+    """Test that the total stays exact across many additions and removals."""
+    dime = Dish(name="Mint", price=0.10)
+    order = Order(uuid4(), [])
+    
+    for _ in range(1000):
+        order.add_dish(dime)
+    for _ in range(990):
+        order.remove_dish(dime.id)
+        
+    assert order.total_cents == 100
+    assert order.calculate_total() == 1.00
+
+
+def test_line_items_group_repeated_dishes():
+    """Test that repeated dishes are stored as one line item with a quantity."""
+    coffee = Dish(name="Coffee", price=2.50)
+    cake = Dish(name="Cake", price=4.00)
+    order = Order(uuid4(), [coffee, cake, coffee])
+    
+    assert order.line_items == [(coffee, 2), (cake, 1)]
+    assert order.dish_count == 3
+    assert order.get_quantity(coffee.id) == 2
+    assert order.dishes == [coffee, coffee, cake]
+
+
+def test_set_dish_quantity():
+    """Test setting a dish quantity in one call, including removing it with zero."""
+    coffee = Dish(name="Coffee", price=2.50)
+    order = Order(uuid4(), [])
+    
+    order.set_dish_quantity(coffee, 20)
+    assert order.dish_count == 20
+    assert order.total_cents == 5000
+    
+    order.set_dish_quantity(coffee, 0)
+    assert order.line_items == []
+    assert order.total_cents == 0
+    
+    with pytest.raises(ValueError):
+        order.set_dish_quantity(coffee, -1)
+    with pytest.raises(ValueError):
+        order.set_dish_quantity(coffee, MAX_DISH_QUANTITY + 1)
+        
+    order.set_dish_quantity(coffee, MAX_DISH_QUANTITY)
+    with pytest.raises(ValueError):
+        order.add_dish(coffee)
+    assert order.dish_count == MAX_DISH_QUANTITY
+    with pytest.raises(ValueError):
+        Order(uuid4(), [coffee] * (MAX_DISH_QUANTITY + 1))
+    assert Order(uuid4(), [coffee] * MAX_DISH_QUANTITY).dish_count == MAX_DISH_QUANTITY
@@ -0,0 +1,122 @@
+import pytest
+from uuid import uuid4
+
+from app.models.dish import Dish
+from app.models.order import Order, OrderStatus
+from app.models.order_type import OrderType
+from app.services.journaled_backend import JournaledBackend
+from app.services.order_archive import OrderArchive, OrderColumns
+from app.services.storage_backend import InMemoryBackend
+
+
+@pytest.fixture
+def dishes():
+    return [Dish(name="Pizza", price=12.99), Dish(name="Soda", price=2.49)]
+
+
+def closed_order(dishes, status=OrderStatus.DELIVERED, customer_id=None):
+    order = Order(customer_id or uuid4(), dishes, OrderType.BULK)
+    order.replay_change(order.updated_at_us + 1, status=status)
+    return order
+
+
+def test_archived_orders_are_rebuilt_exactly(dishes):
+    """Test that orders come back from the columns with every field intact, across many runs."""
+    archive = OrderArchive(run_size=4)
+    orders = [closed_order(dishes[:i % 2 + 1]) for i in range(50)]
+    archive.extend(orders)
+    
+    assert len(archive) == 50
+    for order in orders:
+        restored = archive.get(order.id)
+        assert restored.to_compact() == order.to_compact()
+        assert restored.subtotal_cents == order.subtotal_cents
+    assert archive.get(uuid4()) is None
+    
+    assert archive.remove(orders[7].id)
+    assert not archive.remove(orders[7].id)
+    assert orders[7].id not in archive
+    assert [order.id for order in archive.view()] == [order.id for order in orders if order is not orders[7]]
+
+
+def test_archive_scans(dishes):
+    """Test reporting scans by status, time window and customer."""
+    archive = OrderArchive()
+    customer_id = uuid4()
+    delivered = [closed_order(dishes, customer_id=customer_id) for _ in range(3)]
+    cancelled = closed_order(dishes[:1], OrderStatus.CANCELLED)
+    archive.extend(delivered + [cancelled])
+    archive.remove(delivered[0].id)
+    
+    summary = archive.summarize()
+    assert summary[OrderStatus.DELIVERED] == (2, delivered[1].total_cents * 2)
+    assert summary[OrderStatus.CANCELLED] == (1, cancelled.total_cents)
+    assert summary[OrderStatus.CREATED] == (0, 0)
+    assert archive.scan(customer_id=customer_id) == [order.id for order in delivered[1:]]
+    start_us = delivered[2].created_at_us
+    assert archive.scan(start_us=start_us) == [
+        order.id for order in delivered[1:] + [cancelled] if order.created_at_us >= start_us
+    ]
+    assert archive.scan(OrderStatus.CANCELLED, end_us=cancelled.created_at_us) == []
+    assert archive.dish_quantities() == {dishes[0].id: 3, dishes[1].id: 2}
+
+
+def test_backend_finds_archived_orders(dishes):
+    """Test that archived orders stay readable, and changing one makes it live again."""
+    backend = InMemoryBackend()
+    open_order = Order(uuid4(), dishes)
+    order = closed_order(dishes)
+    deleted = closed_order(dishes)
+    for stored in (order, open_order, deleted):
+        backend.add_order(stored)
+        
+    assert backend.archive_closed_orders() == 2
+    assert backend.scan_archive(len) == 2
+    assert backend.get_order(order.id).to_compact() == order.to_compact()
+    assert [stored.id for stored in backend.get_all_orders()] == [order.id, deleted.id, open_order.id]
+    assert backend.delete_order(deleted.id)
+    assert backend.get_order(deleted.id) is None
+    
+    copy = backend.get_order(order.id)
+    copy.replay_change(copy.updated_at_us + 1, status=OrderStatus.CANCELLED)
+    assert backend.update_order(copy)
+    assert backend.get_order(order.id) is copy
+    assert backend.scan_archive(len) == 0
+
+
+def test_recently_closed_orders_stay_live(dishes):
+    """Test that the sweep leaves orders closed after the cutoff alone."""
+    backend = InMemoryBackend()
+    order = closed_order(dishes)
+    backend.add_order(order)
+    
+    assert backend.archive_closed_orders(closed_before_us=order.updated_at_us) == 0
+    assert backend.get_order(order.id) is order
+
+
+def test_archived_orders_survive_snapshots(dishes, tmp_path):
+    """Test that the journaled backend snapshots archived orders and archives them on recovery."""
+    directory = str(tmp_path / "journal")
+    backend = JournaledBackend(directory, fsync=False)
+    orders = [closed_order(dishes) for _ in range(5)] + [Order(uuid4(), dishes)]
+    for order in orders:
+        backend.add_order(order)
+    backend.archive_closed_orders()
+    backend.snapshot()
+    backend.close()
+    
+    recovered = JournaledBackend(directory, fsync=False)
+    assert recovered.scan_archive(len) == 5
+    assert sorted(order.to_compact() for order in recovered.get_all_orders()) == sorted(
+        order.to_compact() for order in orders
+    )
+    recovered.close()
+
+
+def test_columns_must_resolve_dish_ids():
+    """Test that order columns that can't map item columns to dishes can't be created."""
+    class NoDishes(OrderColumns):
+        pass
+        
+    with pytest.raises(TypeError):
+        NoDishes()
@@ -1,9 +1,16 @@
+import sys
+import threading
 import pytest
+from uuid import uuid4
 
 from app.models.customer import Customer
 from app.models.dish import Dish
-from app.models.order import Order
+from app.models.locks import ReadWriteLock
+from app.models.order import Order, OrderStatus, to_cents
+from app.services.customer_indexes import CustomerIndexes
 from app.services.order_database import OrderDatabase
+from app.services.order_service import OrderService
+from app.services.storage_backend import InMemoryBackend
 
 
 def test_singleton_pattern():
@@ -103,4 +110,164 @@ def test_menu_operations():
     
     # Check that the dish was added
     assert len(menu.get_all_dishes()) == 1
-    assert menu.contains_dish(dish) 
\ No newline at end of file
+    assert menu.contains_dish(dish) 
+
+
+@pytest.fixture
+def fast_switching():
+    """Switch threads far more often than usual so races show up quickly."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def run_threads(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_order_updates_are_not_lost(fast_switching):
+    """Test that dishes added to one order from many threads all count towards its total."""
+    db = OrderDatabase()
+    db._initialize()
+    service = OrderService()
+    pizza = Dish(name="Pizza", price=12.99)
+    soda = Dish(name="Soda", price=2.49)
+    db.add_dishes_to_menu([pizza, soda])
+    order = service.create_order(uuid4(), [])
+    threads, rounds = 8, 200
+    errors = []
+    
+    def writer():
+        for i in range(rounds):
+            service.add_dish_to_order(order.id, pizza.id)
+            service.add_dish_to_order(order.id, soda.id)
+            service.remove_dish_from_order(order.id, soda.id)
+            
+    def reader():
+        try:
+            for _ in range(rounds):
+                service.get_order(order.id).dishes
+                service.get_all_orders()
+        except Exception as error:
+            errors.append(error)
+            
+    run_threads(threads, lambda: (writer(), reader()))
+    
+    assert not errors
+    assert order.dish_count == threads * rounds
+    assert order.get_quantity(pizza.id) == threads * rounds
+    assert order.get_quantity(soda.id) == 0
+    assert order.subtotal_cents == threads * rounds * to_cents(pizza.price)
+
+
+def test_concurrent_inserts_are_not_lost(fast_switching):
+    """Test that orders, customers and dishes added from many threads are all kept."""
+    db = OrderDatabase()
+    db._initialize()
+    threads, rounds = 8, 100
+    
+    def insert():
+        for i in range(rounds):
+            customer = Customer(name="John Doe", email=f"john{uuid4().hex}@example.com")
+            db.add_customer(customer)
+            db.add_order(Order(customer.id, []))
+            db.add_dish_to_menu(Dish(name=f"Dish {i}", price=i, category=f"c{i % 5}"))
+            db.get_menu().search_dishes("dish")
+            db.get_menu().get_dishes_by_price(max_price=50)
+            
+    run_threads(threads, insert)
+    
+    assert len(db.get_all_customers()) == threads * rounds
+    assert len(db.get_all_orders()) == threads * rounds
+    menu = db.get_menu()
+    assert len(menu.get_all_dishes()) == threads * rounds
+    assert sum(menu.get_category_counts().values()) == threads * rounds
+    assert menu.version == threads * rounds
+
+
+def test_readers_share_the_lock():
+    """Test that readers hold the lock together and a writer can re-enter it for reading."""
+    lock = ReadWriteLock()
+    inside = threading.Barrier(2, timeout=5)
+    
+    def read():
+        with lock.read():
+            # Both readers must be inside at once to pass the barrier
+            inside.wait()
+            
+    run_threads(2, read)
+    
+    with lock.write():
+        with lock.read():
+            pass
+    assert not inside.broken
+
+
+def test_order_indexes():
+    """Test the customer and status indexes through adds, status changes and deletes."""
+    db = OrderDatabase()
+    db._initialize()
+    customer_id = uuid4()
+    first = Order(customer_id, [])
+    second = Order(customer_id, [])
+    other = Order(uuid4(), [])
+    for order in (first, second, other):
+        db.add_order(order)
+        
+    assert [order.id for order in db.get_orders_by_customer(customer_id)] == [first.id, second.id]
+    assert len(db.get_orders_by_status(OrderStatus.CREATED)) == 3
+    
+    # Status changes made directly on the order are picked up from its events
+    second.update_status(OrderStatus.READY)
+    assert db.get_orders_by_status(OrderStatus.READY) == [second]
+    assert [order.id for order in db.get_orders_by_status(OrderStatus.CREATED)] == [first.id, other.id]
+    
+    db.delete_order(second.id)
+    assert db.get_orders_by_status(OrderStatus.READY) == []
+    assert db.get_orders_by_customer(customer_id) == [first]
+    assert db.get_orders_by_customer(uuid4()) == []
+
+
+class _FailingCustomerBackend(InMemoryBackend):
+    def add_customer(self, customer: Customer) -> None:
+        raise OSError("disk full")
+
+
+def test_customers_that_cannot_be_stored_are_not_indexed():
+    """Test that a customer the backend rejects leaves no email, search key or page entry behind."""
+    stored = Customer(name="Jane Roe", email="jane@example.com", phone="555-0100")
+    backend = _FailingCustomerBackend()
+    InMemoryBackend.add_customer(backend, stored)
+    db = OrderDatabase()
+    db.use_backend(backend)
+    
+    with pytest.raises(OSError):
+        db.add_customer(Customer(name="John Doe", email="john@example.com", phone="555-0199"))
+    renamed = Customer(id=stored.id, name="Janet Roe", email="janet@example.com", phone="555-0111")
+    with pytest.raises(OSError):
+        db.add_customer(renamed)
+        
+    assert db.get_customer_by_email("john@example.com") is None
+    assert db.get_customer_by_email("janet@example.com") is None
+    assert db.get_customer_by_email("jane@example.com").id == stored.id
+    assert db.search_customers("John") == []
+    assert [customer.id for customer in db.search_customers("555-01")] == [stored.id]
+    assert [customer.id for customer in db.search_customers("Jan")] == [stored.id]
+    assert [customer.id for customer in db.get_customers_page()[0]] == [stored.id]
+    assert db._customer_indexes._ids == [stored.id]
+    db.use_backend(InMemoryBackend())
+    
+    # A customer that is no longer the last one leaves an empty position instead
+    indexes = CustomerIndexes()
+    first, second = Customer(name="A", email="a@example.com"), Customer(name="B", email="b@example.com")
+    indexes.add(first)
+    indexes.add(second)
+    indexes.remove(first)
+    assert indexes.get_page() == ([second.id], None)
+    assert indexes.get_page(limit=1) == ([], 0)
+    assert indexes.get_page(after=0, limit=1) == ([second.id], None)
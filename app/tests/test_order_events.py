@@ -0,0 +1,112 @@
+import gc
+import weakref
+import pytest
+from uuid import UUID, uuid4
+
+from app.models.dish import Dish
+from app.models.interfaces import OrderObserver
+from app.models.order import Order, OrderStatus
+from app.models.order_events import OrderEvent, OrderEventBus, OrderEventKind
+
+
+class RecordingObserver(OrderObserver):
+    """Observer that records every batch of events it receives."""
+    
+    def __init__(self):
+        self.batches = []
+        
+    def update(self, order_id: UUID) -> None:
+        pass
+        
+    def on_events(self, events) -> None:
+        self.batches.append(list(events))
+
+
+@pytest.fixture
+def bus():
+    """The process-wide event bus."""
+    return OrderEventBus()
+
+
+def test_singleton_pattern():
+    """Test that OrderEventBus follows the Singleton pattern."""
+    assert OrderEventBus() is OrderEventBus()
+
+
+def test_one_subscription_covers_all_orders(bus):
+    """Test that a bus-wide subscriber sees events of every order."""
+    observer = RecordingObserver()
+    bus.subscribe(observer)
+    
+    order1 = Order(uuid4(), [Dish(name="Pizza", price=12.99)])
+    order2 = Order(uuid4(), [])
+    order1.update_status(OrderStatus.PROCESSING)
+    order2.update_status(OrderStatus.CANCELLED)
+    
+    events = [batch[0] for batch in observer.batches]
+    assert [event.order_id for event in events] == [order1.id, order2.id]
+    assert events[0].kind == OrderEventKind.STATUS_CHANGED
+    assert events[0].status == OrderStatus.PROCESSING
+    assert events[0].previous_status == OrderStatus.CREATED
+
+
+def test_subscribers_are_weakly_referenced(bus):
+    """Test that the bus does not keep subscribers alive."""
+    observer = RecordingObserver()
+    order = Order(uuid4(), [])
+    bus.subscribe(observer)
+    order.attach(observer)
+    
+    observer_ref = weakref.ref(observer)
+    del observer
+    gc.collect()
+    
+    assert observer_ref() is None
+    order.notify()  # Must not fail on the dead subscriber
+
+
+def test_batch_dispatches_once_per_observer(bus):
+    """Test that events published inside batch() arrive together on exit."""
+    observer = RecordingObserver()
+    bus.subscribe(observer)
+    order = Order(uuid4(), [])
+    
+    with bus.batch():
+        order.update_status(OrderStatus.PROCESSING)
+        order.update_status(OrderStatus.READY)
+        assert observer.batches == []
+        
+    assert len(observer.batches) == 1
+    assert [event.status for event in observer.batches[0]] == [OrderStatus.PROCESSING, OrderStatus.READY]
+
+
+def test_order_subscription_only_sees_that_order(bus):
+    """Test that attaching to an order only delivers that order's events."""
+    observer = RecordingObserver()
+    order1 = Order(uuid4(), [])
+    order2 = Order(uuid4(), [])
+    order1.attach(observer)
+    
+    bus.publish(OrderEvent(order2.id, OrderEventKind.CREATED))
+    order1.notify(OrderEventKind.CREATED)
+    
+    assert len(observer.batches) == 1
+    assert observer.batches[0][0].order_id == order1.id
+    
+    order1.detach(observer)
+    order1.notify()
+    assert len(observer.batches) == 1
+
+
+def test_collected_order_subscribers_are_pruned(bus):
+    """Test that an order whose only subscriber was collected is dropped from the bus."""
+    observer = RecordingObserver()
+    order = Order(uuid4(), [])
+    order.attach(observer)
+    assert order.id in bus._order_subscribers
+    
+    del observer
+    gc.collect()
+    bus.publish(OrderEvent(uuid4(), OrderEventKind.CREATED))
+    
+    assert order.id not in bus._order_subscribers
@@ -41,6 +41,10 @@ def test_bulk_order_factory():
     assert isinstance(order, Order)
     assert order.customer_id == customer_id
     assert len(order.dishes) == 3
+    assert order.order_type == OrderType.BULK
+    
+    # Bulk orders get a 10% discount
+    assert order.calculate_total() == pytest.approx(round((12.99 + 10.99 + 8.99) * 0.9, 2))
 
 
 def test_express_order_factory():
@@ -54,6 +58,7 @@ def test_express_order_factory():
     assert isinstance(order, Order)
     assert order.customer_id == customer_id
     assert len(order.dishes) == 1
+    assert order.order_type == OrderType.EXPRESS
 
 
 def test_order_factory_provider_regular():
@@ -0,0 +1,89 @@
+import pytest
+from uuid import uuid4
+
+from app.models.dish import Dish
+from app.models.order import Order, OrderStatus
+from app.models.order_type import OrderType
+from app.services.order_archive import OrderArchive
+from app.services.order_database import OrderDatabase
+from app.services.order_history import OrderHistoryService
+from app.services.order_segments import OrderSegment, write_segment
+
+
+@pytest.fixture
+def dishes():
+    return [Dish(name="Pizza", price=12.99), Dish(name="Soda", price=2.49), Dish(name="Salad", price=8.99)]
+
+
+def make_orders(dishes, count, customer_id=None):
+    """Orders created a second apart, cycling through statuses and numbers of dishes."""
+    statuses = [OrderStatus.DELIVERED, OrderStatus.CANCELLED, OrderStatus.CREATED]
+    return [
+        Order.restore(
+            uuid4(), customer_id or uuid4(), OrderType.REGULAR, statuses[i % 3],
+            [(dish, 1) for dish in dishes[:i % 3 + 1]], 1_000_000 * (i + 1), 1_000_000 * (i + 1)
+        )
+        for i in range(count)
+    ]
+
+
+def test_segment_scans_match_the_archive(dishes, tmp_path):
+    """Test that a mapped segment answers scans exactly like the in-memory columns."""
+    customer_id = uuid4()
+    orders = make_orders(dishes, 30, customer_id) + make_orders(dishes, 10)
+    archive = OrderArchive()
+    archive.extend(orders)
+    path = str(tmp_path / "orders.seg")
+    
+    # Written out of creation order; the segment sorts its rows
+    assert write_segment(path, reversed(orders)) == 40
+    
+    with OrderSegment(path) as segment:
+        assert len(segment) == 40
+        assert segment.summarize() == archive.summarize()
+        assert segment.dish_quantities(OrderStatus.DELIVERED) == archive.dish_quantities(OrderStatus.DELIVERED)
+        window = {"start_us": 5_000_000, "end_us": 12_000_000}
+        assert sorted(segment.scan(**window)) == sorted(order.id for order in orders[4:11] + orders[34:])
+        assert sorted(segment.scan(customer_id=customer_id, **window)) == sorted(
+            order.id for order in orders[4:11]
+        )
+        assert segment.summarize(**window) == archive.summarize(**window)
+
+
+def test_invalid_segments_are_rejected(tmp_path):
+    """Test that files which aren't complete segments fail to open."""
+    path = tmp_path / "orders.seg"
+    path.write_bytes(b"not a segment" * 10)
+    with pytest.raises(ValueError):
+        OrderSegment(str(path))
+        
+    write_segment(str(path), make_orders([Dish(name="Pizza", price=12.99)], 5))
+    path.write_bytes(path.read_bytes()[:-20])
+    with pytest.raises(ValueError):
+        OrderSegment(str(path))
+
+
+def test_history_service_exports_and_scans(dishes, tmp_path):
+    """Test exporting periods from the database and reporting across segments."""
+    db = OrderDatabase()
+    db._initialize()
+    orders = make_orders(dishes, 12)
+    for order in orders:
+        db.add_order(order)
+    history = OrderHistoryService(str(tmp_path / "history"))
+    
+    assert history.export(0, 6_500_000) == 6
+    assert history.export(6_500_000, 100_000_000) == 6
+    with pytest.raises(ValueError):
+        history.export(5_000_000, 7_000_000)
+        
+    assert history.scan() == [order.id for order in orders]
+    assert history.scan(start_us=4_000_000, end_us=9_000_000, status=OrderStatus.DELIVERED) == [
+        orders[3].id, orders[6].id
+    ]
+    delivered = [order for order in orders if order.status == OrderStatus.DELIVERED]
+    assert history.summarize()[OrderStatus.DELIVERED] == (
+        len(delivered), sum(order.total_cents for order in delivered)
+    )
+    assert history.dish_quantities(status=OrderStatus.CREATED) == {dish.id: 4 for dish in dishes}
+    db._initialize()
@@ -0,0 +1,142 @@
+import pytest
+from uuid import uuid4
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models.dish import Dish
+from app.models.order import MAX_DISH_QUANTITY
+from app.routes import customers, orders
+from app.services.order_database import OrderDatabase
+from app.services.response_cache import ResponseCache
+
+
+@pytest.fixture
+def client():
+    """Test client for the orders and customers routers backed by a fresh database."""
+    OrderDatabase()._initialize()
+    ResponseCache().clear()
+    app = FastAPI()
+    app.include_router(orders.router)
+    app.include_router(customers.router)
+    return TestClient(app)
+
+
+@pytest.fixture
+def customer_id(client):
+    return client.post("/customers/", json={"name": "John Doe", "email": "john@example.com"}).json()["id"]
+
+
+def create_order(client, customer_id):
+    return client.post("/orders/", json={"customer_id": customer_id, "dish_ids": []}).json()["id"]
+
+
+def test_orders_filtered_by_status(client, customer_id):
+    """Test that the status filter follows status changes."""
+    first = create_order(client, customer_id)
+    second = create_order(client, customer_id)
+    client.patch(f"/orders/{first}/status", json={"status": "processing"})
+    
+    assert [order["id"] for order in client.get("/orders/?status=created").json()] == [second]
+    assert [order["id"] for order in client.get("/orders/?status=processing").json()] == [first]
+    assert len(client.get("/orders/").json()) == 2
+    assert client.get("/orders/?status=lost").status_code == 400
+
+
+def test_customer_orders(client, customer_id):
+    """Test listing one customer's orders."""
+    other_id = client.post("/customers/", json={"name": "Jane Doe", "email": "jane@example.com"}).json()["id"]
+    first = create_order(client, customer_id)
+    create_order(client, other_id)
+    second = create_order(client, customer_id)
+    
+    response = client.get(f"/customers/{customer_id}/orders")
+    assert [order["id"] for order in response.json()] == [first, second]
+    assert client.get(f"/customers/{uuid4()}/orders").status_code == 404
+
+
+def walk(client, url):
+    """Follow next-page cursors from url, returning the IDs on each page."""
+    pages = []
+    response = client.get(url)
+    while True:
+        pages.append([item["id"] for item in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+        response = client.get(f"{url}&cursor={cursor}")
+
+
+def test_orders_pages(client, customer_id):
+    """Test keyset pages of orders, with status and creation time filters."""
+    created = [create_order(client, customer_id) for _ in range(5)]
+    client.patch(f"/orders/{created[1]}/status", json={"status": "processing"})
+    times = {order["id"]: order["created_at"] for order in client.get("/orders/").json()}
+    
+    assert walk(client, "/orders/?limit=2") == [created[:2], created[2:4], created[4:]]
+    assert sum(walk(client, "/orders/?limit=2&status=created"), []) == created[:1] + created[2:]
+    window = f"from={times[created[1]]}&to={times[created[3]]}"
+    assert walk(client, f"/orders/?{window}") == [created[1:3]]
+    assert client.get("/orders/?limit=2&cursor=WzFd").status_code == 400
+    assert client.get("/orders/?limit=0").status_code == 422
+
+
+def test_customers_pages(client, customer_id):
+    """Test keyset pages of customers in the order they were added."""
+    others = [
+        client.post("/customers/", json={"name": f"Customer {i}", "email": f"c{i}@example.com"}).json()["id"]
+        for i in range(3)
+    ]
+    
+    assert walk(client, "/customers/?limit=3") == [[customer_id] + others[:2], others[2:]]
+    assert len(client.get("/customers/").json()) == 4
+
+
+def test_customer_emails_are_unique(client, customer_id):
+    """Test that emails are unique regardless of case and customers can be found by email."""
+    response = client.post("/customers/", json={"name": "Johnny", "email": " John@Example.COM"})
+    
+    assert response.status_code == 409
+    assert client.get("/customers/by-email/JOHN@example.com").json()["id"] == customer_id
+    assert client.get("/customers/by-email/jane@example.com").status_code == 404
+    assert len(client.get("/customers/").json()) == 1
+
+
+def test_customer_search(client, customer_id):
+    """Test type-ahead search by the start of a name, a later word of it or a phone number."""
+    def create(name, email, phone=None):
+        return client.post("/customers/", json={"name": name, "email": email, "phone": phone}).json()["id"]
+        
+    johnny = create("Johnny Smith", "johnny@example.com", "+1 (555) 010-2000")
+    jane = create("Jane Johnson", "jane@example.com", "555-0100")
+    
+    def search(prefix, **params):
+        response = client.get("/customers/search", params={"prefix": prefix, **params})
+        return [customer["id"] for customer in response.json()]
+        
+    assert search("JOHN") == [customer_id, johnny, jane]
+    assert search("john", limit=2) == [customer_id, johnny]
+    assert search("john d") == [customer_id]
+    assert search("smi") == [johnny]
+    assert search("555-01") == [jane]
+    assert search("1555") == [johnny]
+    assert search("zed") == []
+    assert client.get("/customers/search").status_code == 422
+
+
+def test_dish_quantity_is_capped(client, customer_id):
+    """Test that a line item can't be set beyond the most its storage can hold."""
+    dish = Dish(name="Pizza", price=12.99)
+    OrderDatabase().add_dish_to_menu(dish)
+    order_id = client.post("/orders/", json={"customer_id": customer_id, "dish_ids": [str(dish.id)]}).json()["id"]
+    path = f"/orders/{order_id}/dishes/{dish.id}"
+    
+    assert client.put(f"{path}?quantity=4294967296").status_code == 422
+    assert client.put(f"{path}?quantity={MAX_DISH_QUANTITY}").json()["dish_count"] == MAX_DISH_QUANTITY
+    assert client.post(path).status_code == 400
+    assert client.get(f"/orders/{order_id}").json()["dish_count"] == MAX_DISH_QUANTITY
+    
+    too_many = {"customer_id": customer_id, "dish_ids": [str(dish.id)] * (MAX_DISH_QUANTITY + 1)}
+    response = client.post("/orders/", json=too_many)
+    assert response.status_code == 400
+    assert "order type" not in response.json()["detail"]
+    assert client.post("/orders/", json={**too_many, "order_type": "huge"}).json()["detail"] == "Invalid order type: huge"
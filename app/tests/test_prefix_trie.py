@@ -0,0 +1,30 @@
+from app.models.prefix_trie import PrefixTrie
+
+
+def test_search_ranks_shorter_keys_first():
+    """Test that matches come shortest key first, then alphabetically, each value once."""
+    trie = PrefixTrie()
+    trie.add("johnson", 1)
+    trie.add("john", 2)
+    trie.add("johan", 3)
+    trie.add("joan", 4)
+    trie.add("john", 5)
+    trie.add("johnny", 1)
+    
+    assert trie.search("joh") == [2, 5, 3, 1]
+    assert trie.search("joh", limit=2) == [2, 5]
+    assert trie.search("") == [4, 2, 5, 3, 1]
+    assert trie.search("x") == []
+
+
+def test_remove_prunes_empty_branches():
+    """Test that removed keys stop matching and leave no empty nodes behind."""
+    trie = PrefixTrie()
+    trie.add("john", 1)
+    trie.add("johnson", 2)
+    
+    assert trie.remove("johnson", 2)
+    assert not trie.remove("johnson", 2)
+    assert not trie.remove("jo", 1)
+    assert trie.search("john") == [1]
+    assert trie._root.children["j"].children["o"].children["h"].children["n"].children is None
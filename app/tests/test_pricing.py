@@ -0,0 +1,62 @@
+import pytest
+
+from app.models.order_type import OrderType
+from app.models.pricing import PricingEngine, discount, surcharge, tax
+
+
+def test_default_rules():
+    """Test the default bulk discount and express surcharge."""
+    engine = PricingEngine()
+    
+    assert engine.price(OrderType.REGULAR, 10000, 3) == 10000
+    assert engine.price(OrderType.BULK, 10000, 3) == 9000
+    assert engine.price(OrderType.EXPRESS, 10000, 3) == 11000
+
+
+def test_rules_apply_in_order_with_tax_last():
+    """Test that tax is charged on the amount after discounts and fees."""
+    engine = PricingEngine({
+        OrderType.REGULAR: [discount("promo", 20), surcharge("delivery", fixed_cents=500)]
+    }, tax_percent=10)
+    
+    # (10000 - 20%) + 5.00 = 8500, plus 10% tax
+    assert engine.price(OrderType.REGULAR, 10000, 1) == 9350
+    # Types without rules still pay tax
+    assert engine.price(OrderType.BULK, 10000, 1) == 11000
+
+
+def test_conditional_rules():
+    """Test that rules with thresholds only apply to qualifying orders."""
+    engine = PricingEngine({
+        OrderType.BULK: [discount("volume", 10, min_items=20), discount("big spender", 5, min_subtotal_cents=50000)]
+    })
+    
+    assert engine.price(OrderType.BULK, 10000, 19) == 10000
+    assert engine.price(OrderType.BULK, 10000, 20) == 9000
+    assert engine.price(OrderType.BULK, 60000, 1) == 57000
+
+
+def test_rounding_is_exact_to_the_cent():
+    """Test that percentages round half away from zero on whole cents."""
+    engine = PricingEngine({OrderType.REGULAR: [discount("promo", 10)]}, tax_percent=8.25)
+    
+    # 1299 - 129.9 -> 1169, then tax 96.44 -> 1265
+    assert engine.price(OrderType.REGULAR, 1299, 1) == 1265
+
+
+def test_batch_matches_single_pricing():
+    """Test that batch pricing gives the same totals as pricing orders one by one."""
+    engine = PricingEngine({
+        OrderType.REGULAR: [],
+        OrderType.BULK: [discount("volume", 10, min_items=5)],
+        OrderType.EXPRESS: [surcharge("express", 15, fixed_cents=99)],
+    }, tax_percent=7.5)
+    order_types = [OrderType.REGULAR, OrderType.BULK, OrderType.EXPRESS, OrderType.BULK] * 25
+    subtotals = [1000 + 37 * position for position in range(100)]
+    counts = [position % 9 for position in range(100)]
+    
+    expected = [
+        engine.price(order_type, subtotal, count)
+        for order_type, subtotal, count in zip(order_types, subtotals, counts)
+    ]
+    assert engine.price_batch(order_types, subtotals, counts) == expected
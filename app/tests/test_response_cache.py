@@ -0,0 +1,69 @@
+import pytest
+
+from app.services.response_cache import ResponseCache
+
+
+@pytest.fixture
+def cache():
+    """A fresh response cache."""
+    cache = ResponseCache()
+    cache._initialize(max_entries=2)
+    yield cache
+    cache._initialize()
+
+
+def test_singleton_pattern():
+    """Test that ResponseCache follows the Singleton pattern."""
+    assert ResponseCache() is ResponseCache()
+
+
+def test_hits_and_misses(cache):
+    """Test that lookups are counted as hits or misses."""
+    assert cache.get("a") is None
+    cache.put("a", b"[]")
+    assert cache.get("a") == b"[]"
+    
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_lru_eviction(cache):
+    """Test that the least recently used entry is evicted when the cache is full."""
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    cache.get("a")
+    cache.put("c", b"3")
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_get_or_encode_only_encodes_on_miss(cache):
+    """Test that the encoder runs once until the key is invalidated."""
+    calls = []
+    
+    def encode():
+        calls.append(1)
+        return b"{}"
+        
+    assert cache.get_or_encode("a", encode) == b"{}"
+    assert cache.get_or_encode("a", encode) == b"{}"
+    assert len(calls) == 1
+    
+    cache.invalidate("a")
+    cache.get_or_encode("a", encode)
+    assert len(calls) == 2
+
+
+def test_stale_body_is_not_cached_after_invalidation(cache):
+    """Test that a body encoded before an invalidation is not stored."""
+    
+    def encode():
+        cache.invalidate("a")  # Data changes while the old body is being encoded
+        return b"stale"
+        
+    assert cache.get_or_encode("a", encode) == b"stale"
+    assert cache.get("a") is None
@@ -0,0 +1,63 @@
+import pytest
+
+from app.models.search_index import InvertedIndex, tokenize
+
+
+def test_tokenize():
+    """Test that text is split into lower-case word tokens."""
+    assert tokenize("Margherita Pizza, extra-cheesy!") == ["margherita", "pizza", "extra", "cheesy"]
+
+
+def test_search_matches_prefixes():
+    """Test that partial words match indexed terms for type-ahead."""
+    index = InvertedIndex()
+    index.add(1, [("Margherita Pizza", 1.0)])
+    index.add(2, [("Pasta Carbonara", 1.0)])
+    
+    assert index.search("piz") == [1]
+    assert index.search("pa") == [2]
+    assert set(index.search("p")) == {1, 2}
+
+
+def test_search_requires_every_token():
+    """Test that multi-word queries only match documents containing all words."""
+    index = InvertedIndex()
+    index.add(1, [("Margherita Pizza", 1.0)])
+    index.add(2, [("Pepperoni Pizza", 1.0)])
+    
+    assert index.search("pizza pep") == [2]
+    assert index.search("pizza sushi") == []
+
+
+def test_search_ranks_by_weight_and_exact_match():
+    """Test that heavier fields and exact terms rank first."""
+    index = InvertedIndex()
+    index.add("described", [("Garlic Bread", 2.0), ("Goes well with pizza", 0.8)])
+    index.add("named", [("Pizza", 2.0), (None, 1.0)])
+    index.add("prefixed", [("Pizzaiola", 2.0)])
+    
+    assert index.search("pizza") == ["named", "prefixed", "described"]
+    assert index.search("pizza", limit=1) == ["named"]
+
+
+def test_remove_and_reindex():
+    """Test that removed documents stop matching and re-adding replaces old terms."""
+    index = InvertedIndex()
+    index.add(1, [("Pizza", 1.0)])
+    
+    assert index.remove(1) is True
+    assert index.remove(1) is False
+    assert index.search("pizza") == []
+    
+    index.add(1, [("Pizza", 1.0)])
+    index.add(1, [("Pasta", 1.0)])
+    assert index.search("pizza") == []
+    assert index.search("pasta") == [1]
+    assert len(index) == 1
+
+
+def test_empty_query():
+    """Test that a query without words matches nothing."""
+    index = InvertedIndex()
+    index.add(1, [("Pizza", 1.0)])
+    assert index.search("  !! ") == []
@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import pytest
+from uuid import uuid4
+
+from app.models.customer import Customer
+from app.models.dish import Dish
+from app.models.order import Order, OrderStatus
+from app.models.order_events import OrderEventBus
+from app.services.customer_indexes import DuplicateEmailError
+from app.services.order_database import OrderDatabase
+from app.services.order_service import OrderService
+from app.services.shared_store import SharedBackend, SharedKitchenScheduler, SharedKitchenStream, StoreServer
+from app.services.storage_backend import InMemoryBackend
+
+
+@pytest.fixture
+def server(tmp_path):
+    store = StoreServer(str(tmp_path / "store.sock"), InMemoryBackend(), change_log_size=10)
+    store.start()
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def database(server):
+    """The shared database as one worker; put back on an in-memory backend after each test."""
+    db = OrderDatabase()
+    db.use_backend(SharedBackend(server.path))
+    yield db
+    db.use_backend(InMemoryBackend())
+
+
+def test_changes_by_other_workers_reach_the_indexes(server, database):
+    """Test that orders, customers and dishes added by another worker show up after a sync."""
+    other = SharedBackend(server.path)
+    dish = Dish(name="Pizza", price=12.99, category="Main")
+    customer = Customer(name="John Doe", email="john@example.com")
+    order = Order(customer.id, [dish])
+    other.add_dishes([dish])
+    other.add_customer(customer)
+    other.add_order(order)
+    
+    assert [d.id for d in database.get_menu().get_all_dishes()] == [dish.id]
+    assert [c.id for c in database.get_customers_page()[0]] == [customer.id]
+    assert [o.id for o in database.get_orders_by_customer(customer.id)] == [order.id]
+    
+    order.update_status(OrderStatus.PROCESSING)
+    other.update_order_status(order)
+    assert [o.id for o in database.get_orders_by_status(OrderStatus.PROCESSING)] == [order.id]
+    assert database.get_orders_by_status(OrderStatus.CREATED) == []
+    
+    other.delete_order(order.id)
+    assert database.get_orders_page()[0] == []
+    other.close()
+
+
+def test_workers_reload_after_missing_changes(server, database):
+    """Test that a worker that fell behind the change log rebuilds its indexes."""
+    other = SharedBackend(server.path)
+    customer_id = uuid4()
+    orders = [Order(customer_id, []) for _ in range(15)]
+    for order in orders:
+        other.add_order(order)
+        
+    assert database.backend.poll_changes() is None
+    database.backend._since = 0
+    assert [o.id for o in database.get_orders_by_customer(customer_id)] == [o.id for o in orders]
+    other.close()
+
+
+def test_order_locks_are_shared_and_freed_on_disconnect(server, database):
+    """Test that an order lock held by one worker blocks another until that worker goes away."""
+    order = Order(uuid4(), [])
+    database.add_order(order)
+    other = SharedBackend(server.path)
+    acquired = threading.Event()
+    
+    def lock_elsewhere():
+        with other.order_lock(order.id):
+            acquired.set()
+            
+    with database.lock_order(order.id) as locked:
+        assert locked.id == order.id
+        thread = threading.Thread(target=lock_elsewhere)
+        thread.start()
+        assert not acquired.wait(0.2)
+    assert acquired.wait(5)
+    thread.join()
+    
+    holder = SharedBackend(server.path)
+    holder._call("lock_order", order.id)
+    holder.close()
+    with other.order_lock(order.id):
+        pass
+    other.close()
+
+
+def test_emails_are_unique_across_workers(server, database):
+    """Test that the store rejects an email another worker already used, before any poll."""
+    other = SharedBackend(server.path)
+    other.add_customer(Customer(name="John Doe", email="john@example.com"))
+    
+    with pytest.raises(DuplicateEmailError):
+        database.backend.add_customer(Customer(name="Johnny", email="JOHN@example.com"))
+    assert database.get_customer_by_email("John@Example.com").name == "John Doe"
+    other.close()
+
+
+def test_kitchen_queue_is_shared_across_workers(server, database):
+    """Test that a ticket queued by the worker that created an order can be pulled by another."""
+    order_service = OrderService()
+    creator = SharedKitchenScheduler(order_service, database.backend)
+    other = SharedBackend(server.path)
+    puller = SharedKitchenScheduler(order_service, other)
+    OrderEventBus().subscribe(creator)
+    try:
+        order = order_service.create_order(uuid4(), [])
+    finally:
+        OrderEventBus().unsubscribe(creator)
+        
+    assert [ticket.order_id for ticket in puller.get_queue()] == [order.id]
+    finished, ticket = puller.pull_next("grill")
+    assert finished is None and ticket.order_id == order.id
+    assert order_service.get_order(order.id).status == OrderStatus.PROCESSING
+    assert creator.get_station_ticket("grill") == order.id
+    assert len(creator) == 0
+    
+    assert creator.pull_next("grill") == (order.id, None)
+    assert order_service.get_order(order.id).status == OrderStatus.READY
+    assert puller.get_station_ticket("grill") is None
+    other.close()
+
+
+def test_kitchen_events_reach_every_worker(server, database):
+    """Test that a kitchen event published on one worker reaches screens on another, with one id."""
+    other = SharedBackend(server.path)
+    publisher = SharedKitchenStream(database.backend)
+    receiver = SharedKitchenStream(other)
+    
+    async def scenario():
+        screen = receiver.connect()
+        event = publisher.publish("order_created", {"id": "a"})
+        return event, await screen.next_events(5)
+        
+    event, received = asyncio.run(scenario())
+    assert received == [event]
+    assert receiver.last_event_id == event.id
+    
+    # A screen resuming on another worker from an id before that worker started is resynced
+    late = SharedKitchenStream(other)
+    
+    async def resume():
+        return await late.connect(last_event_id=0).next_events(5)
+        
+    assert [event.type for event in asyncio.run(resume())] == ["resync"]
+    other.close()
+    for stream in (receiver, late):
+        stream._thread.join(5)
+        assert not stream._thread.is_alive()
@@ -0,0 +1,129 @@
+import threading
+import pytest
+from uuid import uuid4
+
+from app.models.customer import Customer
+from app.models.dish import Dish
+from app.models.order import Order, OrderStatus
+from app.models.order_type import OrderType
+from app.services.order_database import OrderDatabase
+from app.services.order_service import OrderService
+from app.services.sqlite_backend import SQLiteBackend
+from app.services.storage_backend import InMemoryBackend
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "orders.db")
+
+
+@pytest.fixture
+def backend(path):
+    backend = SQLiteBackend(path, pool_size=4)
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def database(backend):
+    """The shared database switched to SQLite for one test."""
+    db = OrderDatabase()
+    db.use_backend(backend)
+    yield db
+    db.use_backend(InMemoryBackend())
+
+
+def test_orders_round_trip(backend):
+    """Test that a stored order comes back with the same dishes, status and timestamps."""
+    pizza = Dish(name="Pizza", price=12.99, category="Main")
+    soda = Dish(name="Soda", price=2.49)
+    order = Order(uuid4(), [pizza, soda, pizza], OrderType.EXPRESS)
+    backend.add_order(order)
+    
+    stored = backend.get_order(order.id)
+    assert stored is not order
+    assert stored.customer_id == order.customer_id
+    assert stored.order_type == OrderType.EXPRESS
+    assert stored.line_items == order.line_items
+    assert stored.subtotal_cents == order.subtotal_cents
+    assert stored.created_at_us == order.created_at_us
+    
+    order.update_status(OrderStatus.PROCESSING)
+    order.remove_dish(pizza.id)
+    assert backend.update_order(order)
+    stored = backend.get_order(order.id)
+    assert stored.status == OrderStatus.PROCESSING
+    assert stored.get_quantity(pizza.id) == 1
+    assert stored.updated_at_us == order.updated_at_us
+    
+    assert [o.id for o in backend.get_all_orders()] == [order.id]
+    assert backend.delete_order(order.id)
+    assert backend.get_order(order.id) is None
+    assert not backend.update_order(order)
+    assert not backend.delete_order(order.id)
+
+
+def test_data_survives_reopening(path):
+    """Test that customers, dishes and orders are still there after the backend is reopened."""
+    backend = SQLiteBackend(path)
+    customer = Customer(name="John Doe", email="john@example.com")
+    dishes = [Dish(name=f"Dish {i}", price=i) for i in range(3)]
+    backend.add_customer(customer)
+    backend.add_dishes(dishes)
+    order = Order(customer.id, dishes)
+    backend.add_order(order)
+    backend.close()
+    
+    backend = SQLiteBackend(path)
+    try:
+        assert backend.get_customer(customer.id) == customer
+        assert backend.get_all_customers() == [customer]
+        assert backend.get_all_dishes() == dishes
+        assert backend.get_order(order.id).dishes == dishes
+    finally:
+        backend.close()
+
+
+def test_database_loads_menu_from_backend(database, path):
+    """Test that switching backends rebuilds the menu from the stored dishes."""
+    dish = Dish(name="Pizza", price=12.99)
+    database.add_dish_to_menu(dish)
+    database.add_dish_to_menu(dish)
+    
+    database.use_backend(SQLiteBackend(path))
+    
+    assert database.get_menu().get_all_dishes() == [dish]
+    assert database.get_menu().search_dishes("pizza") == [dish]
+
+
+def test_concurrent_service_updates_are_persisted(database):
+    """Test that order changes made from many threads share commits without losing any."""
+    service = OrderService()
+    dish = Dish(name="Pizza", price=12.99)
+    database.add_dish_to_menu(dish)
+    orders = [service.create_order(uuid4(), []) for _ in range(4)]
+    
+    def add_dishes(order):
+        for _ in range(25):
+            assert service.add_dish_to_order(order.id, dish.id)
+            
+    threads = [threading.Thread(target=add_dishes, args=(order,)) for order in orders for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+        
+    for order in orders:
+        assert database.get_order(order.id).get_quantity(dish.id) == 50
+        
+    assert service.update_order_status(orders[0].id, OrderStatus.CANCELLED)
+    assert database.get_order(orders[0].id).status == OrderStatus.CANCELLED
+
+
+def test_failed_write_does_not_affect_its_batch(backend):
+    """Test that one failing write is rolled back without losing other writes."""
+    customer = Customer(name="John Doe", email="john@example.com")
+    with pytest.raises(ZeroDivisionError):
+        backend._write(lambda connection: 1 / 0)
+    backend.add_customer(customer)
+    assert backend.get_customer(customer.id) == customer